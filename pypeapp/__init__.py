@@ -4,6 +4,8 @@ from .lib.log import PypeLogger as Logger
 from .pypeLauncher import PypeLauncher
 from .lib.anatomy import (
     Anatomy,
+    AnatomyRegistry,
+    AnatomySnapshot,
     Roots,
     overrides_dir_path,
     project_overrides_dir_path,
@@ -18,6 +20,8 @@ __all__ = [
     "install_env",
     "PypeLauncher",
     "Anatomy",
+    "AnatomyRegistry",
+    "AnatomySnapshot",
     "Roots",
     "overrides_dir_path",
     "project_overrides_dir_path",
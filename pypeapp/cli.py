@@ -272,6 +272,54 @@ def test(pype, keyword, id):
         PypeLauncher().run_pype_setup_tests(keyword, id)
 
 
+@main.command()
+@click.option("-p", "--project", help="Project name",
+              default=lambda: os.environ.get('AVALON_PROJECT', ''))
+@click.option("--src-platform",
+              help="Platform of paths in file (all platforms by default)")
+@click.option("--dst-platform",
+              help="Platform to remap paths to (current by default)")
+@click.option("-o", "--output",
+              help="Output path. Source file is rewritten if not set.")
+@click.argument("path", type=click.Path(exists=True))
+def remap_metadata(project, src_platform, dst_platform, output, path):
+    """
+    Remap root paths in publish metadata json file.
+
+    Every string starting with project root of any platform is remapped to
+    root of current platform. File is processed in chunks so even big
+    metadata files can be remapped.
+    """
+    PypeLauncher().remap_metadata(
+        path, project, src_platform, dst_platform, output
+    )
+
+
+@main.group()
+def presets():
+    """
+    Manage presets of pype config.
+    """
+    pass
+
+
+@presets.command("compile")
+@click.option("-p", "--project", help="Project name",
+              default=lambda: os.environ.get('AVALON_PROJECT', ''))
+@click.option("--all-projects", is_flag=True,
+              help="Compile presets of all projects with project configs.")
+def compile_presets(project, all_projects):
+    """
+    Compile presets into one bundle file in local cache.
+
+    Bundle contains default presets, project overrides and
+    manifest of source files. Presets are loaded from the bundle while
+    source files did not change so hosts don't have to read many files
+    from network share on startup.
+    """
+    PypeLauncher().compile_presets(project, all_projects)
+
+
 @main.command()
 def make_docs():
     """
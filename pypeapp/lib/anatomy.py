@@ -1,9 +1,14 @@
 import os
 import re
+import sys
 import json
 import site
-import copy
+import time
+import string
 import platform
+import contextlib
+import threading
+import itertools
 import collections
 import numbers
 try:
@@ -12,7 +17,9 @@ except NameError:
     StringType = str
 
 from . import config
+from .config import freeze_data, DICT_COPY_USES_GETITEM
 from .log import PypeLogger
+from .file_cache import FileCache
 
 try:
     # Add venv site-packages to site dirs. On linux distributions this
@@ -38,6 +45,9 @@ else:
 
 log = PypeLogger().get_logger(__name__)
 
+# Parsed anatomy files are cached on disk as parsing yaml is slow
+anatomy_file_cache = FileCache("anatomy")
+
 
 def overrides_dir_path():
     value = os.environ.get("PYPE_PROJECT_CONFIGS")
@@ -90,19 +100,25 @@ class Anatomy:
     Args:
         project_name (str): Project name to look on overrides.
         keep_updated (bool): Project name is updated by AVALON_PROJECT environ.
+        result_cache_size (int, optional): Size of cache of filled templates.
+            Cache is disabled when not set.
     """
 
     root_key_regex = re.compile(r"{(root?[^}]+)}")
     root_name_regex = re.compile(r"root\[([^]]+)\]")
 
-    def __init__(self, project_name=None, keep_updated=False):
+    def __init__(
+        self, project_name=None, keep_updated=False, result_cache_size=None
+    ):
         if not project_name:
             project_name = os.environ.get("AVALON_PROJECT")
 
         self.project_name = project_name
         self.keep_updated = keep_updated
 
-        self._templates_obj = Templates(parent=self)
+        self._templates_obj = Templates(
+            parent=self, result_cache_size=result_cache_size
+        )
         self._roots_obj = Roots(parent=self)
 
     def reset(self):
@@ -110,6 +126,25 @@ class Anatomy:
         self.templates_obj.reset()
         self.roots_obj.reset()
 
+    def snapshot(self):
+        """Immutable anatomy of current project which can be shared.
+
+        Project from `AVALON_PROJECT` environment is used when
+        `keep_updated` is set. Snapshot does not check environments on
+        access of templates and roots.
+
+        Returns:
+            AnatomySnapshot: Anatomy with loaded templates and roots.
+        """
+        project_name = self.project_name
+        if self.keep_updated:
+            project_name = os.environ.get("AVALON_PROJECT") or project_name
+
+        result_cache_size = None
+        if self._templates_obj.result_cache is not None:
+            result_cache_size = self._templates_obj.result_cache.size
+        return AnatomySnapshot(project_name, result_cache_size)
+
     @property
     def templates(self):
         """Wrap property `templates` of Anatomy's Templates instance."""
@@ -128,6 +163,26 @@ class Anatomy:
         """Wrap `format_all` method of Anatomy's `templates_obj`."""
         return self._templates_obj.format_all(*args, **kwargs)
 
+    def format_many(self, *args, **kwargs):
+        """Wrap `format_many` method of Anatomy's `templates_obj`."""
+        return self._templates_obj.format_many(*args, **kwargs)
+
+    def format_sequence(self, *args, **kwargs):
+        """Wrap `format_sequence` method of Anatomy's `templates_obj`."""
+        return self._templates_obj.format_sequence(*args, **kwargs)
+
+    def find_versions(self, *args, **kwargs):
+        """Wrap `find_versions` method of Anatomy's `templates_obj`."""
+        return self._templates_obj.find_versions(*args, **kwargs)
+
+    def parse(self, *args, **kwargs):
+        """Wrap `parse` method of Anatomy's `templates_obj`."""
+        return self._templates_obj.parse(*args, **kwargs)
+
+    def parse_many(self, *args, **kwargs):
+        """Wrap `parse_many` method of Anatomy's `templates_obj`."""
+        return self._templates_obj.parse_many(*args, **kwargs)
+
     @property
     def roots(self):
         """Wrap `roots` property of Anatomy's `roots_obj`."""
@@ -155,6 +210,19 @@ class Anatomy:
         """Wrapper for Roots `find_root_template_from_path`."""
         return self.roots_obj.find_root_template_from_path(*args, **kwargs)
 
+    @staticmethod
+    def stat_many(*args, **kwargs):
+        """Wrapper for `stat_many` function."""
+        return stat_many(*args, **kwargs)
+
+    def remap_many(self, *args, **kwargs):
+        """Wrapper for Roots `remap_many`."""
+        return self.roots_obj.remap_many(*args, **kwargs)
+
+    def find_root_templates(self, *args, **kwargs):
+        """Wrapper for Roots `find_root_templates`."""
+        return self.roots_obj.find_root_templates(*args, **kwargs)
+
     def path_remapper(self, *args, **kwargs):
         """Wrapper for Roots `path_remapper`."""
         return self.roots_obj.path_remapper(*args, **kwargs)
@@ -329,6 +397,145 @@ class Anatomy:
         return rootless_path.format(**data)
 
 
+class AnatomySnapshot(Anatomy):
+    """Anatomy of one project with all data loaded at creation.
+
+    Project is not updated from environments. Templates and roots are
+    loaded at creation and frozen with `freeze_data` and all templates are
+    compiled so the object can be shared between threads. Snapshot, its
+    templates and roots objects can't be reset and snapshot's attributes
+    can't be changed.
+
+    Args:
+        project_name (str): Name of project.
+        result_cache_size (int, optional): Size of cache of filled templates.
+    """
+
+    def __init__(self, project_name, result_cache_size=None):
+        # Anatomy is old style class in Python 2
+        Anatomy.__init__(self, project_name)
+        self._roots_obj = _SnapshotRoots(parent=self)
+        self._templates_obj = _SnapshotTemplates(
+            parent=self, result_cache_size=result_cache_size
+        )
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise TypeError(
+                "'{}' object is immutable".format(self.__class__.__name__)
+            )
+        self.__dict__[name] = value
+
+    def reset(self):
+        raise TypeError("Anatomy snapshot can't be reset.")
+
+    def snapshot(self):
+        return self
+
+
+class AnatomyRegistry(object):
+    """Process wide registry of anatomy snapshots per project.
+
+    Anatomy files are loaded only once per project and the same anatomy
+    object is returned until any of project's anatomy files is changed.
+    Files are checked at most once per `poll_interval` seconds.
+
+    Returned anatomies are `AnatomySnapshot` objects which can't be
+    modified.
+
+    Example:
+        ```
+        anatomy = AnatomyRegistry.get("MyProject")
+        filled = anatomy.format(data)
+        ```
+    """
+
+    # Seconds between checks of anatomy files
+    poll_interval = 5.0
+
+    _lock = threading.Lock()
+    # Project name: (anatomy, files signature, time of last check)
+    _entries = {}
+
+    @staticmethod
+    def files_signature(project_name):
+        """Modification time, inode and size of anatomy files of project.
+
+        Returns:
+            tuple: Signature of files. Not existing files are `None`.
+        """
+        paths = [
+            Templates.default_templates_path(),
+            Roots.default_roots_path()
+        ]
+        if project_name is not None and overrides_dir_path():
+            paths.append(Templates.project_overrides_path(project_name))
+            paths.append(Roots.project_overrides_path(project_name))
+
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                signature.append((path, None))
+                continue
+            signature.append(
+                (path, stat.st_mtime, stat.st_ino, stat.st_size)
+            )
+        return tuple(signature)
+
+    @classmethod
+    def get(cls, project_name=None):
+        """Return shared anatomy of project.
+
+        Args:
+            project_name (str, optional): Name of project. Value of
+                `AVALON_PROJECT` environment is used when not set.
+
+        Returns:
+            AnatomySnapshot: Shared anatomy object.
+        """
+        if not project_name:
+            project_name = os.environ.get("AVALON_PROJECT")
+
+        with cls._lock:
+            now = time.time()
+            entry = cls._entries.get(project_name)
+            if entry is not None:
+                anatomy, signature, last_check = entry
+                if now - last_check < cls.poll_interval:
+                    return anatomy
+
+                new_signature = cls.files_signature(project_name)
+                if new_signature == signature:
+                    cls._entries[project_name] = (anatomy, signature, now)
+                    return anatomy
+
+                log.debug(
+                    "Anatomy files of project \"{}\" changed.".format(
+                        project_name
+                    )
+                )
+
+            signature = cls.files_signature(project_name)
+            anatomy = AnatomySnapshot(project_name)
+            cls._entries[project_name] = (anatomy, signature, now)
+            return anatomy
+
+    @classmethod
+    def invalidate(cls, project_name):
+        """Remove shared anatomy of project."""
+        with cls._lock:
+            cls._entries.pop(project_name, None)
+
+    @classmethod
+    def clear(cls):
+        """Remove shared anatomies of all projects."""
+        with cls._lock:
+            cls._entries.clear()
+
+
 class TemplateMissingKey(Exception):
     """Exception for cases when key does not exist in Anatomy."""
 
@@ -371,9 +578,71 @@ class TemplateUnsolved(Exception):
         )
 
 
+# Marks missing value in cache keys or value which was not prepared yet
+_MISSING = object()
+
+
+class TemplateDescriptor(object):
+    """Data shared by all results of the same template.
+
+    Args:
+        template (str): Original template.
+        keys (tuple, optional): `TemplateKey` objects of template in order
+            of values passed to methods.
+        literals (tuple, optional): Literal segments between keys.
+    """
+
+    __slots__ = ("template", "keys", "literals", "root_indexes")
+
+    def __init__(self, template, keys=None, literals=None):
+        self.template = template
+        self.keys = keys
+        self.literals = literals
+        # Positions of root keys in values
+        self.root_indexes = None
+        if keys is not None:
+            self.root_indexes = tuple(
+                idx
+                for idx, template_key in enumerate(keys)
+                if template_key.first == "root"
+            )
+
+    def used_values(self, values):
+        """Used values dictionary from values of keys."""
+        used_values = {}
+        for template_key, value in zip(self.keys, values):
+            if not template_key.path:
+                used_values[template_key.key] = value
+                continue
+
+            sub_values = used_values
+            for key in template_key.key_subdict[:-1]:
+                sub_values = sub_values.setdefault(key, {})
+            sub_values[template_key.key_subdict[-1]] = value
+        return used_values
+
+    def rootless_path(self, values):
+        """Filled template with root keys instead of root values."""
+        items = [self.literals[0]]
+        for template_key, value, literal in zip(
+            self.keys, values, self.literals[1:]
+        ):
+            if template_key.first == "root":
+                value = format(
+                    "{" + template_key.key + "}", template_key.format_spec
+                )
+            items.append(value)
+            items.append(literal)
+        return "".join(items)
+
+
 class TemplateResult(str):
     """Result (formatted template) of anatomy with most of information in.
 
+    Original template is stored in `TemplateDescriptor` shared by results of
+    the same template. Used values, rootless path, missing keys and invalid
+    types are prepared on first access.
+
     Args:
         used_values (dict): Dictionary of template filling data with
             only used keys.
@@ -388,31 +657,173 @@ class TemplateResult(str):
             of number.
     """
 
+    # Python 2 does not support non-empty slots on subclasses of `str`
+    if sys.version_info[0] >= 3:
+        __slots__ = (
+            "_descriptor",
+            "solved",
+            "_values",
+            "_rootless",
+            "_used_values",
+            "_missing_keys",
+            "_invalid_types"
+        )
+
     def __new__(
         cls, filled_template, template, solved, rootless_path,
         used_values, missing_keys, invalid_types
     ):
+        if rootless_path == filled_template:
+            rootless_path = None
+        return cls.from_descriptor(
+            filled_template, TemplateDescriptor(template), solved,
+            rootless_path, used_values, missing_keys, invalid_types
+        )
+
+    @classmethod
+    def from_descriptor(
+        cls, filled_template, descriptor, solved, rootless_path=None,
+        used_values=None, missing_keys=None, invalid_types=None,
+        values=None
+    ):
+        """Create result with shared descriptor.
+
+        Args:
+            descriptor (TemplateDescriptor): Shared data of template.
+            rootless_path (str, optional): Filled template with root keys.
+                Filled template is used when not set. Created from `values`
+                on first access when set to `_MISSING`.
+            used_values (dict, optional): Used values. Created from `values`
+                on first access when not set.
+            missing_keys (list, optional): Missing keys, can contain
+                duplicates.
+            invalid_types (list, optional): Dictionaries with invalid types.
+            values (tuple, optional): Values of all keys of descriptor.
+        """
         new_obj = super(TemplateResult, cls).__new__(cls, filled_template)
-        new_obj.used_values = used_values
+        new_obj._descriptor = descriptor
         new_obj.solved = solved
-        new_obj.template = template
-        new_obj.rootless = rootless_path
-        new_obj.missing_keys = list(set(missing_keys))
-        _invalid_types = {}
-        for invalid_type in invalid_types:
-            for key, val in invalid_type.items():
-                if key in _invalid_types:
-                    continue
-                _invalid_types[key] = val
-        new_obj.invalid_types = _invalid_types
+        new_obj._values = values
+        new_obj._rootless = rootless_path
+        new_obj._used_values = used_values
+        # Tuples are replaced with final values on first access
+        new_obj._missing_keys = tuple(missing_keys or ())
+        new_obj._invalid_types = tuple(invalid_types or ())
         return new_obj
 
+    def _copy(self):
+        """Copy of result which does not share mutable containers.
+
+        Descriptor, values and rootless path are immutable and shared,
+        used values, missing keys and invalid types are copied.
+        """
+        used_values = self._used_values
+        if used_values is not None:
+            used_values = _merge_nested({}, used_values)
+
+        invalid_types = self._invalid_types
+        if not isinstance(invalid_types, tuple):
+            invalid_types = [invalid_types]
+
+        return self.from_descriptor(
+            str(self), self._descriptor, self.solved, self._rootless,
+            used_values, self._missing_keys, invalid_types, self._values
+        )
+
+    def __reduce__(self):
+        return (self.__class__, (
+            str(self),
+            self.template,
+            self.solved,
+            self.rootless,
+            self.used_values,
+            self.missing_keys,
+            [self.invalid_types]
+        ))
+
+    @property
+    def template(self):
+        return self._descriptor.template
+
+    @property
+    def rootless(self):
+        rootless = self._rootless
+        if rootless is None:
+            return str(self)
+
+        if rootless is _MISSING:
+            rootless = self._descriptor.rootless_path(self._values)
+            self._rootless = rootless
+        return rootless
+
+    @property
+    def used_values(self):
+        used_values = self._used_values
+        if used_values is None:
+            used_values = self._descriptor.used_values(self._values)
+            self._used_values = used_values
+        return used_values
+
+    @property
+    def missing_keys(self):
+        missing_keys = self._missing_keys
+        if isinstance(missing_keys, tuple):
+            missing_keys = list(set(missing_keys))
+            self._missing_keys = missing_keys
+        return missing_keys
+
+    @property
+    def invalid_types(self):
+        invalid_types = self._invalid_types
+        if isinstance(invalid_types, tuple):
+            invalid_types = {}
+            for invalid_type in self._invalid_types:
+                for key, val in invalid_type.items():
+                    if key not in invalid_types:
+                        invalid_types[key] = val
+            self._invalid_types = invalid_types
+        return invalid_types
+
+
+def _merge_nested(output, data):
+    """Merge nested dictionaries of data into output without sharing them."""
+    for key, value in data.items():
+        if isinstance(value, dict):
+            current = output.get(key)
+            if not isinstance(current, dict):
+                current = {}
+                output[key] = current
+            _merge_nested(current, value)
+        else:
+            output[key] = value
+    return output
+
 
 class TemplatesDict(dict):
-    """Holds and wrap TemplateResults for easy bug report."""
+    """Holds and wrap TemplateResults for easy bug report.
+
+    Aggregated `missing_keys`, `invalid_types`, `used_values` and
+    `hierarchy` are computed on first access and cached. Copies of cached
+    values are returned. Cache is cleared when items are changed.
 
-    def __init__(self, in_data, key=None, parent=None, strict=None):
+    Args:
+        fill_data (dict, optional): Data used for formatting of templates.
+            Children dictionaries without own data use data of their
+            parent.
+        templates_obj (Templates, optional): Object which formatted
+            templates. Children dictionaries without own object use object
+            of their parent.
+    """
+
+    def __init__(
+        self, in_data, key=None, parent=None, strict=None, fill_data=None,
+        templates_obj=None
+    ):
         super(TemplatesDict, self).__init__()
+        self._fill_data = fill_data
+        self._templates_obj = templates_obj
+        self._aggregates = {}
+        self._hierarchy = None
         for _key, _value in in_data.items():
             if isinstance(_value, dict):
                 _value = self.__class__(_value, _key, self)
@@ -424,6 +835,58 @@ class TemplatesDict(dict):
         if self.parent is None and strict is None:
             self.strict = True
 
+    def _clear_aggregates(self):
+        # Cached aggregates of parents exist only if children have them
+        item = self
+        while item is not None and item._aggregates:
+            item._aggregates = {}
+            item = item.parent
+
+    def __setitem__(self, key, value):
+        super(TemplatesDict, self).__setitem__(key, value)
+        self._clear_aggregates()
+
+    def __delitem__(self, key):
+        super(TemplatesDict, self).__delitem__(key)
+        self._clear_aggregates()
+
+    def pop(self, *args):
+        value = super(TemplatesDict, self).pop(*args)
+        self._clear_aggregates()
+        return value
+
+    def popitem(self):
+        item = super(TemplatesDict, self).popitem()
+        self._clear_aggregates()
+        return item
+
+    def setdefault(self, key, default=None):
+        value = super(TemplatesDict, self).setdefault(key, default)
+        self._clear_aggregates()
+        return value
+
+    def update(self, *args, **kwargs):
+        super(TemplatesDict, self).update(*args, **kwargs)
+        self._clear_aggregates()
+
+    def clear(self):
+        super(TemplatesDict, self).clear()
+        self._clear_aggregates()
+
+    @property
+    def fill_data(self):
+        """Data used for formatting of templates."""
+        if self._fill_data is not None or self.parent is None:
+            return self._fill_data
+        return self.parent.fill_data
+
+    @property
+    def templates_obj(self):
+        """Templates object which formatted templates."""
+        if self._templates_obj is not None or self.parent is None:
+            return self._templates_obj
+        return self.parent.templates_obj
+
     def __getitem__(self, key):
         # Raise error about missing key in anatomy.yaml
         if key not in self.keys():
@@ -454,48 +917,58 @@ class TemplatesDict(dict):
 
     def hierarchy(self):
         """Return dictionary keys one by one to root parent."""
-        if self.parent is None:
-            return []
-
-        hier_keys = []
-        par_hier = self.parent.hierarchy()
-        if par_hier:
-            hier_keys.extend(par_hier)
-        hier_keys.append(self.key)
-
-        return hier_keys
+        if self._hierarchy is None:
+            if self.parent is None:
+                self._hierarchy = ()
+            else:
+                self._hierarchy = (
+                    tuple(self.parent.hierarchy()) + (self.key, )
+                )
+        return list(self._hierarchy)
+
+    def _aggregate_values(self):
+        """Children templates results and dictionaries."""
+        return [
+            value
+            for value in self.values()
+            if isinstance(value, (TemplateResult, TemplatesDict))
+        ]
 
     @property
     def missing_keys(self):
         """Return missing keys of all children templates."""
-        missing_keys = []
-        for value in self.values():
-            missing_keys.extend(value.missing_keys)
-        return list(set(missing_keys))
+        missing_keys = self._aggregates.get("missing_keys")
+        if missing_keys is None:
+            missing_keys = set()
+            for value in self._aggregate_values():
+                missing_keys.update(value.missing_keys)
+            missing_keys = list(missing_keys)
+            self._aggregates["missing_keys"] = missing_keys
+        return list(missing_keys)
 
     @property
     def invalid_types(self):
         """Return invalid types of all children templates."""
-        invalid_types = {}
-        for value in self.values():
-            for invalid_type in value.invalid_types:
-                _invalid_types = {}
-                for key, val in invalid_type.items():
-                    if key in invalid_types:
-                        continue
-                    _invalid_types[key] = val
-                invalid_types = config.update_dict(
-                    invalid_types, _invalid_types
-                )
-        return invalid_types
+        invalid_types = self._aggregates.get("invalid_types")
+        if invalid_types is None:
+            invalid_types = {}
+            for value in self._aggregate_values():
+                for key, val in value.invalid_types.items():
+                    if key not in invalid_types:
+                        invalid_types[key] = val
+            self._aggregates["invalid_types"] = invalid_types
+        return dict(invalid_types)
 
     @property
     def used_values(self):
         """Return used values for all children templates."""
-        used_values = {}
-        for value in self.values():
-            used_values = config.update_dict(used_values, value.used_values)
-        return used_values
+        used_values = self._aggregates.get("used_values")
+        if used_values is None:
+            used_values = {}
+            for value in self._aggregate_values():
+                _merge_nested(used_values, value.used_values)
+            self._aggregates["used_values"] = used_values
+        return _merge_nested({}, used_values)
 
     def get_solved(self):
         """Get only solved key from templates."""
@@ -514,107 +987,1421 @@ class TemplatesDict(dict):
                 result[key] = value
         return self.__class__(result, key=self.key, parent=self.parent)
 
+    def _changed_value(self, value, changed_keys, fill_data, templates_obj):
+        """Template result for changed fill data or None if not affected."""
+        if not isinstance(value, TemplateResult):
+            return None
 
-class Templates:
-    key_pattern = re.compile(r"(\{.*?[^{0]*\})")
-    key_padding_pattern = re.compile(r"([^:]+)\S+[><]\S+")
-    sub_dict_pattern = re.compile(r"([^\[\]]+)")
-    optional_pattern = re.compile(r"(<.*?[^{0]*>)[^0-9]*?")
-
-    inner_key_pattern = re.compile(r"(\{@.*?[^{}0]*\})")
-    inner_key_name_pattern = re.compile(r"\{@(.*?[^{}0]*)\}")
+        compiled = templates_obj.compile_template(value.template)
+        referenced_keys = compiled.referenced_keys
+        if (
+            referenced_keys is not None
+            and referenced_keys.isdisjoint(changed_keys)
+        ):
+            return None
+        return templates_obj._format(value.template, fill_data)
 
-    templates_file_name = "default.yaml"
+    def _updated_items(self, changed_keys, fill_data, templates_obj):
+        output = {}
+        for key in self.keys():
+            value = dict.__getitem__(self, key)
+            if isinstance(value, TemplatesDict):
+                value = value._updated_items(
+                    changed_keys, fill_data, templates_obj
+                )
+            else:
+                new_value = self._changed_value(
+                    value, changed_keys, fill_data, templates_obj
+                )
+                if new_value is not None:
+                    value = new_value
+            output[key] = value
+        return output
 
-    def __init__(
-        self, project_name=None, keep_updated=False, roots=None, parent=None
-    ):
-        self._keep_updated = keep_updated
-        self._project_name = project_name
-        self._roots = roots
-        self.parent = parent
-        if parent is None and project_name is None:
-            log.warning((
-                "It is expected to enter project_name if Templates are created"
-                " out of Anatomy."
-            ))
+    def with_updates(self, **changed):
+        """Templates filled with the same data except changed keys.
 
-        self.loaded_project = None
-        self._templates = None
+        Only templates referencing any of changed keys are formatted again,
+        results of other templates are shared with this object. Useful when
+        the same templates are filled for each version or frame.
 
-    def __getitem__(self, key):
-        return self.templates[key]
+        Args:
+            **changed: New values of fill data keys.
 
-    def get(self, key, default=None):
-        return self.templates.get(key, default)
+        Returns:
+            TemplatesDict: New object of the same type with the same
+                `strict` attribute.
 
-    def reset(self):
-        self._templates = None
+        Raises:
+            ValueError: Templates were not filled with `Templates.format`.
+        """
+        fill_data = self.fill_data
+        templates_obj = self.templates_obj
+        if fill_data is None or templates_obj is None:
+            raise ValueError(
+                "Fill data of templates are not known. Templates must be"
+                " filled with `Templates.format` to be updated."
+            )
 
-    @property
-    def project_name(self):
-        if self.parent:
-            return self.parent.project_name
-        return self._project_name
+        fill_data = dict(fill_data)
+        fill_data.update(changed)
+        changed_keys = set(changed.keys())
+        return self.__class__(
+            self._updated_items(changed_keys, fill_data, templates_obj),
+            key=self.key,
+            parent=self.parent,
+            strict=self.strict,
+            fill_data=fill_data,
+            templates_obj=templates_obj
+        )
 
-    @property
-    def keep_updated(self):
-        if self.parent:
-            return self.parent.keep_updated
-        return self._keep_updated
 
-    @property
-    def roots(self):
-        if self.parent:
-            return self.parent.roots
-        return self._roots
+class LazyTemplatesDict(TemplatesDict):
+    """TemplatesDict where templates are formatted on first access.
 
-    @property
-    def templates(self):
-        if self.parent is None and self.keep_updated:
-            project = os.environ.get("AVALON_PROJECT", None)
-            if project is not None and project != self.project_name:
-                self._project_name = project
+    Values are `CompiledTemplate` objects and dictionaries of them until
+    their key is accessed. Formatted `TemplateResult` and children
+    `LazyTemplatesDict` replace them so each template is formatted only
+    once. Accessing values through `values`, `items`, `get`, `copy` or
+    `dict(obj)` formats requested templates too so output is the same as
+    output of `TemplatesDict`. Unsolved templates raise `TemplateUnsolved`
+    on copy when `strict` is set as copy accesses all keys.
 
-        if self.project_name != self.loaded_project:
-            self._templates = None
+    Python 2 copies values of dictionaries in `dict(obj)` and `**obj`
+    without `__getitem__` so all templates are formatted on creation there.
 
-        if self._templates is None:
-            self._templates = self._discover()
-            self.loaded_project = self.project_name
-        return self._templates
+    Templates affected by `with_updates` are formatted on first access too.
+    """
 
-    @staticmethod
-    def default_templates_raw():
-        """Return default templates raw data."""
-        path = os.path.join(
-            default_anatomy_dir_path(),
-            Templates.templates_file_name
+    def __init__(
+        self, in_data, key=None, parent=None, strict=None, fill_data=None,
+        templates_obj=None
+    ):
+        super(LazyTemplatesDict, self).__init__(
+            {}, key, parent, strict, fill_data, templates_obj
         )
-        with open(path, "r") as stream:
-            # QUESTION Should we not raise exception if file is invalid?
-            default_templates = yaml.load(
-                stream, Loader=yaml.loader.Loader
-            )
-        return default_templates
+        # Children dictionaries are created on first access
+        dict.update(self, in_data)
+        if not DICT_COPY_USES_GETITEM:
+            self._solve_all()
 
-    @staticmethod
-    def default_templates():
-        """Return default templates data with solved inner keys."""
-        return Templates.solve_template_inner_links(
-            Templates.default_templates_raw()
-        )
+    def _solve_value(self, key, value):
+        if isinstance(value, CompiledTemplate):
+            return value.format(self.fill_data)
 
-    @staticmethod
-    def project_overrides_path(project_name):
-        return os.path.join(
-            project_anatomy_overrides_dir_path(project_name),
-            Templates.templates_file_name
-        )
+        if isinstance(value, dict) and not isinstance(value, TemplatesDict):
+            return self.__class__(value, key, self)
+        return value
 
-    def _project_overrides_path(self):
-        """Returns path to project's overide template file."""
-        return Templates.project_overrides_path(self.project_name)
+    def _solve_item(self, key):
+        value = dict.__getitem__(self, key)
+        solved = self._solve_value(key, value)
+        if solved is not value:
+            dict.__setitem__(self, key, solved)
+        return solved
+
+    def _changed_value(self, value, changed_keys, fill_data, templates_obj):
+        if isinstance(value, TemplateResult):
+            value = templates_obj.compile_template(value.template)
+
+        elif not isinstance(value, CompiledTemplate):
+            return None
+
+        referenced_keys = value.referenced_keys
+        if (
+            referenced_keys is not None
+            and referenced_keys.isdisjoint(changed_keys)
+        ):
+            return None
+        return value
+
+    def _solve_all(self):
+        for key in self.keys():
+            self._solve_item(key)
+
+    def __getitem__(self, key):
+        if key in self:
+            self._solve_item(key)
+        return super(LazyTemplatesDict, self).__getitem__(key)
+
+    def __iter__(self):
+        # Overridden iteration makes `dict(obj)` and `**obj` use
+        # `__getitem__` instead of copying not formatted templates (Python 3)
+        return super(LazyTemplatesDict, self).__iter__()
+
+    def __repr__(self):
+        self._solve_all()
+        return super(LazyTemplatesDict, self).__repr__()
+
+    def __eq__(self, other):
+        self._solve_all()
+        if isinstance(other, LazyTemplatesDict):
+            other._solve_all()
+        return super(LazyTemplatesDict, self).__eq__(other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def get(self, key, default=None):
+        if key in self:
+            return self._solve_item(key)
+        return default
+
+    def values(self):
+        self._solve_all()
+        return super(LazyTemplatesDict, self).values()
+
+    def items(self):
+        self._solve_all()
+        return super(LazyTemplatesDict, self).items()
+
+    def copy(self):
+        self._solve_all()
+        return dict(self)
+
+    def pop(self, key, *args):
+        if key in self:
+            self._solve_item(key)
+        return super(LazyTemplatesDict, self).pop(key, *args)
+
+    def popitem(self):
+        key, value = super(LazyTemplatesDict, self).popitem()
+        return key, self._solve_value(key, value)
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self._solve_item(key)
+        return super(LazyTemplatesDict, self).setdefault(key, default)
+
+
+class TemplateKey(object):
+    """Single formatting key of compiled template.
+
+    Args:
+        text (str): Key as is in template e.g. `"{version:0>3}"`.
+        key (str): Key without padding e.g. `"version"` or `"project[code]"`.
+        key_subdict (tuple): Parts of subdictionary key e.g.
+            `("project", "code")`.
+        format_spec (str): Format specification of key e.g. `"0>3"`.
+    """
+
+    __slots__ = ("text", "key", "key_subdict", "first", "path", "format_spec")
+
+    def __init__(self, text, key, key_subdict, format_spec):
+        self.text = text
+        self.key = key
+        self.key_subdict = key_subdict
+        self.first = key_subdict[0] if len(key_subdict) > 1 else key
+        self.path = key_subdict[1:]
+        self.format_spec = format_spec
+
+    def validate(self, data):
+        """Return missing key and invalid type of key in data."""
+        return Templates._validate_key_parts(self.key, self.key_subdict, data)
+
+    def fill(self, data):
+        """Format value of key from data (same as `text.format(**data)`)."""
+        value = data[self.first]
+        for sub_key in self.path:
+            value = value[sub_key]
+        return format(value, self.format_spec)
+
+    def placeholder(self):
+        """Value filled in place of key which is missing or invalid."""
+        if self.path:
+            return self.text
+        return format("{" + self.key + "}", self.format_spec)
+
+    def resolve(self, data, fill_cache=None):
+        """Validate and fill key with data.
+
+        Args:
+            data (dict): Containing keys to be filled into template.
+            fill_cache (TemplateFillCache, optional): Cache of already
+                resolved keys which is used when data contain the same
+                unchanged value for the key.
+
+        Returns:
+            tuple: Missing key, invalid type, filled value and exception
+                raised during filling. Filled value is None if key is missing
+                or invalid.
+        """
+        if fill_cache is not None:
+            cached = fill_cache.get(self, data)
+            if cached is not None:
+                return cached
+
+        missing_key, invalid_type = self.validate(data)
+        value = None
+        error = None
+        if missing_key is None and invalid_type is None:
+            try:
+                value = self.fill(data)
+            except (TypeError, KeyError) as exc:
+                error = exc
+
+        result = (missing_key, invalid_type, value, error)
+        if fill_cache is not None:
+            fill_cache.set(self, data, result)
+        return result
+
+
+class TemplateFillCache(object):
+    """Resolved template keys shared across multiple fills of templates.
+
+    Result of key is reused only if data contain the very same object for
+    the key as when the key was resolved and the object can't change
+    (strings, numbers and roots). Each template key keeps only last result.
+
+    Args:
+        constant_values (list, optional): Mutable objects that won't change
+            during life of cache (e.g. roots injected to data).
+    """
+
+    def __init__(self, constant_values=None):
+        self._items = {}
+        self._constant_values = list(constant_values or [])
+        self.hits = 0
+        self.misses = 0
+
+    def _is_cacheable(self, value):
+        if isinstance(value, (StringType, numbers.Number, RootItem)):
+            return True
+
+        for constant_value in self._constant_values:
+            if value is constant_value:
+                return True
+        return False
+
+    def get(self, template_key, data):
+        """Return cached result of key or None if data changed."""
+        cached = self._items.get(template_key)
+        if cached is not None:
+            value, result = cached
+            if data.get(template_key.first, cached) is value:
+                self.hits += 1
+                return result
+        self.misses += 1
+        return None
+
+    def set(self, template_key, data, result):
+        """Store result of key if value in data can't change."""
+        value = data.get(template_key.first)
+        if template_key.first in data and self._is_cacheable(value):
+            self._items[template_key] = (value, result)
+
+
+class TemplateResultCache(object):
+    """Least recently used cache of filled templates.
+
+    Results are stored by template and values of all keys the template uses
+    so repeated filling with the same values is a dictionary lookup. Each
+    caller gets own copy of result so changes of its used values or missing
+    keys don't affect other results.
+
+    Args:
+        size (int): Maximum count of cached results.
+    """
+
+    def __init__(self, size=1024):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        """Return copy of cached result or None."""
+        with self._lock:
+            result = self._items.pop(key, None)
+            if result is None:
+                self.misses += 1
+                return None
+
+            # Move to the end as the most recently used
+            self._items[key] = result
+            self.hits += 1
+        return result._copy()
+
+    def set(self, key, result):
+        """Store copy of result and drop the least recently used results."""
+        result = result._copy()
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = result
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached results. Hit and miss counters are kept."""
+        with self._lock:
+            self._items.clear()
+
+
+class CompiledTemplate(object):
+    """Anatomy template parsed once to be filled without regex matching.
+
+    Template is split with the same patterns `Templates` are using but only
+    once. Each combination of valid and invalid optional groups is compiled
+    on first use into literal segments and keys which are filled in single
+    pass. Filling result is the same `TemplateResult` as result of regex
+    based formatting.
+
+    Templates which can't be compiled without changing result (e.g. escaped
+    curly brackets, attribute access or conversions) are formatted with
+    `Templates._format_legacy`.
+
+    Args:
+        template (str): Template with solved inner keys.
+        templates_obj (Templates): Object providing patterns and fallback.
+    """
+
+    formatter = string.Formatter()
+
+    # Regex patterns used for parsing values of keys from filled template
+    parse_default_pattern = r"[^/]+?"
+    parse_key_patterns = {
+        "hierarchy": r".*?"
+    }
+    numeric_spec_pattern = re.compile(r"^(0[>=]?[0-9]+d?|[0-9]*d)$")
+
+    def __init__(self, template, templates_obj):
+        self.template = template
+        self._templates_obj = templates_obj
+        self._variants = {}
+        self.optional_groups = self._compile_optional_groups()
+        self.template_keys = self._compile_template_keys()
+        self.referenced_keys = self._compile_referenced_keys()
+
+    def __repr__(self):
+        return "<{} \"{}\">".format(self.__class__.__name__, self.template)
+
+    def _compile_key(self, text):
+        """Create `TemplateKey` from key found by `key_pattern`.
+
+        Returns:
+            TemplateKey/None: None is returned if key can't be filled
+                without `str.format`.
+        """
+        templates_obj = self._templates_obj
+        key = str(text[1:-1])
+        key_padding = list(templates_obj.key_padding_pattern.findall(key))
+        if key_padding:
+            key = key_padding[0]
+
+        try:
+            parsed = list(self.formatter.parse(text))
+        except ValueError:
+            return None
+
+        if len(parsed) != 1:
+            return None
+
+        literal, field_name, format_spec, conversion = parsed[0]
+        if (
+            literal
+            or not field_name
+            or conversion is not None
+            or "{" in format_spec
+            or field_name != key
+            or "." in key
+            or "---" in key
+        ):
+            return None
+
+        field_text = "{" + field_name
+        if format_spec:
+            field_text += ":" + format_spec
+        if field_text + "}" != text:
+            return None
+
+        key_subdict = tuple(templates_obj.sub_dict_pattern.findall(key))
+        if len(key_subdict) <= 1:
+            if "[" in key or "]" in key or key.isdigit():
+                return None
+
+        else:
+            joined_subdict = key_subdict[0] + "".join(
+                "[{}]".format(sub_key) for sub_key in key_subdict[1:]
+            )
+            # Missing subdictionary keys with format specification are not
+            # replaced by `_format_legacy` and formatting would crash.
+            if (
+                format_spec
+                or joined_subdict != key
+                or any(sub_key.isdigit() for sub_key in key_subdict)
+            ):
+                return None
+
+        return TemplateKey(text, key, key_subdict, format_spec)
+
+    def _compile_template_keys(self):
+        """All unique keys of template including keys in optional groups.
+
+        Returns:
+            tuple/None: `TemplateKey` objects. None is returned if any key
+                can't be compiled.
+        """
+        output = []
+        used_texts = set()
+        for text in self._templates_obj.key_pattern.findall(self.template):
+            if text in used_texts:
+                continue
+            used_texts.add(text)
+            template_key = self._compile_key(text)
+            if template_key is None:
+                return None
+            output.append(template_key)
+        return tuple(output)
+
+    def _compile_referenced_keys(self):
+        """Top level keys of fill data used by template.
+
+        Returns:
+            frozenset/None: Key names or None if keys of template are not
+                known (template is formatted with legacy formatting).
+        """
+        if self.template_keys is None or self.optional_groups is None:
+            return None
+        return frozenset(
+            template_key.first for template_key in self.template_keys
+        )
+
+    def cache_key(self, data):
+        """Key of result for `TemplateResultCache`.
+
+        Key contains template and values of all keys used in the template.
+
+        Returns:
+            tuple/None: Cache key or None if result can't be cached (e.g.
+                value is not hashable).
+        """
+        if self.template_keys is None or self.optional_groups is None:
+            return None
+
+        values = [self.template]
+        for template_key in self.template_keys:
+            value = data.get(template_key.first, _MISSING)
+            for sub_key in template_key.path:
+                if value is _MISSING:
+                    break
+
+                if not isinstance(value, dict):
+                    return None
+                value = value.get(sub_key, _MISSING)
+
+            if value is _MISSING:
+                values.append(value)
+
+            elif value is None or isinstance(
+                value, (StringType, numbers.Number, RootItem)
+            ):
+                # Type is part of the key as e.g. `1` and `1.0` are equal
+                values.append((value.__class__, value))
+
+            else:
+                return None
+        return tuple(values)
+
+    def _compile_optional_groups(self):
+        """Prepare optional groups with their keys.
+
+        Returns:
+            list/None: Tuples with optional group and it's keys. None is
+                returned if any key can't be compiled.
+        """
+        templates_obj = self._templates_obj
+        output = []
+        for optional_group in (
+            templates_obj.optional_pattern.findall(self.template)
+        ):
+            keys = []
+            for text in templates_obj.key_pattern.findall(optional_group):
+                template_key = self._compile_key(text)
+                if template_key is None:
+                    return None
+                keys.append(template_key)
+            output.append((optional_group, keys))
+        return output
+
+    def _compile_variant(self, valid_groups):
+        """Compile template for specific combination of optional groups.
+
+        Args:
+            valid_groups (tuple): Boolean for each optional group.
+
+        Returns:
+            tuple/None: Literal segments, keys between them, if root is
+                used and descriptor of results. None is returned if template
+                can't be compiled.
+        """
+        template = self.template
+        for (optional_group, _), valid in zip(
+            self.optional_groups, valid_groups
+        ):
+            replacement = ""
+            if valid:
+                replacement = optional_group[1:-1]
+            template = template.replace(optional_group, replacement)
+
+        if "{{" in template or "}}" in template:
+            return None
+
+        try:
+            parsed = list(self.formatter.parse(template))
+        except ValueError:
+            return None
+
+        key_texts = self._templates_obj.key_pattern.findall(template)
+        literals = [""]
+        keys = []
+        for literal, field_name, _, _ in parsed:
+            literals[-1] += literal
+            if field_name is None:
+                continue
+
+            if len(keys) == len(key_texts):
+                return None
+
+            template_key = self._compile_key(key_texts[len(keys)])
+            if template_key is None or template_key.key != field_name:
+                return None
+            keys.append(template_key)
+            literals.append("")
+
+        if len(keys) != len(key_texts):
+            return None
+
+        # Replaced key would affect subdictionary keys with same first key.
+        simple_keys = set(key.key for key in keys if not key.path)
+        subdict_keys = set(key.first for key in keys if key.path)
+        if simple_keys & subdict_keys:
+            return None
+
+        has_root = any(key.first == "root" for key in keys)
+        descriptor = TemplateDescriptor(
+            self.template, tuple(keys), tuple(literals)
+        )
+        return (literals, keys, has_root, descriptor)
+
+    def _solve_optional_groups(self, data, fill_cache=None):
+        """Validate keys of optional groups.
+
+        Returns:
+            tuple: Validity of each optional group, missing keys and invalid
+                types of optional keys.
+        """
+        missing_optional = []
+        invalid_optional = []
+        valid_groups = []
+        for _, keys in self.optional_groups:
+            _missing_keys = []
+            _invalid_types = []
+            for template_key in keys:
+                missing_key, invalid_type, _, error = template_key.resolve(
+                    data, fill_cache
+                )
+                if missing_key is not None:
+                    _missing_keys.append(missing_key)
+
+                if invalid_type is not None:
+                    _invalid_types.append(invalid_type)
+
+                if error is not None:
+                    # Only missing keys are expected in optional groups
+                    if not isinstance(error, KeyError):
+                        raise error
+                    _missing_keys.append(template_key.key)
+
+            missing_optional.extend(_missing_keys)
+            invalid_optional.extend(_invalid_types)
+            valid_groups.append(not _missing_keys and not _invalid_types)
+        return tuple(valid_groups), missing_optional, invalid_optional
+
+    def _get_variant(self, valid_groups):
+        """Compiled variant for optional groups validity or False."""
+        variant = self._variants.get(valid_groups)
+        if variant is None:
+            variant = self._compile_variant(valid_groups) or False
+            self._variants[valid_groups] = variant
+        return variant
+
+    def format(self, data, fill_cache=None):
+        """Fill template with data.
+
+        Args:
+            data (dict): Containing keys to be filled into template.
+            fill_cache (TemplateFillCache, optional): Cache of resolved keys
+                shared across multiple fills.
+
+        Returns:
+            TemplateResult: Filled or partially filled template.
+        """
+        if self.optional_groups is None:
+            return self._templates_obj._format_legacy(self.template, data)
+
+        valid_groups, missing_optional, invalid_optional = (
+            self._solve_optional_groups(data, fill_cache)
+        )
+        variant = self._get_variant(valid_groups)
+        if variant is False:
+            return self._templates_obj._format_legacy(self.template, data)
+
+        literals, keys, has_root, descriptor = variant
+        invalid_required = []
+        missing_required = []
+        replace_keys = set()
+        values = []
+        for template_key in keys:
+            missing_key, invalid_type, value, error = template_key.resolve(
+                data, fill_cache
+            )
+            if invalid_type is not None:
+                invalid_required.append(invalid_type)
+                replace_keys.add(template_key.key)
+
+            elif missing_key is not None:
+                missing_required.append(missing_key)
+                replace_keys.add(template_key.key)
+
+            elif error is not None:
+                missing_required.append(template_key.key)
+                replace_keys.add(template_key.key)
+            values.append(value)
+
+        solved = len(missing_required) == 0 and len(invalid_required) == 0
+        if solved:
+            # Used values are created from values on first access
+            values = tuple(values)
+            used_values = None
+            root_used = has_root
+
+        else:
+            used_values = {}
+            for template_key, value in zip(keys, values):
+                if template_key.key in replace_keys:
+                    continue
+
+                if not template_key.path:
+                    used_values[template_key.key] = value
+                else:
+                    used_values = self._templates_obj._merge_used_values(
+                        used_values, template_key.key_subdict, value
+                    )
+            root_used = "root" in used_values
+
+        missing_keys = missing_required + missing_optional
+        invalid_types = invalid_required + invalid_optional
+
+        filled_items = [literals[0]]
+        for template_key, value, literal in zip(keys, values, literals[1:]):
+            if template_key.key in replace_keys:
+                value = template_key.placeholder()
+            filled_items.append(value)
+            filled_items.append(literal)
+        filled_template = "".join(filled_items)
+
+        rootless_path = None
+        if (
+            root_used
+            and "root" not in missing_keys
+            and not any("root" in item for item in invalid_types)
+        ):
+            # Rootless path of solved result is created on first access
+            rootless_path = _MISSING
+            if not solved:
+                rootless_items = [literals[0]]
+                for template_key, value, literal in zip(
+                    keys, values, literals[1:]
+                ):
+                    if template_key.key in replace_keys:
+                        value = template_key.placeholder()
+                    elif template_key.first == "root":
+                        value = format(
+                            "{" + template_key.key + "}",
+                            template_key.format_spec
+                        )
+                    rootless_items.append(value)
+                    rootless_items.append(literal)
+                rootless_path = "".join(rootless_items)
+
+        return TemplateResult.from_descriptor(
+            filled_template, descriptor, solved, rootless_path,
+            used_values, missing_keys, invalid_types,
+            values if solved else None
+        )
+
+    def split_by_key(self, data, key):
+        """Fill template except one key and split it by the key occurrences.
+
+        It is expected that template is solved with entered data.
+
+        Args:
+            data (dict): Containing keys to be filled into template. Value of
+                `key` is used only to validate optional groups.
+            key (str): Key which is not filled e.g. `"frame"`.
+
+        Returns:
+            tuple/None: Filled parts of template around occurrences of the key
+                and format specifications of the occurrences. None is returned
+                if template can't be split.
+        """
+        if self.optional_groups is None:
+            return None
+
+        valid_groups, _, _ = self._solve_optional_groups(data)
+        variant = self._get_variant(valid_groups)
+        if variant is False:
+            return None
+
+        literals, keys, _, _ = variant
+        parts = [literals[0]]
+        format_specs = []
+        for template_key, literal in zip(keys, literals[1:]):
+            if template_key.key == key:
+                format_specs.append(template_key.format_spec)
+                parts.append(literal)
+                continue
+
+            if template_key.first == key:
+                return None
+            parts[-1] += template_key.fill(data) + literal
+        return parts, format_specs
+
+    def _key_parse_pattern(self, template_key, roots):
+        """Regex pattern matching value of key in filled template."""
+        if template_key.first == "root" and roots is not None:
+            root_item = roots
+            for key in template_key.path:
+                if not hasattr(root_item, "items") or key not in root_item:
+                    root_item = None
+                    break
+                root_item = root_item[key]
+
+            if isinstance(root_item, RootItem):
+                root_values = sorted(
+                    set(
+                        value
+                        for value in root_item.cleaned_data.values()
+                        if value
+                    ),
+                    key=len,
+                    reverse=True
+                )
+                if root_values:
+                    return "|".join(re.escape(value) for value in root_values)
+
+        if template_key.key in self.parse_key_patterns:
+            return self.parse_key_patterns[template_key.key]
+
+        if self.is_numeric_key(template_key):
+            return r"-?[0-9]+"
+        return self.parse_default_pattern
+
+    def is_numeric_key(self, template_key):
+        """Key is filled with number if has zero padding or "d" type."""
+        return bool(
+            template_key.format_spec
+            and self.numeric_spec_pattern.match(template_key.format_spec)
+        )
+
+    def parse_pattern(self, group_prefix="g", roots=None, values=None):
+        """Regex pattern matching paths filled by the template.
+
+        Optional groups are optional in pattern. Repeated keys must have
+        the same value in path.
+
+        Args:
+            group_prefix (str): Prefix of named groups in pattern.
+            roots (RootItem/dict, optional): Roots of which values are used
+                for matching root keys.
+            values (dict, optional): Filled values of keys by key text
+                (e.g. `"{version:0>3}"`). The values must be in path as they
+                are and are not captured by groups.
+
+        Returns:
+            tuple/None: Pattern (str), list of tuples with group name and
+                `TemplateKey` and list of literal parts which must be in
+                each filled path. None is returned if template can't be
+                parsed.
+        """
+        template = self.template
+        items = []
+        groups = []
+        group_names = {}
+        required_literals = []
+        literal = ""
+        depth = 0
+        idx = 0
+        while idx <= len(template):
+            char = template[idx] if idx < len(template) else None
+            if (
+                char not in ("{", "<", ">", None)
+                or (char == ">" and not depth)
+            ):
+                literal += char
+                idx += 1
+                continue
+
+            items.append(re.escape(literal))
+            if literal and depth == 0:
+                required_literals.append(literal)
+            literal = ""
+
+            if char == "{":
+                end_idx = template.find("}", idx)
+                if end_idx < 0:
+                    return None
+
+                text = template[idx:end_idx + 1]
+                template_key = self._compile_key(text)
+                if template_key is None:
+                    return None
+
+                if values is not None and text in values:
+                    items.append(re.escape(values[text]))
+                    idx = end_idx + 1
+                    continue
+
+                group_name = group_names.get(text)
+                if group_name is not None:
+                    items.append("(?P={})".format(group_name))
+                else:
+                    group_name = "{}{}".format(group_prefix, len(groups))
+                    group_names[text] = group_name
+                    groups.append((group_name, template_key))
+                    items.append("(?P<{}>{})".format(
+                        group_name,
+                        self._key_parse_pattern(template_key, roots)
+                    ))
+                idx = end_idx + 1
+                continue
+
+            if char == "<":
+                items.append("(?:")
+                depth += 1
+
+            elif char == ">":
+                items.append(")?")
+                depth -= 1
+            idx += 1
+
+        if depth != 0:
+            return None
+
+        return "".join(items), groups, required_literals
+
+
+class TemplatesParser(object):
+    """Find template and data which were used to fill a path.
+
+    Candidate templates are sorted from the most specific (longest literal
+    part). Literal parts of template which are not in optional groups are
+    checked with substring search before regex is used so most of
+    candidates are skipped without regex matching.
+
+    Args:
+        compiled_templates (list): Tuples with template key (str) and
+            `CompiledTemplate`. Duplicated templates are skipped.
+        roots (RootItem/dict, optional): Roots used for matching root keys.
+    """
+
+    def __init__(self, compiled_templates, roots=None):
+        candidates = []
+        used_templates = set()
+        for template_key, compiled in compiled_templates:
+            if compiled.template in used_templates:
+                continue
+            used_templates.add(compiled.template)
+
+            result = compiled.parse_pattern(roots=roots)
+            if result is None:
+                log.debug((
+                    "Template \"{}\" can't be used for parsing."
+                ).format(compiled.template))
+                continue
+
+            pattern, groups, required_literals = result
+            # Longer literals are less common so are checked first
+            required_literals = tuple(sorted(
+                set(required_literals), key=len, reverse=True
+            ))
+            candidates.append((
+                sum(len(literal) for literal in required_literals),
+                template_key,
+                compiled,
+                re.compile("^(?:" + pattern + r")\Z"),
+                groups,
+                required_literals
+            ))
+
+        candidates.sort(key=lambda item: item[0], reverse=True)
+        self.candidates = [candidate[1:] for candidate in candidates]
+
+    @staticmethod
+    def _data_from_match(match, compiled, groups):
+        """Convert matched groups to data or None if values don't match."""
+        data = {}
+        values = {}
+        for group_name, template_key in groups:
+            value = match.group(group_name)
+            if value is None:
+                continue
+
+            if compiled.is_numeric_key(template_key):
+                value = int(value)
+
+            if template_key.key in values:
+                if values[template_key.key] != value:
+                    return None
+                continue
+
+            values[template_key.key] = value
+            if not template_key.path:
+                data[template_key.key] = value
+                continue
+
+            sub_data = data
+            for key in template_key.key_subdict[:-1]:
+                if not isinstance(sub_data.get(key), dict):
+                    sub_data[key] = {}
+                sub_data = sub_data[key]
+            sub_data[template_key.key_subdict[-1]] = value
+        return data
+
+    def parse(self, path):
+        """Find template and data of path.
+
+        Args:
+            path (str): Path which was filled by one of templates.
+
+        Returns:
+            tuple: Template key (str) and data (dict) which would fill the
+                path. Returned value is `(None, None)` if path does not match
+                any template.
+        """
+        path = str(path).replace("\\", "/")
+        for candidate in self.candidates:
+            template_key, compiled, regex, groups, required_literals = (
+                candidate
+            )
+            for literal in required_literals:
+                if literal not in path:
+                    break
+            else:
+                match = regex.match(path)
+                if match is None:
+                    continue
+
+                data = self._data_from_match(match, compiled, groups)
+                if data is not None:
+                    return template_key, data
+
+        return None, None
+
+    def parse_many(self, paths):
+        """Find template and data for each path.
+
+        Args:
+            paths (iterable): Paths filled by templates.
+
+        Yields:
+            tuple: Template key and data for each path, `(None, None)` for
+                paths which don't match any template.
+        """
+        for path in paths:
+            yield self.parse(path)
+
+
+def list_directory(path):
+    """Names of items in directory.
+
+    Returns:
+        tuple/None: Names or None if directory can't be listed.
+    """
+    try:
+        scandir = getattr(os, "scandir", None)
+        if scandir is None:
+            return tuple(os.listdir(path))
+
+        with contextlib.closing(scandir(path)) as entries:
+            return tuple(entry.name for entry in entries)
+
+    except OSError:
+        return None
+
+
+def _stat_path(path):
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _stat_directory_items(dir_path, items):
+    """Stat results of paths in one directory.
+
+    Args:
+        dir_path (str): Path to directory.
+        items (list): Tuples with path and its name in directory. Paths
+            without name (e.g. root of filesystem) are checked with stat.
+
+    Returns:
+        list: Tuples with path and stat result or None.
+    """
+    output = [(path, _stat_path(path)) for path, name in items if not name]
+    items = [item for item in items if item[1]]
+    if len(items) < 2:
+        output.extend((path, _stat_path(path)) for path, _ in items)
+        return output
+
+    scandir = getattr(os, "scandir", None)
+    entries = {}
+    try:
+        if scandir is None:
+            for name in os.listdir(dir_path):
+                entries[os.path.normcase(name)] = None
+        else:
+            with contextlib.closing(scandir(dir_path)) as dir_entries:
+                for entry in dir_entries:
+                    entries[os.path.normcase(entry.name)] = entry
+
+    except OSError:
+        output.extend((path, None) for path, _ in items)
+        return output
+
+    for path, name in items:
+        name = os.path.normcase(name)
+        stat = None
+        if name in entries:
+            entry = entries[name]
+            if entry is None:
+                stat = _stat_path(path)
+            else:
+                # Stat data are part of listing on Windows
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    pass
+        output.append((path, stat))
+    return output
+
+
+def stat_many(paths, workers=8):
+    """Stat results of many paths with less filesystem round-trips.
+
+    Paths are grouped by parent directory. Directory with more than one of
+    the paths is listed once and only existing paths are checked with stat.
+    Directories are processed in thread pool so latency of network
+    filesystems overlaps.
+
+    Args:
+        paths (iterable): Paths to check.
+        workers (int, optional): Count of threads. Paths are checked in
+            current thread when lower than 2.
+
+    Returns:
+        dict: Stat result (`os.stat_result`) by path. Value is None if path
+            does not exist or can't be accessed.
+    """
+    items_by_dir = collections.OrderedDict()
+    for path in paths:
+        dir_path, name = os.path.split(os.path.normpath(path))
+        # Root of filesystem (e.g. "/" or "C:\\") has no name and relative
+        # parents are not in listing of their directory
+        if name in (os.curdir, os.pardir):
+            name = None
+        items_by_dir.setdefault(dir_path or os.curdir, []).append(
+            (path, name)
+        )
+
+    args = list(items_by_dir.items())
+    if workers is None or workers < 2 or len(args) < 2:
+        results = [_stat_directory_items(*arg) for arg in args]
+
+    else:
+        from multiprocessing.pool import ThreadPool
+
+        pool = ThreadPool(min(workers, len(args)))
+        try:
+            results = pool.map(lambda arg: _stat_directory_items(*arg), args)
+        finally:
+            pool.close()
+            pool.join()
+
+    output = {}
+    for result in results:
+        output.update(result)
+    return output
+
+
+def _listed_directory(dir_path):
+    """Path of directory which can be listed.
+
+    Root values are cleaned from trailing slash so filled root directory
+    can be empty string or drive without separator (e.g. `"C:"`) which
+    would be current directory of the drive.
+    """
+    drive, path = os.path.splitdrive(dir_path)
+    if not path.strip("/\\"):
+        return drive + "/"
+    return dir_path
+
+
+class DirectoryListingCache(object):
+    """Names of items in directories cached by directory modification time.
+
+    Directory is listed again only when its modification time changed so
+    repeated lookups cost one `os.stat` call. Listing of directory modified
+    in last `racy_seconds` is not cached as filesystems with low time
+    resolution may not change modification time on next change.
+    """
+
+    racy_seconds = 2.0
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def list_directory(self, path):
+        """Names of items in directory.
+
+        Returns:
+            tuple/None: Names or None if directory can't be listed.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        mtime = getattr(stat, "st_mtime_ns", None)
+        if mtime is None:
+            mtime = stat.st_mtime
+
+        with self._lock:
+            item = self._items.get(path)
+            if item is not None and item[0] == mtime:
+                self.hits += 1
+                return item[1]
+            self.misses += 1
+
+        names = list_directory(path)
+        if names is not None and time.time() - stat.st_mtime > (
+            self.racy_seconds
+        ):
+            with self._lock:
+                # Modification time, names and values created from names
+                self._items[path] = (mtime, names, {})
+        return names
+
+    def derived(self, path, key, func):
+        """Value created from names in directory by function.
+
+        Value is cached together with listing of directory.
+
+        Args:
+            path (str): Path to directory.
+            key (object): Hashable key of value.
+            func (callable): Receive names (or None) and return value.
+        """
+        names = self.list_directory(path)
+        with self._lock:
+            item = self._items.get(path)
+            if item is None or item[1] is not names:
+                item = None
+            else:
+                value = item[2].get(key, _MISSING)
+                if value is not _MISSING:
+                    return value
+
+        value = func(names)
+        if item is not None:
+            with self._lock:
+                item[2][key] = value
+        return value
+
+    def clear(self):
+        """Remove all cached listings. Hit and miss counters are kept."""
+        with self._lock:
+            self._items.clear()
+
+
+class Templates:
+    key_pattern = re.compile(r"(\{.*?[^{0]*\})")
+    key_padding_pattern = re.compile(r"([^:]+)\S+[><]\S+")
+    sub_dict_pattern = re.compile(r"([^\[\]]+)")
+    optional_pattern = re.compile(r"(<.*?[^{0]*>)[^0-9]*?")
+
+    inner_key_pattern = re.compile(r"(\{@.*?[^{}0]*\})")
+    inner_key_name_pattern = re.compile(r"\{@(.*?[^{}0]*)\}")
+
+    templates_file_name = "default.yaml"
+
+    def __init__(
+        self, project_name=None, keep_updated=False, roots=None, parent=None,
+        result_cache_size=None
+    ):
+        self._keep_updated = keep_updated
+        self._project_name = project_name
+        self._roots = roots
+        self.parent = parent
+        if parent is None and project_name is None:
+            log.warning((
+                "It is expected to enter project_name if Templates are created"
+                " out of Anatomy."
+            ))
+
+        self.loaded_project = None
+        self._templates = None
+        self._compiled_templates = {}
+        self._compiled_tree = None
+        self._parsers = {}
+        self.result_cache = None
+        self.set_result_cache_size(result_cache_size)
+        self.directory_cache = DirectoryListingCache()
+
+    def __getitem__(self, key):
+        return self.templates[key]
+
+    def get(self, key, default=None):
+        return self.templates.get(key, default)
+
+    def reset(self):
+        self._templates = None
+        self._compiled_templates = {}
+        self._compiled_tree = None
+        self._parsers = {}
+        if self.result_cache is not None:
+            self.result_cache.clear()
+        self.directory_cache.clear()
+
+    def set_result_cache_size(self, size):
+        """Enable, resize or disable cache of filled templates.
+
+        Args:
+            size (int/None): Maximum count of cached results. Cache is
+                disabled when size is not set or is 0.
+        """
+        if not size:
+            self.result_cache = None
+
+        elif self.result_cache is None:
+            self.result_cache = TemplateResultCache(size)
+
+        else:
+            self.result_cache.size = size
+
+    @property
+    def project_name(self):
+        if self.parent:
+            return self.parent.project_name
+        return self._project_name
+
+    @property
+    def keep_updated(self):
+        if self.parent:
+            return self.parent.keep_updated
+        return self._keep_updated
+
+    @property
+    def roots(self):
+        if self.parent:
+            return self.parent.roots
+        return self._roots
+
+    @property
+    def templates(self):
+        if self.parent is None and self.keep_updated:
+            project = os.environ.get("AVALON_PROJECT", None)
+            if project is not None and project != self.project_name:
+                self._project_name = project
+
+        if self.project_name != self.loaded_project:
+            self._templates = None
+
+        if self._templates is None:
+            self._templates = self._discover()
+            self._compiled_templates = {}
+            self._compiled_tree = None
+            self._parsers = {}
+            if self.result_cache is not None:
+                self.result_cache.clear()
+            self.loaded_project = self.project_name
+        return self._templates
+
+    def compile_template(self, template):
+        """Return `CompiledTemplate` for template string.
+
+        Compiled templates are cached until templates are reloaded.
+        """
+        compiled = self._compiled_templates.get(template)
+        if compiled is None:
+            compiled = CompiledTemplate(template, self)
+            self._compiled_templates[template] = compiled
+        return compiled
+
+    @staticmethod
+    def default_templates_path():
+        """Return path to default templates file."""
+        return os.path.join(
+            default_anatomy_dir_path(),
+            Templates.templates_file_name
+        )
+
+    @staticmethod
+    def _load_yaml(path):
+        with open(path, "r") as stream:
+            # QUESTION Should we not raise exception if file is invalid?
+            return yaml.load(stream, Loader=yaml.loader.Loader)
+
+    @staticmethod
+    def _load_solved_templates(path):
+        """Load templates from yaml file and solve their inner links.
+
+        Solved templates are cached on disk and loaded from cache until the
+        file is modified.
+        """
+        return anatomy_file_cache.load(
+            [path],
+            lambda: Templates.solve_template_inner_links(
+                Templates._load_yaml(path)
+            ),
+            key="solved_templates"
+        )
+
+    @staticmethod
+    def default_templates_raw():
+        """Return default templates raw data."""
+        return Templates._load_yaml(Templates.default_templates_path())
+
+    @staticmethod
+    def default_templates():
+        """Return default templates data with solved inner keys."""
+        return Templates._load_solved_templates(
+            Templates.default_templates_path()
+        )
+
+    @staticmethod
+    def project_overrides_path(project_name):
+        return os.path.join(
+            project_anatomy_overrides_dir_path(project_name),
+            Templates.templates_file_name
+        )
+
+    def _project_overrides_path(self):
+        """Returns path to project's overide template file."""
+        return Templates.project_overrides_path(self.project_name)
 
     @staticmethod
     def save_project_overrides(project_name, templates=None, override=False):
@@ -666,12 +2453,9 @@ class Templates:
         if self.project_name is not None:
             project_templates_path = self._project_overrides_path()
             if os.path.exists(project_templates_path):
-                # QUESTION Should we not raise exception if file is invalid?
-                with open(project_templates_path, "r") as stream:
-                    proj_templates = yaml.load(
-                        stream, Loader=yaml.loader.Loader
-                    )
-                return Templates.solve_template_inner_links(proj_templates)
+                return Templates._load_solved_templates(
+                    project_templates_path
+                )
 
             else:
                 # QUESTION create project specific if not found?
@@ -683,90 +2467,189 @@ class Templates:
         return self.default_templates()
 
     @classmethod
-    def replace_inner_keys(cls, matches, value, key_values, key):
-        """Replacement of inner keys in template values."""
-        for match in matches:
-            anatomy_sub_keys = (
-                cls.inner_key_name_pattern.findall(match)
-            )
-            if key in anatomy_sub_keys:
-                raise ValueError((
-                    "Unsolvable recursion in inner keys, "
-                    "key: \"{}\" is in his own value."
-                    " Can't determine source, please check Anatomy templates."
-                ).format(key))
-
-            for anatomy_sub_key in anatomy_sub_keys:
-                replace_value = key_values.get(anatomy_sub_key)
-                if replace_value is None:
+    def _inner_key_references(cls, key_values, keys=None):
+        """Inner keys used in string values.
+
+        Args:
+            key_values (dict): Values of keys in template group.
+            keys (iterable, optional): Keys which should be checked. All keys
+                are checked when not set.
+
+        Returns:
+            dict: Key with list of tuples containing matched inner key
+                (e.g. `"{@version}"`) and names of referenced keys. Only
+                keys with string values containing inner keys are returned.
+        """
+        if keys is None:
+            keys = key_values.keys()
+
+        references = {}
+        for key in keys:
+            value = key_values[key]
+            if not isinstance(value, StringType):
+                continue
+
+            matches = cls.inner_key_pattern.findall(value)
+            if matches:
+                references[key] = [
+                    (match, cls.inner_key_name_pattern.findall(match))
+                    for match in matches
+                ]
+        return references
+
+    @classmethod
+    def _fill_inner_keys(cls, key, value, references, key_values, solved):
+        """Replace inner keys in value with values of referenced keys."""
+        for match, sub_keys in references:
+            replacement = None
+            for sub_key in sub_keys:
+                sub_value = solved.get(sub_key)
+                if sub_value is None:
+                    sub_value = key_values.get(sub_key)
+
+                if sub_value is None:
                     raise KeyError((
                         "Anatomy templates can't be filled."
                         " Anatomy key `{0}` has"
                         " invalid inner key `{1}`."
-                    ).format(key, anatomy_sub_key))
+                    ).format(key, sub_key))
 
-                valid = isinstance(replace_value, (numbers.Number, StringType))
+                valid = isinstance(sub_value, (numbers.Number, StringType))
                 if not valid:
                     raise ValueError((
                         "Anatomy templates can't be filled."
                         " Anatomy key `{0}` has"
                         " invalid inner key `{1}`"
                         " with value `{2}`."
-                    ).format(key, anatomy_sub_key, str(replace_value)))
+                    ).format(key, sub_key, str(sub_value)))
+
+                if replacement is None:
+                    replacement = str(sub_value)
+
+            if replacement is not None:
+                value = value.replace(match, replacement)
+        return value
+
+    @classmethod
+    def _solve_inner_keys_graph(cls, key_values, references, solved):
+        """Solve values with inner keys in topological order.
+
+        Keys are solved with depth first search in dependency graph so each
+        value is filled only once after all values it references are solved.
+
+        Args:
+            key_values (dict): Values of keys in template group.
+            references (dict): Output of `_inner_key_references`.
+            solved (dict): Already solved values. Solved values are added.
+
+        Returns:
+            list: Keys solved by this call in topological order.
+
+        Raises:
+            ValueError: When inner keys create a cycle. Message contains
+                cycle path.
+        """
+        order = []
+        for root_key in references:
+            if root_key in solved:
+                continue
+
+            path = [root_key]
+            path_keys = set(path)
+            iterators = [cls._referenced_keys(references[root_key])]
+            while iterators:
+                key = path[-1]
+                for sub_key in iterators[-1]:
+                    if sub_key in solved or sub_key not in references:
+                        continue
+
+                    if sub_key in path_keys:
+                        cycle = path[path.index(sub_key):] + [sub_key]
+                        raise ValueError((
+                            "Unsolvable recursion in inner keys: {}."
+                            " Can't determine source,"
+                            " please check Anatomy templates."
+                        ).format(" -> ".join(
+                            "\"{}\"".format(item) for item in cycle
+                        )))
+
+                    path.append(sub_key)
+                    path_keys.add(sub_key)
+                    iterators.append(
+                        cls._referenced_keys(references[sub_key])
+                    )
+                    break
 
-                value = value.replace(match, str(replace_value))
+                else:
+                    iterators.pop()
+                    path.pop()
+                    path_keys.remove(key)
+                    solved[key] = cls._fill_inner_keys(
+                        key, key_values[key], references[key],
+                        key_values, solved
+                    )
+                    order.append(key)
+        return order
 
-        return value
+    @staticmethod
+    def _referenced_keys(references):
+        """Iterator over keys referenced by inner keys of one value."""
+        return (
+            sub_key
+            for _, sub_keys in references
+            for sub_key in sub_keys
+        )
 
     @classmethod
-    def prepare_inner_keys(cls, key_values):
-        """Check values of inner keys.
+    def prepare_inner_keys(cls, key_values, solved=None):
+        """Solve values of inner keys.
 
         Check if inner key exist in template group and has valid value.
-        It is also required to avoid infinite loop with unsolvable recursion
-        when first inner key's value refers to second inner key's value where
-        first is used.
-        """
-        keys_to_solve = set(key_values.keys())
-        while True:
-            found = False
-            for key in tuple(keys_to_solve):
-                value = key_values[key]
-
-                if isinstance(value, StringType):
-                    matches = cls.inner_key_pattern.findall(value)
-                    if not matches:
-                        keys_to_solve.remove(key)
-                        continue
+        Values are solved in order given by dependencies between keys so
+        each value is filled only once. Cycles in inner keys are reported
+        with `ValueError`.
 
-                    found = True
-                    key_values[key] = cls.replace_inner_keys(
-                        matches, value, key_values, key
-                    )
-                    continue
+        Args:
+            key_values (dict): Values of keys in template group. Values are
+                replaced with solved values.
+            solved (dict, optional): Values which are already solved (e.g.
+                global keys not affected by group).
 
-                elif not isinstance(value, dict):
-                    keys_to_solve.remove(key)
-                    continue
+        Returns:
+            dict: Entered `key_values` with solved values.
+        """
+        if solved is None:
+            solved = {}
+            references = cls._inner_key_references(key_values)
+        else:
+            solved = dict(solved)
+            references = cls._inner_key_references(
+                key_values, set(key_values.keys()) - set(solved.keys())
+            )
 
-                subdict_found = False
-                for _key, _value in tuple(value.items()):
-                    matches = cls.inner_key_pattern.findall(_value)
-                    if not matches:
-                        continue
+        cls._solve_inner_keys_graph(key_values, references, solved)
+        for key, value in solved.items():
+            key_values[key] = value
 
-                    subdict_found = True
-                    found = True
-                    key_values[key][_key] = cls.replace_inner_keys(
-                        matches, _value, key_values,
-                        "{}.{}".format(key, _key)
-                    )
+        for key, value in tuple(key_values.items()):
+            if not isinstance(value, dict):
+                continue
 
-                if not subdict_found:
-                    keys_to_solve.remove(key)
+            for _key, _value in tuple(value.items()):
+                matches = cls.inner_key_pattern.findall(_value)
+                if not matches:
+                    continue
 
-            if not found:
-                break
+                value[_key] = cls._fill_inner_keys(
+                    "{}.{}".format(key, _key),
+                    _value,
+                    [
+                        (match, cls.inner_key_name_pattern.findall(match))
+                        for match in matches
+                    ],
+                    key_values,
+                    solved
+                )
 
         return key_values
 
@@ -818,17 +2701,44 @@ class Templates:
                 continue
             default_key_values[key] = templates.pop(key)
 
+        # Global keys are solved only once
+        default_references = cls._inner_key_references(default_key_values)
+        solved_defaults = {}
+        order = cls._solve_inner_keys_graph(
+            default_key_values, default_references, solved_defaults
+        )
+
+        # Global keys which use the key in their values
+        dependents = collections.defaultdict(set)
+        for key in order:
+            for sub_key in cls._referenced_keys(default_references[key]):
+                dependents[sub_key].add(key)
+
         keys_by_subkey = {}
         for sub_key, sub_value in templates.items():
+            # Solved global keys can be reused if group does not override
+            #   them or any key they depend on
+            solved = dict(solved_defaults)
+            queue = list(sub_value.keys())
+            while queue:
+                key = queue.pop()
+                for dependent in dependents.get(key, ()):
+                    if dependent in solved:
+                        solved.pop(dependent)
+                        queue.append(dependent)
+
+            for key in sub_value.keys():
+                solved.pop(key, None)
+
             key_values = {}
             key_values.update(default_key_values)
             key_values.update(sub_value)
-            keys_by_subkey[sub_key] = cls.prepare_inner_keys(key_values)
-
-        default_keys_by_subkeys = cls.prepare_inner_keys(default_key_values)
+            keys_by_subkey[sub_key] = cls.prepare_inner_keys(
+                key_values, solved
+            )
 
-        for key, value in default_keys_by_subkeys.items():
-            keys_by_subkey[key] = value
+        for key, value in default_key_values.items():
+            keys_by_subkey[key] = solved_defaults.get(key, value)
 
         return keys_by_subkey
 
@@ -896,18 +2806,32 @@ class Templates:
 
     def _validate_data_key(self, key, data):
         """Check and prepare missing keys and invalid types of template."""
-        result = {
-            "missing_key": None,
-            "invalid_type": None
-        }
-
         # check if key expects subdictionary keys (e.g. project[name])
         key_subdict = list(self.sub_dict_pattern.findall(key))
+        missing_key, invalid_type = self._validate_key_parts(
+            key, key_subdict, data
+        )
+        return {
+            "missing_key": missing_key,
+            "invalid_type": invalid_type
+        }
+
+    @staticmethod
+    def _validate_key_parts(key, key_subdict, data):
+        """Validate key already split into subdictionary keys.
+
+        Args:
+            key (str): Key without padding (e.g. "project[name]").
+            key_subdict (list): Key parts found by `sub_dict_pattern`.
+            data (dict): Containing keys to be filled into template.
+
+        Returns:
+            tuple: Missing key (str/None) and invalid type (dict/None).
+        """
         used_keys = []
         if len(key_subdict) <= 1:
             if key not in data:
-                result["missing_key"] = key
-                return result
+                return (key, None)
 
             used_keys.append(key)
             value = data[key]
@@ -943,23 +2867,18 @@ class Templates:
                         invalid_key += "[{0}]".format(sub_key)
 
                 if missing_key:
-                    result["missing_key"] = invalid_key
+                    return (invalid_key, None)
 
-                elif invalid_type:
-                    result["invalid_type"] = {invalid_key: type(value)}
-
-                return result
+                return (None, {invalid_key: type(value)})
 
         if isinstance(value, (numbers.Number, Roots, RootItem)):
-            return result
+            return (None, None)
 
         for inh_class in type(value).mro():
             if inh_class == StringType:
-                return result
+                return (None, None)
 
-        result["missing_key"] = key
-        result["invalid_type"] = {key: type(value)}
-        return result
+        return (key, {key: type(value)})
 
     def _merge_used_values(self, current_used, keys, value):
         key = keys[0]
@@ -1038,6 +2957,32 @@ class Templates:
         return template.format(**final_data)
 
     def _format(self, orig_template, data):
+        """Fill template using it's compiled version.
+
+        Args:
+            template (str): Anatomy template which will be formatted.
+            data (dict): Containing keys to be filled into template.
+
+        Returns:
+            TemplateResult: Filled or partially filled template containing all
+                data needed or missing for filling template.
+        """
+        compiled = self.compile_template(orig_template)
+        result_cache = self.result_cache
+        if result_cache is None:
+            return compiled.format(data)
+
+        cache_key = compiled.cache_key(data)
+        if cache_key is None:
+            return compiled.format(data)
+
+        result = result_cache.get(cache_key)
+        if result is None:
+            result = compiled.format(data)
+            result_cache.set(cache_key, result)
+        return result
+
+    def _format_legacy(self, orig_template, data):
         """ Figure out with whole formatting.
 
         Separate advanced keys (*Like '{project[name]}') from string which must
@@ -1066,130 +3011,622 @@ class Templates:
             if key_padding:
                 key = key_padding[0]
 
-            validation_result = self._validate_data_key(key, data)
-            missing_key = validation_result["missing_key"]
-            invalid_type = validation_result["invalid_type"]
+            validation_result = self._validate_data_key(key, data)
+            missing_key = validation_result["missing_key"]
+            invalid_type = validation_result["invalid_type"]
+
+            if invalid_type is not None:
+                invalid_required.append(invalid_type)
+                replace_keys.append(key)
+                continue
+
+            if missing_key is not None:
+                missing_required.append(missing_key)
+                replace_keys.append(key)
+                continue
+
+            try:
+                value = group.format(**data)
+                key_subdict = list(self.sub_dict_pattern.findall(key))
+                if len(key_subdict) <= 1:
+                    used_values[key] = value
+
+                else:
+                    used_values = self._merge_used_values(
+                        used_values, key_subdict, value
+                    )
+
+            except (TypeError, KeyError):
+                missing_required.append(key)
+                replace_keys.append(key)
+
+        # Only top level keys of data are changed
+        final_data = dict(data)
+        for key in replace_keys:
+            key_subdict = list(self.sub_dict_pattern.findall(key))
+            if len(key_subdict) <= 1:
+                final_data[key] = "{" + key + "}"
+                continue
+
+            replace_key_dst = "---".join(key_subdict)
+            replace_key_dst_curly = "{" + replace_key_dst + "}"
+            replace_key_src_curly = "{" + key + "}"
+            template = template.replace(
+                replace_key_src_curly, replace_key_dst_curly
+            )
+            final_data[replace_key_dst] = replace_key_src_curly
+
+        solved = len(missing_required) == 0 and len(invalid_required) == 0
+
+        missing_keys = missing_required + missing_optional
+        invalid_types = invalid_required + invalid_optional
+
+        filled_template = template.format(**final_data)
+        # WARNING `_rootless_path` change values in `final_data` please keep
+        # in midn when changing order
+        rootless_path = self._rootless_path(
+            template, used_values, final_data, missing_keys, invalid_types
+        )
+        if rootless_path is None:
+            rootless_path = filled_template
+
+        result = TemplateResult(
+            filled_template, orig_template, solved, rootless_path,
+            used_values, missing_keys, invalid_types
+        )
+        return result
+
+    def solve_dict(self, templates, data):
+        """ Solves templates with entered data.
+
+        Args:
+            templates (dict): All Anatomy templates which will be formatted.
+            data (dict): Containing keys to be filled into template.
+
+        Returns:
+            dict: With `TemplateResult` in values containing filled or
+                partially filled templates.
+        """
+        output = collections.defaultdict(dict)
+        for key, orig_value in templates.items():
+            if isinstance(orig_value, StringType):
+                output[key] = self._format(orig_value, data)
+                continue
+
+            # Check if orig_value has items attribute (any dict inheritance)
+            if not hasattr(orig_value, "items"):
+                # TODO we should handle this case
+                output[key] = orig_value
+                continue
+
+            for s_key, s_value in self.solve_dict(orig_value, data).items():
+                output[key][s_key] = s_value
+
+        return output
+
+    def _compile_dict(self, templates):
+        """Replace template strings in templates with `CompiledTemplate`."""
+        output = {}
+        for key, value in templates.items():
+            if isinstance(value, StringType):
+                value = self.compile_template(value)
+
+            elif hasattr(value, "items"):
+                value = self._compile_dict(value)
+                # Keep same output as `solve_dict` which skip empty groups
+                if not value:
+                    continue
+            output[key] = value
+        return output
+
+    def _compiled_templates_tree(self):
+        """Output of `_compile_dict` for all templates.
+
+        Output is cached until templates are reloaded and must not be
+        modified.
+        """
+        templates = self.templates
+        compiled_tree = self._compiled_tree
+        if compiled_tree is None:
+            compiled_tree = self._compile_dict(templates)
+            self._compiled_tree = compiled_tree
+        return compiled_tree
+
+    def _solve_compiled(self, compiled_templates, data, fill_cache=None):
+        """Same as `solve_dict` but for output of `_compile_dict`."""
+        output = {}
+        for key, value in compiled_templates.items():
+            if isinstance(value, CompiledTemplate):
+                value = value.format(data, fill_cache)
+
+            elif isinstance(value, dict):
+                value = self._solve_compiled(value, data, fill_cache)
+            output[key] = value
+        return output
+
+    def format_many(self, data_iterable, keys=None, only_keys=True):
+        """Solve templates for each data item in iterable.
+
+        Work which does not depend on data items is done only once for whole
+        batch. Templates are compiled, roots and environments are collected
+        once and resolved keys are reused while their values in data items
+        stay the same. Input data are not copied because formatting does not
+        modify them.
+
+        Args:
+            data_iterable (iterable): Items with data (dict) to be filled into
+                templates.
+            keys (list, optional): Top hierarchy keys of templates which
+                should be formatted. All templates are formatted by default.
+            only_keys (bool, optional): Decides if environ will be used to
+                fill templates or only keys in data.
+
+        Yields:
+            TemplatesDict: Result for each data item with `strict` attribute
+                set to True same as output of `format`.
+        """
+        if keys is None:
+            compiled_templates = self._compiled_templates_tree()
+        else:
+            templates = self.templates
+            selected_templates = {}
+            for key in keys:
+                if key not in templates:
+                    raise TemplateMissingKey([key])
+                selected_templates[key] = templates[key]
+            compiled_templates = self._compile_dict(selected_templates)
+
+        additional_data = {}
+        if only_keys is False:
+            for key, val in os.environ.items():
+                additional_data["$" + key] = val
+
+        roots = self.roots
+        if roots:
+            additional_data["root"] = roots
+
+        fill_cache = TemplateFillCache([roots])
+        for in_data in data_iterable:
+            data = dict(in_data)
+            data.update(additional_data)
+            yield TemplatesDict(
+                self._solve_compiled(compiled_templates, data, fill_cache),
+                fill_data=data,
+                templates_obj=self
+            )
+
+    def template_by_key(self, template_key):
+        """Return template string for key in templates hierarchy.
+
+        Args:
+            template_key (str/list): Keys to template joined with dot
+                (e.g. `"publish.path"`) or in list (`["publish", "path"]`).
+
+        Raises:
+            TemplateMissingKey: When key is not in templates.
+            ValueError: When value under key is not template string.
+        """
+        if isinstance(template_key, StringType):
+            template_key = template_key.split(".")
+
+        value = self.templates
+        parents = []
+        for key in template_key:
+            parents.append(key)
+            if not hasattr(value, "items") or key not in value:
+                raise TemplateMissingKey(parents)
+            value = value[key]
+
+        if not isinstance(value, StringType):
+            raise ValueError(
+                "Anatomy key `{}` is not a template.".format(
+                    ".".join(parents)
+                )
+            )
+        return value
+
+    def format_sequence(
+        self, data, template_key, frames, frame_key="frame", output="list"
+    ):
+        """Fill template for each frame of sequence.
+
+        Template is filled only once with all keys except frame key. Frames
+        are then formatted with format specification of frame key in template
+        and concatenated with filled parts.
+
+        Args:
+            data (dict): Containing keys to be filled into template. Value of
+                frame key is ignored.
+            template_key (str/list): Key of template (e.g. `"publish.path"`).
+            frames (iterable): Frame numbers.
+            frame_key (str, optional): Key of frame in template.
+            output (str, optional): Type of output. Possible values are
+                "list", "generator" or "numpy" (requires `numpy` module).
+
+        Returns:
+            list/generator/numpy.ndarray: Paths (str) for each frame.
+
+        Raises:
+            TemplateUnsolved: When template can't be solved with data or
+                any frame is not number or string. All frames are checked
+                before filling except "generator" output which raises when
+                invalid frame is reached.
+            ValueError: When template does not contain frame key or output
+                type is unknown.
+        """
+        if output not in ("list", "generator", "numpy"):
+            raise ValueError("Unknown output type \"{}\".".format(output))
+
+        compiled = self.compile_template(self.template_by_key(template_key))
+
+        frames = self._checked_frames(frames, compiled.template, frame_key)
+        if output != "generator":
+            frames = list(frames)
+
+        frames = iter(frames)
+        first_frame = next(frames, None)
+        if first_frame is None:
+            paths = iter([])
+
+        else:
+            frames = itertools.chain([first_frame], frames)
+
+            fill_data = dict(data)
+            fill_data[frame_key] = first_frame
+            roots = self.roots
+            if roots:
+                fill_data["root"] = roots
+
+            result = compiled.format(fill_data)
+            if not result.solved:
+                raise TemplateUnsolved(
+                    result.template, result.missing_keys, result.invalid_types
+                )
+
+            if frame_key not in result.used_values:
+                raise ValueError(
+                    "Template \"{}\" does not contain key \"{}\".".format(
+                        result.template, frame_key
+                    )
+                )
+            paths = self._sequence_paths(
+                compiled, fill_data, frames, frame_key
+            )
+
+        if output == "generator":
+            return paths
+
+        if output == "numpy":
+            import numpy
+            return numpy.array(list(paths), dtype=str)
+        return list(paths)
+
+    def _split_version_template(self, template, version_key):
+        """Split template to directory and path item with version key.
+
+        Returns:
+            tuple: Template of directory and template of path item.
+
+        Raises:
+            ValueError: Version key is not in template or path item with
+                version can't be separated.
+        """
+        match = re.search(
+            r"\{" + re.escape(version_key) + r"(:[^}]*)?\}", template
+        )
+        if match is None:
+            raise ValueError(
+                "Template \"{}\" does not contain key \"{}\".".format(
+                    template, version_key
+                )
+            )
+
+        start_idx = template.rfind("/", 0, match.start())
+        end_idx = template.find("/", match.end())
+        if end_idx < 0:
+            end_idx = len(template)
+
+        dir_template = template[:start_idx]
+        name_template = template[start_idx + 1:end_idx]
+        # Optional groups must not contain the separator
+        balanced = True
+        for part in (dir_template, name_template):
+            part = re.sub(r"\{[^}]*\}", "", part)
+            if part.count("<") != part.count(">"):
+                balanced = False
+
+        if start_idx < 0 or not balanced:
+            raise ValueError((
+                "Directory of path item with key \"{}\" can't be"
+                " separated in template \"{}\"."
+            ).format(version_key, template))
+        return dir_template, name_template
+
+    def find_versions(
+        self, template_key, data, version_key="version", use_cache=False
+    ):
+        """Find existing versions of template and next free version.
+
+        Template is split to directory and path item (file or folder name)
+        with version key. Directory is filled with data and listed once.
+        Names in directory are matched with regex compiled from the path
+        item. Keys which are in data must have the same value in names
+        (optional groups may be omitted), other keys (e.g. `comment` or
+        `ext`) match any value.
+
+        Args:
+            template_key (str/list): Key of template (e.g. `"work.path"`).
+                Template `path` is used when key leads to group of templates
+                (e.g. `"work"`).
+            data (dict): Containing keys to be filled into template. Value of
+                version key is ignored.
+            version_key (str, optional): Key of version in template.
+            use_cache (bool, optional): Use `directory_cache` so directory is
+                listed again only when its modification time changed.
+
+        Returns:
+            tuple: List of tuples with version (int) and path sorted by
+                version and next free version (int).
+
+        Raises:
+            TemplateUnsolved: When directory can't be filled with data.
+            ValueError: When path item with version key can't be matched.
+        """
+        if isinstance(template_key, StringType):
+            template_key = template_key.split(".")
+
+        try:
+            template = self.template_by_key(template_key)
+        except ValueError:
+            template = self.template_by_key(list(template_key) + ["path"])
+
+        dir_template, name_template = self._split_version_template(
+            template, version_key
+        )
+
+        fill_data = dict(data)
+        fill_data.pop(version_key, None)
+        roots = self.roots
+        if roots:
+            fill_data["root"] = roots
+
+        dir_result = self._format(dir_template, fill_data)
+        if not dir_result.solved:
+            raise TemplateUnsolved(
+                dir_result.template,
+                dir_result.missing_keys,
+                dir_result.invalid_types
+            )
+
+        compiled = self.compile_template(name_template)
+        values = {}
+        for name_key in compiled.template_keys or []:
+            missing_key, invalid_type, value, error = name_key.resolve(
+                fill_data
+            )
+            if missing_key is None and invalid_type is None and error is None:
+                values[name_key.text] = value
+
+        parsed = compiled.parse_pattern(roots=roots, values=values)
+        version_group = None
+        if parsed is not None:
+            pattern, groups, _ = parsed
+            for group_name, name_key in groups:
+                if name_key.key == version_key:
+                    version_group = group_name
+                    break
+
+        if version_group is None:
+            raise ValueError(
+                "Can't match versions of template \"{}\".".format(
+                    name_template
+                )
+            )
+
+        dir_path = _listed_directory(str(dir_result))
+        path_prefix = dir_path
+        if not dir_path.endswith(("/", "\\")):
+            path_prefix += "/"
+        regex = re.compile(pattern + r"\Z")
+
+        def match_versions(names):
+            output = []
+            for name in names or []:
+                match = regex.match(name)
+                if match is None:
+                    continue
+                try:
+                    version = int(match.group(version_group))
+                except ValueError:
+                    continue
+                output.append((version, path_prefix + name))
+            output.sort()
+            return tuple(output)
+
+        if use_cache:
+            versions = self.directory_cache.derived(
+                dir_path, (pattern, version_group), match_versions
+            )
+        else:
+            versions = match_versions(list_directory(dir_path))
+
+        versions = list(versions)
+        next_version = 1
+        if versions:
+            next_version = versions[-1][0] + 1
+        return versions, next_version
+
+    @staticmethod
+    def _checked_frames(frames, template, frame_key):
+        """Frames with validated type.
+
+        Raises:
+            TemplateUnsolved: When frame is not number or string.
+        """
+        for frame in frames:
+            if not isinstance(frame, (numbers.Number, StringType)):
+                raise TemplateUnsolved(template, [], {frame_key: type(frame)})
+            yield frame
+
+    @staticmethod
+    def _sequence_paths(compiled, fill_data, frames, frame_key):
+        split_result = compiled.split_by_key(fill_data, frame_key)
+        if split_result is None:
+            for frame in frames:
+                fill_data[frame_key] = frame
+                yield str(compiled.format(fill_data))
+            return
 
-            if invalid_type is not None:
-                invalid_required.append(invalid_type)
-                replace_keys.append(key)
-                continue
+        parts, format_specs = split_result
+        if len(format_specs) == 1:
+            prefix, suffix = parts
+            format_spec = format_specs[0]
+            for frame in frames:
+                yield prefix + format(frame, format_spec) + suffix
+            return
 
-            if missing_key is not None:
-                missing_required.append(missing_key)
-                replace_keys.append(key)
-                continue
+        for frame in frames:
+            items = [parts[0]]
+            for format_spec, part in zip(format_specs, parts[1:]):
+                items.append(format(frame, format_spec))
+                items.append(part)
+            yield "".join(items)
 
-            try:
-                value = group.format(**data)
-                key_subdict = list(self.sub_dict_pattern.findall(key))
-                if len(key_subdict) <= 1:
-                    used_values[key] = value
+    def _flatten_templates(self, templates, parents=None):
+        """Template keys joined with dot and their compiled templates."""
+        if parents is None:
+            parents = []
 
-                else:
-                    used_values = self._merge_used_values(
-                        used_values, key_subdict, value
-                    )
+        output = []
+        for key, value in templates.items():
+            keys = parents + [key]
+            if isinstance(value, StringType):
+                output.append((".".join(keys), self.compile_template(value)))
+            elif isinstance(value, dict):
+                output.extend(self._flatten_templates(value, keys))
+        return output
 
-            except (TypeError, KeyError):
-                missing_required.append(key)
-                replace_keys.append(key)
+    def parser(self, template_keys=None):
+        """Return `TemplatesParser` for templates.
 
-        final_data = copy.deepcopy(data)
-        for key in replace_keys:
-            key_subdict = list(self.sub_dict_pattern.findall(key))
-            if len(key_subdict) <= 1:
-                final_data[key] = "{" + key + "}"
-                continue
+        Parsers are cached until templates or roots are reloaded.
 
-            replace_key_dst = "---".join(key_subdict)
-            replace_key_dst_curly = "{" + replace_key_dst + "}"
-            replace_key_src_curly = "{" + key + "}"
-            template = template.replace(
-                replace_key_src_curly, replace_key_dst_curly
+        Args:
+            template_keys (list, optional): Template keys (e.g.
+                `"publish.path"`) which should be used for parsing. All
+                templates are used when not set.
+        """
+        roots = self.roots
+        templates = self.templates
+        if template_keys is not None:
+            template_keys = tuple(
+                key if isinstance(key, StringType) else ".".join(key)
+                for key in template_keys
             )
-            final_data[replace_key_dst] = replace_key_src_curly
 
-        solved = len(missing_required) == 0 and len(invalid_required) == 0
+        cached = self._parsers.get(template_keys)
+        if cached is not None and cached[0] is roots:
+            return cached[1]
 
-        missing_keys = missing_required + missing_optional
-        invalid_types = invalid_required + invalid_optional
+        if template_keys is None:
+            compiled_templates = self._flatten_templates(templates)
+        else:
+            compiled_templates = [
+                (key, self.compile_template(self.template_by_key(key)))
+                for key in template_keys
+            ]
 
-        filled_template = template.format(**final_data)
-        # WARNING `_rootless_path` change values in `final_data` please keep
-        # in midn when changing order
-        rootless_path = self._rootless_path(
-            template, used_values, final_data, missing_keys, invalid_types
-        )
-        if rootless_path is None:
-            rootless_path = filled_template
+        parser = TemplatesParser(compiled_templates, roots)
+        self._parsers[template_keys] = (roots, parser)
+        return parser
 
-        result = TemplateResult(
-            filled_template, orig_template, solved, rootless_path,
-            used_values, missing_keys, invalid_types
-        )
-        return result
+    def parse(self, path, template_key=None):
+        """Find template and data which would fill entered path.
 
-    def solve_dict(self, templates, data):
-        """ Solves templates with entered data.
+        Templates with more literal characters are tried first. Values of
+        keys with numeric padding are converted to integers.
 
         Args:
-            templates (dict): All Anatomy templates which will be formatted.
-            data (dict): Containing keys to be filled into template.
+            path (str): Filled path.
+            template_key (str/list, optional): Parse only with template under
+                the key (e.g. `"publish.path"`).
 
         Returns:
-            dict: With `TemplateResult` in values containing filled or
-                partially filled templates.
+            tuple: Template key and data (dict). Returned value is
+                `(None, None)` when path does not match any template.
         """
-        output = collections.defaultdict(dict)
-        for key, orig_value in templates.items():
-            if isinstance(orig_value, StringType):
-                output[key] = self._format(orig_value, data)
-                continue
+        template_keys = None
+        if template_key is not None:
+            template_keys = [template_key]
+        return self.parser(template_keys).parse(path)
 
-            # Check if orig_value has items attribute (any dict inheritance)
-            if not hasattr(orig_value, "items"):
-                # TODO we should handle this case
-                output[key] = orig_value
-                continue
+    def parse_many(self, paths, template_keys=None):
+        """Find template and data for each path.
 
-            for s_key, s_value in self.solve_dict(orig_value, data).items():
-                output[key][s_key] = s_value
+        Args:
+            paths (iterable): Filled paths.
+            template_keys (list, optional): Parse only with templates under
+                the keys.
 
-        return output
+        Yields:
+            tuple: Template key and data for each path, `(None, None)` for
+                paths which don't match any template.
+        """
+        return self.parser(template_keys).parse_many(paths)
 
-    def format_all(self, in_data, only_keys=True):
+    def format_all(self, in_data, only_keys=True, lazy=False, platforms=None):
         """ Solves templates based on entered data.
 
         Args:
             data (dict): Containing keys to be filled into template.
             only_keys (bool, optional): Decides if environ will be used to
                 fill templates or only keys in data.
+            lazy (bool, optional): Templates are formatted on first access
+                of their key when set to True.
+            platforms (iterable, optional): Fill templates for each platform.
+                Look at `format` for more information.
 
         Returns:
             TemplatesDict: Output `TemplateResult` have `strict` attribute
                 set to False so accessing unfilled keys in templates won't
                 raise any exceptions.
         """
-        output = self.format(in_data, only_keys)
-        output.strict = False
+        output = self.format(in_data, only_keys, lazy, platforms)
+        if platforms:
+            for platform_output in output.values():
+                platform_output.strict = False
+        else:
+            output.strict = False
         return output
 
-    def format(self, in_data, only_keys=True):
+    def format(self, in_data, only_keys=True, lazy=False, platforms=None):
         """ Solves templates based on entered data.
 
         Args:
             data (dict): Containing keys to be filled into template.
             only_keys (bool, optional): Decides if environ will be used to
                 fill templates or only keys in data.
+            lazy (bool, optional): Templates are formatted on first access
+                of their key when set to True. `LazyTemplatesDict` is
+                returned in that case. Nested values of data should not be
+                modified until templates are accessed. With `platforms`
+                templates of each platform are formatted on first access.
+            platforms (iterable, optional): Platform names (e.g. `"windows"`)
+                for which templates should be filled. Templates are filled
+                only once and root values of each platform are inserted
+                in place of root keys. Fill data of each platform contain
+                root values of the platform so `with_updates` can be used.
 
         Returns:
             TemplatesDict: Output `TemplateResult` have `strict` attribute
                 set to True so accessing unfilled keys in templates will
-                raise exceptions with explaned error.
+                raise exceptions with explaned error. Dictionary with
+                `TemplatesDict` for each platform is returned when
+                `platforms` are set.
         """
-        # Create a copy of inserted data
-        data = copy.deepcopy(in_data)
+        # Templates formatting does not change values of data so only top
+        # level keys are copied to be able add root and environments
+        data = dict(in_data)
 
         # Add environment variable to data
         if only_keys is False:
@@ -1200,9 +3637,157 @@ class Templates:
         roots = self.roots
         if roots:
             data["root"] = roots
+
+        if platforms:
+            platforms_data = dict(
+                (platform_name, self._platform_data(data, platform_name))
+                for platform_name in platforms
+            )
+            if lazy:
+                compiled_tree = self._compiled_templates_tree()
+                return dict(
+                    (platform_name, LazyTemplatesDict(
+                        compiled_tree,
+                        fill_data=platform_data,
+                        templates_obj=self
+                    ))
+                    for platform_name, platform_data in platforms_data.items()
+                )
+
+            solved = self.solve_dict(self.templates, data)
+            return self._solve_platforms(solved, platforms_data)
+
+        if lazy:
+            return LazyTemplatesDict(
+                self._compiled_templates_tree(),
+                fill_data=data,
+                templates_obj=self
+            )
+
         solved = self.solve_dict(self.templates, data)
 
-        return TemplatesDict(solved)
+        return TemplatesDict(solved, fill_data=data, templates_obj=self)
+
+    @staticmethod
+    def _platform_roots(roots, platform_name):
+        """Root values of platform in the same structure as roots.
+
+        Returns:
+            dict/str/None: Roots without value for the platform are skipped.
+        """
+        if isinstance(roots, RootItem):
+            return roots.cleaned_data.get(platform_name)
+
+        output = {}
+        for key, value in roots.items():
+            value = Templates._platform_roots(value, platform_name)
+            if value is not None:
+                output[key] = value
+        return output
+
+    def _platform_data(self, data, platform_name):
+        """Fill data with root values of platform."""
+        roots = data.get("root")
+        if not roots:
+            return data
+
+        platform_data = dict(data)
+        platform_roots = self._platform_roots(roots, platform_name)
+        if platform_roots is None:
+            platform_data.pop("root")
+        else:
+            platform_data["root"] = platform_roots
+        return platform_data
+
+    def _solve_platforms(self, solved, platforms_data):
+        """Create filled templates for each platform from solved templates.
+
+        Args:
+            solved (dict): Output of `solve_dict`.
+            platforms_data (dict): Fill data by platform name with root
+                values of the platform.
+
+        Returns:
+            dict: `TemplatesDict` by platform name.
+        """
+        def solve(items):
+            outputs = dict(
+                (platform_name, {}) for platform_name in platforms_data
+            )
+            for key, value in items.items():
+                if isinstance(value, TemplateResult):
+                    for platform_name, platform_data in (
+                        platforms_data.items()
+                    ):
+                        outputs[platform_name][key] = (
+                            self._platform_result(value, platform_data)
+                        )
+
+                elif isinstance(value, dict):
+                    for platform_name, output in solve(value).items():
+                        outputs[platform_name][key] = output
+
+                else:
+                    for output in outputs.values():
+                        output[key] = value
+            return outputs
+
+        return dict(
+            (platform_name, TemplatesDict(
+                output,
+                fill_data=platforms_data[platform_name],
+                templates_obj=self
+            ))
+            for platform_name, output in solve(solved).items()
+        )
+
+    def _platform_result(self, result, platform_data):
+        """Result with root values of platform.
+
+        Values of solved compiled result are reused and only values of root
+        keys are replaced, result shares descriptor with the original
+        result. Other results using root are formatted with data of
+        platform.
+
+        Returns:
+            TemplateResult: The same object is returned if template does not
+                use root.
+        """
+        descriptor = result._descriptor
+        values = result._values
+        if descriptor.root_indexes is None or values is None:
+            if "root" not in result.used_values:
+                return result
+            return self._format(result.template, platform_data)
+
+        if not descriptor.root_indexes:
+            return result
+
+        platform_values = list(values)
+        for idx in descriptor.root_indexes:
+            template_key = descriptor.keys[idx]
+            value = platform_data.get("root")
+            for sub_key in template_key.path:
+                if not isinstance(value, dict) or sub_key not in value:
+                    value = None
+                    break
+                value = value[sub_key]
+
+            if value is None or isinstance(value, dict):
+                # Missing root of platform is handled by formatting
+                return self._format(result.template, platform_data)
+            platform_values[idx] = format(value, template_key.format_spec)
+
+        items = [descriptor.literals[0]]
+        for value, literal in zip(platform_values, descriptor.literals[1:]):
+            items.append(value)
+            items.append(literal)
+        return TemplateResult.from_descriptor(
+            "".join(items), descriptor, result.solved, _MISSING,
+            missing_keys=result.missing_keys,
+            invalid_types=[result.invalid_types],
+            values=tuple(platform_values)
+        )
 
 
 class RootItem:
@@ -1233,6 +3818,12 @@ class RootItem:
             lowered_platform_keys[key.lower()] = value
         self.raw_data = lowered_platform_keys
         self.cleaned_data = self._clean_roots(lowered_platform_keys)
+        # Longer roots first so the longest matching root is used
+        self._sorted_cleaned_values = sorted(
+            (value for value in self.cleaned_data.values() if value),
+            key=len,
+            reverse=True
+        )
         self.name = name
         self.parent_keys = parent_keys
         self.parent = parent
@@ -1379,7 +3970,8 @@ class RootItem:
     def find_root_template_from_path(self, path):
         """Replaces known root value with formattable key in path.
 
-        All platform values are checked for this replacement.
+        All platform values are checked for this replacement. The longest
+        matching value is replaced.
 
         Args:
             path (str): Path where root value should be found.
@@ -1408,13 +4000,8 @@ class RootItem:
         result = False
         output = str(path)
 
-        root_paths = list(self.cleaned_data.values())
         mod_path = self.clean_path(path)
-        for root_path in root_paths:
-            # Skip empty paths
-            if not root_path:
-                continue
-
+        for root_path in self._sorted_cleaned_values:
             if mod_path.startswith(root_path):
                 result = True
                 replacement = "{" + self.full_key() + "}"
@@ -1424,6 +4011,162 @@ class RootItem:
         return (result, output)
 
 
+class RootsIndex(object):
+    """Index of root values of all platforms for longest prefix lookup.
+
+    Root values are stored in dictionary by their value and lookup checks
+    only prefixes of path with lengths of existing root values, from the
+    longest.
+
+    Args:
+        roots (RootItem/dict): Roots which should be indexed.
+    """
+
+    def __init__(self, roots):
+        self.roots = roots
+        self._root_items_by_value = {}
+        for root_item in self.root_items(roots):
+            for value in root_item.cleaned_data.values():
+                if value and value not in self._root_items_by_value:
+                    self._root_items_by_value[value] = root_item
+
+        self._lengths = sorted(
+            set(len(value) for value in self._root_items_by_value),
+            reverse=True
+        )
+
+    @staticmethod
+    def root_items(roots):
+        """All `RootItem` objects in roots."""
+        if isinstance(roots, RootItem):
+            return [roots]
+
+        output = []
+        for value in roots.values():
+            output.extend(RootsIndex.root_items(value))
+        return output
+
+    def find(self, path):
+        """Find root with the longest value matching start of path.
+
+        Args:
+            path (str): Path with cleaned slashes.
+
+        Returns:
+            tuple: `RootItem` and matching root value or `(None, None)`.
+        """
+        path_len = len(path)
+        for length in self._lengths:
+            if length > path_len:
+                continue
+
+            root_item = self._root_items_by_value.get(path[:length])
+            if root_item is not None:
+                return root_item, path[:length]
+        return None, None
+
+    def find_root_template(self, path):
+        """Replace root value in path with formatting key.
+
+        Returns:
+            tuple: Bool if root was found and path with root key.
+        """
+        output = str(path)
+        cleaned_path = output.replace("\\", "/")
+        root_item, root_value = self.find(cleaned_path)
+        if root_item is None:
+            return (False, output)
+
+        return (
+            True,
+            "{" + root_item.full_key() + "}" + cleaned_path[len(root_value):]
+        )
+
+
+class RootsRemapTable(object):
+    """Precompiled mapping of root values from one platform to another.
+
+    Args:
+        roots (RootItem/dict): Roots which should be used.
+        src_platform (str, optional): Platform of roots in source paths. Root
+            values of all platforms are used when not set.
+        dst_platform (str, optional): Platform to which paths are remapped.
+            Current platform is used when not set.
+    """
+
+    def __init__(self, roots, src_platform=None, dst_platform=None):
+        self.roots = roots
+        self.src_platform = src_platform
+        self.dst_platform = dst_platform
+
+        # Cleaned source root value: cleaned destination root value
+        self.mapping = {}
+        for root_item in RootsIndex.root_items(roots):
+            if dst_platform:
+                dst_root = root_item.cleaned_data.get(dst_platform)
+            else:
+                dst_root = root_item.clean_value
+
+            if not dst_root:
+                log.warning(
+                    "Root \"{}\" miss platform \"{}\" definition.".format(
+                        root_item.full_key(), dst_platform
+                    )
+                )
+                continue
+
+            if src_platform:
+                src_roots = [root_item.cleaned_data.get(src_platform)]
+            else:
+                src_roots = list(root_item.cleaned_data.values())
+
+            # Paths which already have destination root are kept
+            src_roots.append(dst_root)
+            for src_root in src_roots:
+                if src_root and src_root not in self.mapping:
+                    self.mapping[src_root] = dst_root
+
+        self._lengths = sorted(
+            set(len(value) for value in self.mapping),
+            reverse=True
+        )
+
+    def remap(self, path):
+        """Remap path to destination platform.
+
+        Args:
+            path (str): Path with root value of source platform.
+
+        Returns:
+            str/None: Remapped path with cleaned slashes or None if path does
+                not start with any known root.
+        """
+        if not isinstance(path, StringType):
+            path = str(path)
+        path = path.replace("\\", "/")
+        path_len = len(path)
+        for length in self._lengths:
+            if length > path_len:
+                continue
+
+            dst_root = self.mapping.get(path[:length])
+            if dst_root is not None:
+                return dst_root + path[length:]
+        return None
+
+    def remap_many(self, paths):
+        """Remap paths which may also contain root formatting keys.
+
+        Yields:
+            str/None: Remapped path or None for each path.
+        """
+        roots = self.roots
+        for path in paths:
+            if "{root" in path:
+                path = path.format(**{"root": roots})
+            yield self.remap(path)
+
+
 class Roots:
     """Object which should be used for formatting "root" key in templates.
 
@@ -1454,6 +4197,8 @@ class Roots:
 
         self.parent = parent
         self._roots = None
+        self._roots_index = None
+        self._remap_tables = {}
 
     def __format__(self, *args, **kwargs):
         return self.roots.__format__(*args, **kwargs)
@@ -1464,6 +4209,8 @@ class Roots:
     def reset(self):
         """Reset current roots value."""
         self._roots = None
+        self._roots_index = None
+        self._remap_tables = {}
 
     def path_remapper(
         self, path, dst_platform=None, src_platform=None, roots=None
@@ -1508,6 +4255,59 @@ class Roots:
             if result is not None:
                 return result
 
+    def remap_table(self, src_platform=None, dst_platform=None, roots=None):
+        """Return `RootsRemapTable` for platforms.
+
+        Tables of current roots are cached until roots are reloaded.
+
+        Args:
+            src_platform (str, optional): Platform of source paths.
+            dst_platform (str, optional): Platform of remapped paths.
+            roots (dict/RootItem, optional): It is possible to use different
+                roots than instance has.
+
+        Raises:
+            ValueError: When roots are not entered and can't be loaded.
+        """
+        if roots is not None:
+            return RootsRemapTable(roots, src_platform, dst_platform)
+
+        roots = self.roots
+        if roots is None:
+            raise ValueError("Roots are not set. Can't remap paths.")
+
+        key = (src_platform, dst_platform)
+        table = self._remap_tables.get(key)
+        if table is None or table.roots is not roots:
+            table = RootsRemapTable(roots, src_platform, dst_platform)
+            self._remap_tables[key] = table
+        return table
+
+    def remap_many(
+        self, paths, src_platform=None, dst_platform=None, roots=None
+    ):
+        """Remap multiple paths from source platform to destination platform.
+
+        Unlike `path_remapper` the root with the longest matching value is
+        used for each path.
+
+        Args:
+            paths (iterable): Paths which should be remapped. Paths can also
+                contain root formatting keys.
+            src_platform (str, optional): Platform of source paths. Root
+                values of all platforms are used when not set.
+            dst_platform (str, optional): Platform of remapped paths. Current
+                platform is used when not set.
+            roots (dict/RootItem, optional): It is possible to remap paths
+                with different roots than instance has.
+
+        Returns:
+            generator: Remapped path or None for each path when path does not
+                contain known root.
+        """
+        table = self.remap_table(src_platform, dst_platform, roots)
+        return table.remap_many(paths)
+
     def find_root_template_from_path(self, path, roots=None):
         """Find root value in entered path and replace it with formatting key.
 
@@ -1528,22 +4328,57 @@ class Roots:
             log.debug(
                 "Looking for matching root in path \"{}\".".format(path)
             )
-            roots = self.roots
 
+        roots_index = self.roots_index(roots)
+        cleaned_path = str(path).replace("\\", "/")
+        root_item, _ = roots_index.find(cleaned_path)
+        if root_item is None:
+            log.warning("No matching root was found in current setting.")
+            return (False, path)
+
+        log.debug("Found match in root \"{}\".".format(root_item.full_key()))
+        return roots_index.find_root_template(path)
+
+    def roots_index(self, roots=None):
+        """Return `RootsIndex` of roots.
+
+        Index of current roots is cached until roots are reloaded.
+
+        Args:
+            roots (RootItem/dict, optional): It is possible to use different
+                roots than instance has.
+
+        Raises:
+            ValueError: When roots are not entered and can't be loaded.
+        """
+        if roots is not None:
+            return RootsIndex(roots)
+
+        roots = self.roots
         if roots is None:
             raise ValueError("Roots are not set. Can't find path.")
 
-        if isinstance(roots, RootItem):
-            return roots.find_root_template_from_path(path)
+        if self._roots_index is None or self._roots_index.roots is not roots:
+            self._roots_index = RootsIndex(roots)
+        return self._roots_index
 
-        for root_name, _root in roots.items():
-            success, result = self.find_root_template_from_path(path, _root)
-            if success:
-                log.info("Found match in root \"{}\".".format(root_name))
-                return success, result
+    def find_root_templates(self, paths, roots=None):
+        """Replace root values with formatting keys in multiple paths.
 
-        log.warning("No matching root was found in current setting.")
-        return (False, path)
+        Root with the longest matching value is used for each path. Nothing
+        is logged per path.
+
+        Args:
+            paths (iterable): Paths where roots will be searched.
+            roots (Roots/dict, optional): It is possible to use different
+                roots than instance has.
+
+        Returns:
+            list: Tuple for each path with bool representing success and path
+                with or without replaced root with formatting key.
+        """
+        roots_index = self.roots_index(roots)
+        return [roots_index.find_root_template(path) for path in paths]
 
     def set_root_environments(self):
         """Set root environments for current project."""
@@ -1553,7 +4388,8 @@ class Roots:
     def root_environments(self):
         """Use root keys to create unique keys for environment variables.
 
-        Concatenates prefix "PYPE_PROJECT_ROOT" with root keys to create unique keys.
+        Concatenates prefix "PYPE_PROJECT_ROOT" with root keys to create
+        unique keys.
 
         Returns:
             dict: Result is `{(str): (str)}` dicitonary where key represents
@@ -1712,16 +4548,17 @@ class Roots:
         return self._roots
 
     @staticmethod
-    def default_roots_raw():
-        """Loads raw default roots data from roots.json."""
-        default_roots_path = os.path.normpath(os.path.join(
+    def default_roots_path():
+        """Returns path to default roots file."""
+        return os.path.normpath(os.path.join(
             default_anatomy_dir_path(),
             Roots.roots_filename
         ))
-        with open(default_roots_path, "r") as default_roots_file:
-            raw_default_roots = json.load(default_roots_file)
 
-        return raw_default_roots
+    @staticmethod
+    def default_roots_raw():
+        """Loads raw default roots data from roots.json."""
+        return Roots._load_json(Roots.default_roots_path())
 
     @staticmethod
     def default_roots(parent=None):
@@ -1749,11 +4586,18 @@ class Roots:
         if not os.path.exists(project_roots_path):
             return None
 
-        with open(project_roots_path, "r") as project_roots_file:
-            raw_project_roots = json.load(project_roots_file)
-
+        raw_project_roots = Roots._load_json(project_roots_path)
         return self._parse_dict(raw_project_roots, parent=self)
 
+    @staticmethod
+    def _load_json(path):
+        """Load roots json file or it's cached content."""
+        def load():
+            with open(path, "r") as stream:
+                return json.load(stream)
+
+        return anatomy_file_cache.load([path], load, key="roots")
+
     @staticmethod
     def _parse_dict(data, key=None, parent_keys=[], parent=None):
         """Parse roots raw data into RootItem or dictionary with RootItems.
@@ -1831,3 +4675,46 @@ class Roots:
 
         with open(json_path, "w") as json_file:
             json.dump(roots_data, json_file)
+
+
+class _SnapshotTemplates(Templates):
+    """Templates of `AnatomySnapshot` loaded and compiled at creation.
+
+    Templates are frozen and can't be reset. Size of result cache can't be
+    changed.
+    """
+
+    def __init__(self, parent, result_cache_size=None):
+        # Templates is old style class in Python 2
+        Templates.__init__(
+            self, parent=parent, result_cache_size=result_cache_size
+        )
+        self._templates = freeze_data(self.templates)
+        self._compiled_templates_tree()
+        self._frozen = True
+
+    def reset(self):
+        raise TypeError("Templates of anatomy snapshot can't be reset.")
+
+    def set_result_cache_size(self, size):
+        if getattr(self, "_frozen", False):
+            raise TypeError(
+                "Result cache size of anatomy snapshot can't be changed."
+            )
+        Templates.set_result_cache_size(self, size)
+
+
+class _SnapshotRoots(Roots):
+    """Roots of `AnatomySnapshot` loaded at creation.
+
+    Multiroot dictionaries are frozen and roots can't be reset.
+    """
+
+    def __init__(self, parent):
+        # Roots is old style class in Python 2
+        Roots.__init__(self, parent=parent)
+        self._roots = freeze_data(self.roots)
+        self.roots_index()
+
+    def reset(self):
+        raise TypeError("Roots of anatomy snapshot can't be reset.")
@@ -1,7 +1,15 @@
 import os
+import re
+import copy
 import json
+import time
+import hashlib
+import tempfile
 import datetime
+import threading
+import contextlib
 from .log import PypeLogger
+from .file_cache import cache_enabled, user_cache_dir
 
 log = PypeLogger().get_logger(__name__)
 
@@ -13,6 +21,9 @@ if hasattr(json.decoder, "JSONDecodeError"):
 else:
     JsonError = ValueError
 
+# Comma followed by closing bracket
+_TRAILING_COMMA_REGEX = re.compile(r",(?=[ \t\n\r]*[\]}])")
+
 
 def get_datetime_data(datetime_obj=None):
     """Returns current datetime data as dictionary.
@@ -86,64 +97,163 @@ def get_datetime_data(datetime_obj=None):
     }
 
 
-def load_json(fpath, first_run=False):
-    # Load json data
-    with open(fpath, "r") as opened_file:
-        lines = opened_file.read().splitlines()
+def _split_json_strings(text):
+    """Split json text by quotes of strings.
+
+    Returns:
+        list/None: Text outside of strings on even indexes and content of
+            strings on odd indexes. None if text contains unterminated
+            string.
+    """
+    parts = text.split('"')
+    if '\\"' in text:
+        # Join parts split by escaped quotes in strings
+        output = []
+        for part in parts:
+            if len(output) % 2 == 0 and output:
+                last_part = output[-1]
+                backslashes = len(last_part) - len(last_part.rstrip("\\"))
+                if backslashes % 2 == 1:
+                    output[-1] = '"'.join([last_part, part])
+                    continue
+            output.append(part)
+        parts = output
 
-    # prepare json string
-    standard_json = ""
-    for line in lines:
-        # Remove all whitespace on both sides
-        line = line.strip()
+    if len(parts) % 2 == 0:
+        return None
+    return parts
 
-        # Skip blank lines
-        if len(line) == 0:
-            continue
 
-        standard_json += line
+def _replace_trailing_commas(text):
+    """Replace trailing commas outside of json strings with spaces.
 
-    # Check if has extra commas
-    extra_comma = False
-    if ",]" in standard_json or ",}" in standard_json:
-        extra_comma = True
-    standard_json = standard_json.replace(",]", "]")
-    standard_json = standard_json.replace(",}", "}")
+    Only commas outside of strings are replaced. Length of text is not
+    changed so positions in returned text match positions in source text.
 
-    if extra_comma and first_run:
-        log.error("Extra comma in json file: \"{}\"".format(fpath))
+    Returns:
+        str/None: Text without trailing commas or None if text contains
+            unterminated string.
+    """
+    if '\\"' in text:
+        parts = _split_json_strings(text)
+        if parts is None:
+            return None
+
+        outside_text = '"'.join(parts[0::2])
+        outside_text = _TRAILING_COMMA_REGEX.sub(" ", outside_text)
+        parts[0::2] = outside_text.split('"')
+        return '"'.join(parts)
+
+    # Without escaped quotes comma is in string if odd count of quotes is
+    # before it
+    if text.count('"') % 2 == 1:
+        return None
+
+    items = []
+    last_pos = 0
+    counted_pos = 0
+    quotes = 0
+    for match in _TRAILING_COMMA_REGEX.finditer(text):
+        pos = match.start()
+        quotes += text.count('"', counted_pos, pos)
+        counted_pos = pos
+        if quotes % 2 == 0:
+            items.append(text[last_pos:pos])
+            items.append(" ")
+            last_pos = pos + 1
+    items.append(text[last_pos:])
+    return "".join(items)
+
+
+def parse_json(text):
+    """Parse json text which may contain trailing commas.
+
+    Text is parsed with `json` module first so valid json is parsed only
+    once. Trailing commas outside of strings are replaced with spaces only
+    if parsing failed on closing bracket after comma. Replacing keeps
+    positions of characters so error contains exact line and column in
+    source text.
+
+    Args:
+        text (str): Json text.
+
+    Returns:
+        tuple: Parsed data and bool if text contained trailing commas.
+
+    Raises:
+        JsonError: Text is not valid json even without trailing commas.
+    """
+    try:
+        return json.loads(text), False
+
+    except JsonError as exc:
+        if not _is_trailing_comma_error(text, exc):
+            raise
+
+        fixed_text = _replace_trailing_commas(text)
+        if fixed_text is None or fixed_text == text:
+            raise
+
+    return json.loads(fixed_text), True
+
+
+def _is_trailing_comma_error(text, exc):
+    """Json error might be caused by trailing comma.
+
+    Returns:
+        bool: Error is on closing bracket with comma before it or position
+            of error is not known.
+    """
+    # Python 2 errors don't have position
+    pos = getattr(exc, "pos", None)
+    if pos is None:
+        return True
+
+    if pos >= len(text) or text[pos] not in "]}":
+        return False
+
+    pos -= 1
+    while pos >= 0 and text[pos] in " \t\n\r":
+        pos -= 1
+    return pos >= 0 and text[pos] == ","
+
+
+def load_json(fpath, first_run=False):
+    """Load json file which may contain trailing commas.
+
+    Args:
+        fpath (str): Path to json file.
+        first_run (bool): Log extra commas, empty file and invalid json.
+
+    Returns:
+        dict: Loaded data. Empty dictionary if file is empty or is not
+            valid json.
+    """
+    with open(fpath, "r") as opened_file:
+        content = opened_file.read()
 
     # return empty dict if file is empty
-    if standard_json == "":
+    if not content or content.isspace():
         if first_run:
             log.error("Empty json file: \"{}\"".format(fpath))
         return {}
 
-    # Try to parse string
-    try:
-        return json.loads(standard_json)
-
-    except JsonError:
-        # Return empty dict if it is first time that decode error happened
-        if not first_run:
-            return {}
-
-    # Repreduce the exact same exception but traceback contains better
-    # information about position of error in the loaded json
     try:
-        with open(fpath, "r") as opened_file:
-            json.load(opened_file)
+        data, extra_comma = parse_json(content)
 
-    except JsonError:
-        log.warning(
-            "File has invalid json format \"{}\"".format(fpath),
-            exc_info=True
-        )
+    except JsonError as exc:
+        if first_run:
+            log.warning("File has invalid json format \"{}\": {}".format(
+                fpath, exc
+            ))
+        return {}
 
-    return {}
+    if extra_comma and first_run:
+        log.error("Extra comma in json file: \"{}\"".format(fpath))
+    return data
 
 
-def collect_json_from_path(input_path, first_run=False):
+def collect_json_from_path(input_path, first_run=False, workers=None):
     r""" Json collector
     iterate through all subfolders and json files in *input_path*
 
@@ -158,34 +268,73 @@ def collect_json_from_path(input_path, first_run=False):
             }
         }
 
+    Directories are listed with `os.scandir` where available so type of
+    items is known without additional stat calls. With *workers* directories
+    are listed and json files are loaded in shared thread pool so latency of
+    network filesystems overlaps. Pool is used only for batches of at least
+    `PARALLEL_LOAD_MIN_ITEMS` directories or files.
+
     """
-    output = None
-    if os.path.isdir(input_path):
-        output = {}
-        for file in os.listdir(input_path):
-            full_path = os.path.sep.join([input_path, file])
-            if os.path.isdir(full_path):
-                loaded = collect_json_from_path(full_path, first_run)
-                if loaded:
-                    output[file] = loaded
-            else:
-                basename, ext = os.path.splitext(os.path.basename(file))
-                if ext == '.json':
-                    output[basename] = load_json(full_path, first_run)
-    else:
+    if not os.path.isdir(input_path):
         basename, ext = os.path.splitext(os.path.basename(input_path))
         if ext == '.json':
-            output = load_json(input_path, first_run)
+            return load_json(input_path, first_run)
+        return None
 
-    return output
+    files = _list_json_files(input_path, workers)
+    loaded = _map_items(
+        lambda item: load_json(item[1], first_run), files, workers
+    )
+    return _json_tree([
+        (keys, data) for (keys, _), data in zip(files, loaded)
+    ])
 
 
-def get_presets(project=None, first_run=False):
+def presets_paths(project=None):
+    """Paths to default presets and to presets of project.
+
+    Args:
+        project (str, optional): Name of project. Value of `AVALON_PROJECT`
+            environment is used when not set.
+
+    Returns:
+        tuple: Default presets path and project presets path. Project
+            presets path is None if project is not set or project configs
+            are not used. Existence of paths is not checked.
+    """
+    config_path = os.path.normpath(os.environ['PYPE_CONFIG'])
+    config_path = os.path.sep.join([config_path, 'presets'])
+
+    if not project:
+        project = os.environ.get('AVALON_PROJECT', None)
+
+    project_configs_path = os.environ.get('PYPE_PROJECT_CONFIGS')
+    if not project or not project_configs_path:
+        return config_path, None
+
+    project_configs_path = os.path.normpath(project_configs_path)
+    project_config_path = os.path.sep.join(
+        [project_configs_path, project, 'presets']
+    )
+    return config_path, project_config_path
+
+
+def get_presets(
+    project=None, first_run=False, use_cache=False, lazy=False, workers=None
+):
     """ Loads preset files with usage of 'collect_json_from_path'
     Default preset path is set to: ``{PYPE_CONFIG}/presets``
     Project preset path is set to: ``{PYPE_PROJECT_CONFIGS}/*project_name*``
     - environment variable **PYPE_STUDIO_CONFIG** is required
     - **PYPE_STUDIO_CONFIGS** only if want to use overrides per project
+    - with *use_cache* presets are returned from `PresetsCache` as
+      read-only `ImmutableDict`
+    - with *lazy* presets are returned as `LazyPresetsDict` which loads
+      json files on first access
+    - presets are loaded from bundle written by `compile_presets` if
+      bundle is up to date and *first_run* is not set
+    - with *workers* source files are loaded in thread pool, see
+      `collect_json_from_path`
 
     Returns:
     - None
@@ -202,41 +351,49 @@ def get_presets(project=None, first_run=False):
       - if project_name is set and include override data
 
     """
-    # config_path should be set from environments?
-    config_path = os.path.normpath(os.environ['PYPE_CONFIG'])
-    preset_items = [config_path, 'presets']
-    config_path = os.path.sep.join(preset_items)
-    if not os.path.isdir(config_path):
-        log.error('Preset path was not found: "{}"'.format(config_path))
-        return None
-    default_data = collect_json_from_path(config_path, first_run)
+    if use_cache:
+        return PresetsCache.get(project, first_run)
 
-    if not project:
-        project = os.environ.get('AVALON_PROJECT', None)
+    # Issues in json files are logged only when files are parsed
+    if not first_run and not lazy:
+        data = load_presets_bundle(project)
+        if data is not None:
+            return data
 
     if not project:
-        return default_data
-
-    project_configs_path = os.environ.get('PYPE_PROJECT_CONFIGS')
-    if not project_configs_path:
-        return default_data
+        project = os.environ.get('AVALON_PROJECT', None)
 
-    project_configs_path = os.path.normpath(project_configs_path)
-    project_config_items = [project_configs_path, project, 'presets']
-    project_config_path = os.path.sep.join(project_config_items)
+    config_path, project_config_path = presets_paths(project)
+    if not os.path.isdir(config_path):
+        log.error('Preset path was not found: "{}"'.format(config_path))
+        return None
 
-    if not os.path.isdir(project_config_path):
+    if (
+        project_config_path is not None
+        and not os.path.isdir(project_config_path)
+    ):
         log.warning('Preset path for project {} not found: "{}"'.format(
             project, project_config_path
         ))
+        project_config_path = None
+
+    if lazy:
+        return LazyPresetsDict(config_path, project_config_path, first_run)
+
+    default_data = collect_json_from_path(config_path, first_run, workers)
+    if project_config_path is None:
         return default_data
-    project_data = collect_json_from_path(project_config_path, first_run)
+
+    project_data = collect_json_from_path(
+        project_config_path, first_run, workers
+    )
 
     return update_dict(default_data, project_data)
 
 
 def get_init_presets(project=None):
-    """ Loads content of presets like get_presets() but also evaluate init.json ponter to default presets
+    """ Loads content of presets like get_presets() but also evaluate
+    init.json ponter to default presets
 
     Returns:
     - None
@@ -252,9 +409,15 @@ def get_init_presets(project=None):
 
       - if project_name is set and include override data
 
+    Presets are taken from `PresetsCache` and returned as mutable copy.
+
     """
-    presets = get_presets(project)
+    presets = get_presets(project, use_cache=True)
+    if presets is None:
+        return None
 
+    # Cached presets are shared and immutable
+    presets = unfreeze_data(presets)
     try:
         # try if it is not in projects custom directory
         # `{PYPE_PROJECT_CONFIGS}/[PROJECT_NAME]/init.json`
@@ -266,7 +429,9 @@ def get_init_presets(project=None):
         log.warning("No projects custom preset available...")
         presets["colorspace"] = presets["colorspace"]["default"]
         presets["dataflow"] = presets["dataflow"]["default"]
-        log.info("Presets `colorspace` and `dataflow` loaded from `default`...")
+        log.info(
+            "Presets `colorspace` and `dataflow` loaded from `default`..."
+        )
 
     return presets
 
@@ -286,3 +451,753 @@ def update_dict(main_dict, enhance_dict):
         else:
             main_dict[key] = value
     return main_dict
+
+
+def _dict_copy_uses_getitem():
+    """Check if `dict(obj)` takes values of dictionary subclasses by keys.
+
+    Python 2 copies values of dictionary subclasses in `dict(obj)` and
+    `**obj` directly from dictionary storage even if `__iter__` and
+    `__getitem__` are overridden.
+    """
+    class Probe(dict):
+        def __iter__(self):
+            return dict.__iter__(self)
+
+        def __getitem__(self, key):
+            return True
+
+    return dict(Probe(probe=False))["probe"]
+
+
+# Lazy dictionaries can keep values which are not loaded only when copies
+# of dictionaries go through `__getitem__`
+DICT_COPY_USES_GETITEM = _dict_copy_uses_getitem()
+
+
+class ImmutableDict(dict):
+    """Dictionary which can't be modified after creation."""
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(
+            "'{}' object is immutable".format(self.__class__.__name__)
+        )
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    clear = _immutable
+    pop = _immutable
+    popitem = _immutable
+    setdefault = _immutable
+    update = _immutable
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self), ))
+
+
+def freeze_data(data):
+    """Convert dictionaries to `ImmutableDict` and lists to tuples."""
+    if isinstance(data, dict):
+        return ImmutableDict(
+            (key, freeze_data(value))
+            for key, value in data.items()
+        )
+    if isinstance(data, list):
+        return tuple(freeze_data(value) for value in data)
+    return data
+
+
+def unfreeze_data(data):
+    """Mutable copy of data converted with `freeze_data`.
+
+    Dictionaries are converted to `dict` and tuples to lists.
+    """
+    if isinstance(data, dict):
+        return dict(
+            (key, unfreeze_data(value))
+            for key, value in data.items()
+        )
+    if isinstance(data, (list, tuple)):
+        return [unfreeze_data(value) for value in data]
+    return data
+
+
+def _directory_items(dir_path):
+    """Names of items in directory with information if item is directory.
+
+    Type of item is taken from `os.scandir` entries where available so
+    directories are not checked with additional stat calls.
+
+    Returns:
+        list: Tuples with name and bool if item is directory.
+    """
+    scandir = getattr(os, "scandir", None)
+    if scandir is None:
+        return [
+            (name, os.path.isdir(os.path.join(dir_path, name)))
+            for name in os.listdir(dir_path)
+        ]
+
+    with contextlib.closing(scandir(dir_path)) as entries:
+        return [(entry.name, entry.is_dir()) for entry in entries]
+
+
+# Minimal count of items processed in thread pool by `_map_items`
+PARALLEL_LOAD_MIN_ITEMS = 8
+
+_thread_pools = {}
+_thread_pools_lock = threading.Lock()
+
+
+def _thread_pool(workers):
+    """Thread pool with count of workers shared by all callers.
+
+    Pool is created on first use and kept for the rest of the process.
+    """
+    # Threads of pool are not copied to forked process
+    key = (os.getpid(), workers)
+    with _thread_pools_lock:
+        pool = _thread_pools.get(key)
+        if pool is None:
+            from multiprocessing.pool import ThreadPool
+
+            pool = ThreadPool(workers)
+            _thread_pools[key] = pool
+    return pool
+
+
+def _map_items(func, items, workers=None):
+    """Results of function for each item, processed in thread pool if worth.
+
+    Args:
+        func (callable): Function called with each item.
+        items (list): Items to process.
+        workers (int, optional): Count of threads. Items are processed
+            serially if not set or there are less items than
+            `PARALLEL_LOAD_MIN_ITEMS`.
+
+    Returns:
+        list: Results in order of items.
+    """
+    if (
+        workers is None
+        or workers < 2
+        or len(items) < PARALLEL_LOAD_MIN_ITEMS
+    ):
+        return [func(item) for item in items]
+    return _thread_pool(workers).map(func, items)
+
+
+def _list_directories(input_path, workers=None):
+    """Items of directory and all its subdirectories.
+
+    Directories of each level of hierarchy are listed in thread pool when
+    *workers* are passed.
+
+    Returns:
+        dict: Items from `_directory_items` by path to directory.
+    """
+    listings = {}
+    dir_paths = [input_path]
+    while dir_paths:
+        results = _map_items(_directory_items, dir_paths, workers)
+
+        next_dir_paths = []
+        for dir_path, items in zip(dir_paths, results):
+            listings[dir_path] = items
+            for name, is_dir in items:
+                if is_dir:
+                    next_dir_paths.append(os.path.sep.join([dir_path, name]))
+        dir_paths = next_dir_paths
+    return listings
+
+
+def _list_json_files(input_path, workers=None):
+    """Json files in directory and its subdirectories.
+
+    Args:
+        input_path (str): Path to directory.
+        workers (int, optional): Count of threads used to list directories.
+
+    Returns:
+        list: Tuples with keys of file in output of `collect_json_from_path`
+            and path to file.
+    """
+    listings = _list_directories(input_path, workers)
+
+    def collect(dir_path, keys):
+        output = []
+        for name, is_dir in listings[dir_path]:
+            full_path = os.path.sep.join([dir_path, name])
+            if is_dir:
+                output.extend(collect(full_path, keys + (name, )))
+                continue
+
+            basename, ext = os.path.splitext(name)
+            if ext == ".json":
+                output.append((keys + (basename, ), full_path))
+        return output
+
+    return collect(input_path, ())
+
+
+def _file_signature(path):
+    """Modification time and size of file.
+
+    Returns:
+        tuple/None: Modification time and size or None if file can't be
+            accessed.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    mtime = getattr(stat, "st_mtime_ns", None)
+    if mtime is None:
+        mtime = stat.st_mtime
+    return (mtime, stat.st_size)
+
+
+def _json_tree(items):
+    """Nested dictionary from data of json files.
+
+    Args:
+        items (list): Tuples with keys of file and its data in order from
+            `_list_json_files`.
+
+    Returns:
+        dict: Same structure as `collect_json_from_path` returns. Data of
+            files are not copied.
+    """
+    output = {}
+    # Only dictionaries of directories can be filled, never data of files
+    directories = set([id(output)])
+    for keys, data in items:
+        parent = output
+        for key in keys[:-1]:
+            value = parent.get(key)
+            if value is None or id(value) not in directories:
+                value = {}
+                parent[key] = value
+                directories.add(id(value))
+            parent = value
+        parent[keys[-1]] = data
+    return output
+
+
+class _PresetsSource(object):
+    """Not loaded value of `LazyPresetsDict`.
+
+    Args:
+        default (tuple): Bool if item is directory and path to item in
+            default presets or None.
+        project (tuple): Bool if item is directory and path to item in
+            project presets or None.
+    """
+
+    __slots__ = ("default", "project")
+
+    def __init__(self, default=None, project=None):
+        self.default = default
+        self.project = project
+
+    def load(self, first_run):
+        default = self.default
+        project = self.project
+        if default is None or project is None:
+            is_dir, path = default or project
+            if is_dir:
+                if default is None:
+                    return LazyPresetsDict(None, path, first_run)
+                return LazyPresetsDict(path, None, first_run)
+            return load_json(path, first_run)
+
+        if default[0] and project[0]:
+            return LazyPresetsDict(default[1], project[1], first_run)
+
+        # Json file overrides directory or directory overrides json file
+        default_data = collect_json_from_path(default[1], first_run)
+        project_data = collect_json_from_path(project[1], first_run)
+        if isinstance(default_data, dict) and isinstance(project_data, dict):
+            return update_dict(default_data, project_data)
+        return project_data
+
+
+class LazyPresetsDict(dict):
+    """Presets where json files are loaded on first access.
+
+    Only items of presets directories are listed on creation. Json file is
+    loaded and merged with project overrides when its key is accessed,
+    subdirectories are `LazyPresetsDict` objects too. Accessing values
+    through `values`, `items`, `get`, `copy` or `dict(obj)` loads requested
+    values so output is the same as output of `get_presets` except
+    directories without json files which are empty dictionaries.
+
+    Python 2 copies values of dictionaries in `dict(obj)` and `**obj`
+    without `__getitem__` so all values are loaded on creation there.
+
+    Args:
+        default_path (str): Path to directory in default presets or None.
+        project_path (str): Path to directory in project presets or None.
+        first_run (bool): Log issues of loaded json files.
+    """
+
+    def __init__(self, default_path=None, project_path=None, first_run=False):
+        super(LazyPresetsDict, self).__init__()
+        self._first_run = first_run
+
+        sources = {}
+        for idx, path in enumerate((default_path, project_path)):
+            if path is None:
+                continue
+
+            for name, is_dir in _directory_items(path):
+                key = name
+                if not is_dir:
+                    key, ext = os.path.splitext(name)
+                    if ext != ".json":
+                        continue
+
+                source = sources.get(key)
+                if source is None:
+                    source = sources[key] = _PresetsSource()
+                item = (is_dir, os.path.sep.join([path, name]))
+                if idx == 0:
+                    source.default = item
+                else:
+                    source.project = item
+
+        for key, source in sources.items():
+            dict.__setitem__(self, key, source)
+
+        if not DICT_COPY_USES_GETITEM:
+            self._solve_all()
+
+    def _solve_value(self, value):
+        if isinstance(value, _PresetsSource):
+            return value.load(self._first_run)
+        return value
+
+    def _solve_item(self, key):
+        value = dict.__getitem__(self, key)
+        if isinstance(value, _PresetsSource):
+            value = self._solve_value(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def _solve_all(self):
+        for key in self.keys():
+            self._solve_item(key)
+
+    def __getitem__(self, key):
+        if key in self:
+            return self._solve_item(key)
+        return super(LazyPresetsDict, self).__getitem__(key)
+
+    def __iter__(self):
+        # Overridden iteration makes `dict(obj)` and `**obj` use
+        # `__getitem__` instead of copying not loaded values (Python 3)
+        return super(LazyPresetsDict, self).__iter__()
+
+    def __repr__(self):
+        self._solve_all()
+        return super(LazyPresetsDict, self).__repr__()
+
+    def __eq__(self, other):
+        self._solve_all()
+        if isinstance(other, LazyPresetsDict):
+            other._solve_all()
+        return super(LazyPresetsDict, self).__eq__(other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def get(self, key, default=None):
+        if key in self:
+            return self._solve_item(key)
+        return default
+
+    def values(self):
+        self._solve_all()
+        return super(LazyPresetsDict, self).values()
+
+    def items(self):
+        self._solve_all()
+        return super(LazyPresetsDict, self).items()
+
+    def copy(self):
+        self._solve_all()
+        return dict(self)
+
+    def pop(self, key, *args):
+        if key in self:
+            self._solve_item(key)
+        return super(LazyPresetsDict, self).pop(key, *args)
+
+    def popitem(self):
+        key, value = super(LazyPresetsDict, self).popitem()
+        return key, self._solve_value(value)
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self._solve_item(key)
+        return super(LazyPresetsDict, self).setdefault(key, default)
+
+
+class PresetsCache(object):
+    """Process wide cache of presets per project.
+
+    Json files are parsed only once and again only when their modification
+    time or size changed, data of default presets are shared between
+    projects. Files are checked at most once per `poll_interval` seconds,
+    check lists presets directories and stats json files.
+
+    Returned presets are `ImmutableDict` objects (lists are converted to
+    tuples) shared between callers so they can't be modified.
+
+    Example:
+        ```
+        presets = PresetsCache.get("MyProject")
+        # Same as
+        presets = config.get_presets("MyProject", use_cache=True)
+        ```
+    """
+
+    # Seconds between checks of presets files
+    poll_interval = 5.0
+
+    _lock = threading.Lock()
+    # Presets paths: (presets, files signature, time of last check)
+    _entries = {}
+    # File path: ((modification time, size), parsed data)
+    _files = {}
+
+    @staticmethod
+    def files_signature(paths):
+        """Keys, paths, modification time and size of presets files.
+
+        Args:
+            paths (tuple): Default presets path and project presets path
+                from `presets_paths`.
+
+        Returns:
+            tuple: Signature of files for each presets path. Signature of
+                not existing (or not set) path is `None`.
+        """
+        signature = []
+        for path in paths:
+            if path is None or not os.path.isdir(path):
+                signature.append(None)
+                continue
+
+            files = []
+            for keys, file_path in _list_json_files(path):
+                file_signature = _file_signature(file_path)
+                # File could be removed during listing
+                if file_signature is not None:
+                    files.append((keys, file_path, file_signature))
+            signature.append(tuple(files))
+        return tuple(signature)
+
+    @classmethod
+    def get(cls, project=None, first_run=False):
+        """Return shared presets of project.
+
+        Args:
+            project (str, optional): Name of project. Value of
+                `AVALON_PROJECT` environment is used when not set.
+            first_run (bool): Log issues of parsed json files.
+
+        Returns:
+            ImmutableDict/None: Presets or None if default presets path
+                does not exist.
+        """
+        paths = presets_paths(project)
+        with cls._lock:
+            now = time.time()
+            entry = cls._entries.get(paths)
+            if entry is not None:
+                presets, signature, last_check = entry
+                if now - last_check < cls.poll_interval:
+                    return presets
+
+                new_signature = cls.files_signature(paths)
+                if new_signature == signature:
+                    cls._entries[paths] = (presets, signature, now)
+                    return presets
+
+                log.debug("Presets files changed.")
+            else:
+                new_signature = cls.files_signature(paths)
+
+            presets = cls._load(paths, new_signature, first_run)
+            cls._entries[paths] = (presets, new_signature, now)
+            return presets
+
+    @classmethod
+    def _load(cls, paths, signature, first_run):
+        default_files, project_files = signature
+        if default_files is None:
+            log.error('Preset path was not found: "{}"'.format(paths[0]))
+            return None
+
+        data = cls._collect(default_files, first_run)
+        if project_files:
+            # `update_dict` modifies data which are shared in cache
+            data = update_dict(
+                copy.deepcopy(data), cls._collect(project_files, first_run)
+            )
+        return freeze_data(data)
+
+    @classmethod
+    def _collect(cls, files, first_run):
+        """Data of files parsed again only if file changed."""
+        items = []
+        for keys, path, file_signature in files:
+            item = cls._files.get(path)
+            if item is None or item[0] != file_signature:
+                item = (file_signature, load_json(path, first_run))
+                cls._files[path] = item
+            items.append((keys, item[1]))
+        return _json_tree(items)
+
+    @classmethod
+    def invalidate(cls, project=None):
+        """Remove cached presets of project."""
+        paths = presets_paths(project)
+        with cls._lock:
+            cls._entries.pop(paths, None)
+
+    @classmethod
+    def clear(cls):
+        """Remove cached presets of all projects and parsed files."""
+        with cls._lock:
+            cls._entries.clear()
+            cls._files.clear()
+
+
+# Version of presets bundle format
+PRESETS_BUNDLE_VERSION = 2
+
+
+def presets_bundle_path(project=None):
+    """Path to compiled presets bundle of project in user's cache directory.
+
+    Bundle path is different for each combination of presets paths so
+    bundles of different pype configs don't collide.
+
+    Args:
+        project (str, optional): Name of project. Value of `AVALON_PROJECT`
+            environment is used when not set.
+
+    Returns:
+        str: Path to bundle file. File may not exist.
+    """
+    paths = presets_paths(project)
+    hash_obj = hashlib.sha1()
+    for path in paths:
+        if path is not None:
+            hash_obj.update(path.encode("utf-8"))
+        hash_obj.update(b"\0")
+
+    project_name = "default"
+    if paths[1] is not None:
+        project_name = os.path.basename(os.path.dirname(paths[1]))
+    filename = "{}_{}.json".format(project_name, hash_obj.hexdigest()[:16])
+    return os.path.join(user_cache_dir(), "presets", filename)
+
+
+def _file_hash(path):
+    """Sha1 hex digest of file content or None if file can't be read."""
+    try:
+        with open(path, "rb") as stream:
+            return hashlib.sha1(stream.read()).hexdigest()
+    except (IOError, OSError):
+        return None
+
+
+def _compile_presets_layer(path):
+    """Data and manifest of json files in presets directory.
+
+    Returns:
+        tuple: Data as returned from `collect_json_from_path` and manifest
+            with signatures of all directories and keys, path, modification
+            time, size and hash of each file. Both are None if directory
+            does not exist.
+    """
+    if path is None or not os.path.isdir(path):
+        return None, None
+
+    directories = []
+    for dir_path in sorted(_list_directories(path)):
+        dir_signature = _file_signature(dir_path)
+        if dir_signature is not None:
+            directories.append([dir_path, list(dir_signature)])
+
+    items = []
+    files = []
+    for keys, file_path in _list_json_files(path):
+        file_signature = _file_signature(file_path)
+        if file_signature is None:
+            continue
+        mtime, size = file_signature
+        files.append(
+            [list(keys), file_path, mtime, size, _file_hash(file_path)]
+        )
+        items.append((keys, load_json(file_path, True)))
+
+    manifest = {"directories": directories, "files": files}
+    return _json_tree(items), manifest
+
+
+def compile_presets(project=None):
+    """Write presets of project into one bundle file in local cache.
+
+    Bundle contains default presets and project presets separately with
+    manifest of source directories and files. `get_presets` loads presets
+    from the bundle with one read of local file and stat of each presets
+    directory and json file while no file was changed.
+
+    Args:
+        project (str, optional): Name of project. Value of `AVALON_PROJECT`
+            environment is used when not set. Only default presets are
+            compiled when project is not set.
+
+    Returns:
+        str/None: Path to written bundle or None if default presets path
+            does not exist.
+    """
+    paths = presets_paths(project)
+    default_data, default_manifest = _compile_presets_layer(paths[0])
+    if default_manifest is None:
+        log.error('Preset path was not found: "{}"'.format(paths[0]))
+        return None
+    project_data, project_manifest = _compile_presets_layer(paths[1])
+
+    content = json.dumps({
+        "version": PRESETS_BUNDLE_VERSION,
+        "paths": list(paths),
+        "manifest": [default_manifest, project_manifest],
+        "default": default_data,
+        "project": project_data
+    })
+
+    bundle_path = presets_bundle_path(project)
+    bundle_dir = os.path.dirname(bundle_path)
+    if not os.path.exists(bundle_dir):
+        os.makedirs(bundle_dir)
+
+    # Write to temporary file first so hosts never read partially written
+    # bundle
+    fd, tmp_path = tempfile.mkstemp(dir=bundle_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as stream:
+            stream.write(content)
+
+        if os.path.exists(bundle_path):
+            os.remove(bundle_path)
+        os.rename(tmp_path, bundle_path)
+
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return bundle_path
+
+
+def _presets_layer_fresh(path, manifest, verify_files=False):
+    """Source files of presets directory match manifest of bundle.
+
+    Each directory and json file from manifest is checked with stat only.
+    Adding, removing or renaming of file changes modification time of its
+    directory so directories don't have to be listed. Files with changed
+    modification time or size are compared by hash of their content so
+    touched but not modified files don't outdate bundle.
+
+    Args:
+        path (str): Path to presets directory.
+        manifest (dict): Manifest of layer from bundle.
+        verify_files (bool): List presets directories and compare found
+            json files with manifest. Useful on filesystems which don't
+            update modification time of directories.
+    """
+    if manifest is None:
+        return path is None or not os.path.isdir(path)
+
+    if path is None:
+        return False
+
+    for dir_path, dir_signature in manifest["directories"]:
+        file_signature = _file_signature(dir_path)
+        if file_signature is None or list(file_signature) != dir_signature:
+            return False
+
+    for _, file_path, mtime, size, file_hash in manifest["files"]:
+        file_signature = _file_signature(file_path)
+        if file_signature is None:
+            return False
+        if list(file_signature) == [mtime, size]:
+            continue
+        if file_hash is None or _file_hash(file_path) != file_hash:
+            return False
+
+    if not verify_files:
+        return True
+
+    files = sorted(
+        [list(keys), file_path]
+        for keys, file_path in _list_json_files(path)
+    )
+    return files == sorted(item[:2] for item in manifest["files"])
+
+
+def load_presets_bundle(project=None, verify_files=False):
+    """Presets from compiled bundle if bundle is up to date.
+
+    Freshness of bundle is checked by modification time and size of
+    presets directories and json files without listing of directories or
+    reading of files. Content of files with changed signature is compared
+    by hash.
+
+    Args:
+        project (str, optional): Name of project. Value of `AVALON_PROJECT`
+            environment is used when not set.
+        verify_files (bool): List presets directories to find added or
+            removed json files too.
+
+    Returns:
+        dict/None: Presets or None if bundle does not exist, is outdated or
+            file cache is disabled.
+    """
+    if not cache_enabled():
+        return None
+
+    bundle_path = presets_bundle_path(project)
+    try:
+        with open(bundle_path, "r") as stream:
+            bundle = json.load(stream)
+    except (IOError, OSError, ValueError):
+        return None
+
+    paths = presets_paths(project)
+    if (
+        not isinstance(bundle, dict)
+        or bundle.get("version") != PRESETS_BUNDLE_VERSION
+        or bundle.get("paths") != list(paths)
+    ):
+        return None
+
+    for path, manifest in zip(paths, bundle["manifest"]):
+        if not _presets_layer_fresh(path, manifest, verify_files):
+            log.debug("Presets bundle \"{}\" is outdated.".format(
+                bundle_path
+            ))
+            return None
+
+    data = bundle["default"]
+    if bundle["project"] is not None:
+        data = update_dict(data, bundle["project"])
+    return data
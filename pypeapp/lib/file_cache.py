@@ -0,0 +1,256 @@
+"""Cache of data parsed from files stored in user's cache directory.
+
+Parsing of some files (e.g. anatomy yaml files with `ruamel.yaml`) is slow,
+especially in hosts where files are on network shares. Parsed data are
+stored with `marshal` into cache file and loaded again when all source
+files have same modification time and size and pype version did not
+change.
+
+Cache directory can be changed with `PYPE_CACHE_DIR` environment variable
+and cache can be disabled with `PYPE_DISABLE_FILE_CACHE` set to `1`.
+"""
+import os
+import re
+import sys
+import marshal
+import hashlib
+import platform
+import tempfile
+
+from .log import PypeLogger
+
+log = PypeLogger().get_logger(__name__)
+
+_pype_version = None
+
+
+def pype_version():
+    """Version of pype from `version.py` in pype setup root.
+
+    Returns:
+        str: Version string or `"unknown"` if version file was not found.
+    """
+    global _pype_version
+    if _pype_version is not None:
+        return _pype_version
+
+    version_path = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__)
+        ))),
+        "version.py"
+    )
+    _pype_version = "unknown"
+    try:
+        with open(version_path, "r") as stream:
+            match = re.search(
+                r"__version__\s*=\s*[\"']([^\"']+)[\"']", stream.read()
+            )
+        if match:
+            _pype_version = match.group(1)
+    except (IOError, OSError):
+        pass
+    return _pype_version
+
+
+def user_cache_dir():
+    """Directory where pype stores cache files of current user.
+
+    Returns:
+        str: Path to directory. Directory may not exist yet.
+    """
+    path = os.environ.get("PYPE_CACHE_DIR")
+    if path:
+        return os.path.normpath(path)
+
+    system = platform.system().lower()
+    if system == "windows":
+        root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(root, "pype", "cache")
+
+    if system == "darwin":
+        return os.path.join(
+            os.path.expanduser("~"), "Library", "Caches", "pype"
+        )
+
+    root = (
+        os.environ.get("XDG_CACHE_HOME")
+        or os.path.join(os.path.expanduser("~"), ".cache")
+    )
+    return os.path.join(root, "pype")
+
+
+def cache_enabled():
+    """File cache is not used when `PYPE_DISABLE_FILE_CACHE` is set to 1."""
+    return os.environ.get("PYPE_DISABLE_FILE_CACHE") != "1"
+
+
+class FileCache(object):
+    """Cache of data parsed from source files.
+
+    Cached data must contain only builtin types supported by `marshal`.
+    Cache is keyed by paths of source files, their modification time and
+    size, pype version and python version (marshal format is not compatible
+    between python versions).
+
+    Args:
+        namespace (str): Name of subfolder in cache directory.
+        cache_dir (str, optional): Cache directory. `user_cache_dir` is used
+            when not set.
+    """
+
+    def __init__(self, namespace, cache_dir=None):
+        self.namespace = namespace
+        self._cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache_dir(self):
+        if self._cache_dir:
+            return self._cache_dir
+        return os.path.join(user_cache_dir(), self.namespace)
+
+    @staticmethod
+    def source_signature(source_paths):
+        """Paths with modification time and size of source files.
+
+        Returns:
+            tuple/None: Signature of files or None if any file can't be
+                accessed.
+        """
+        signature = []
+        for path in source_paths:
+            path = os.path.normpath(os.path.abspath(path))
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+
+            mtime = getattr(stat, "st_mtime_ns", None)
+            if mtime is None:
+                mtime = repr(stat.st_mtime)
+            signature.append((path, mtime, stat.st_size))
+        return (
+            pype_version(), tuple(sys.version_info[:2]), tuple(signature)
+        )
+
+    def cache_path(self, source_paths, key=None):
+        """Path to cache file for source paths and optional key."""
+        hash_obj = hashlib.sha1()
+        for path in source_paths:
+            hash_obj.update(
+                os.path.normpath(os.path.abspath(path)).encode("utf-8")
+            )
+            hash_obj.update(b"\0")
+        if key:
+            hash_obj.update(key.encode("utf-8"))
+        return os.path.join(self.cache_dir, hash_obj.hexdigest() + ".cache")
+
+    def get(self, source_paths, key=None):
+        """Return cached data for source files.
+
+        Args:
+            source_paths (list): Paths to files from which data were parsed.
+            key (str, optional): Additional key to distinguish data parsed
+                from the same files in different way.
+
+        Returns:
+            tuple: Bool if cache was hit and cached data.
+        """
+        if not cache_enabled():
+            return False, None
+
+        signature = self.source_signature(source_paths)
+        cache_path = self.cache_path(source_paths, key)
+        content = None
+        if signature is not None:
+            try:
+                with open(cache_path, "rb") as stream:
+                    content = marshal.load(stream)
+            except (IOError, OSError, EOFError, ValueError, TypeError):
+                content = None
+
+        if (
+            isinstance(content, tuple)
+            and len(content) == 2
+            and content[0] == signature
+        ):
+            self.hits += 1
+            log.debug("File cache hit for {}".format(", ".join(source_paths)))
+            return True, content[1]
+
+        self.misses += 1
+        log.debug("File cache miss for {}".format(", ".join(source_paths)))
+        return False, None
+
+    def set(self, source_paths, data, key=None):
+        """Store data parsed from source files to cache.
+
+        Cache is not stored if data can't be marshaled or cache directory is
+        not writeable.
+
+        Returns:
+            bool: Data were stored.
+        """
+        if not cache_enabled():
+            return False
+
+        signature = self.source_signature(source_paths)
+        if signature is None:
+            return False
+
+        try:
+            content = marshal.dumps((signature, data))
+        except ValueError:
+            log.debug("Data of {} can't be cached.".format(
+                ", ".join(source_paths)
+            ))
+            return False
+
+        cache_path = self.cache_path(source_paths, key)
+        cache_dir = os.path.dirname(cache_path)
+        tmp_path = None
+        try:
+            if not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+
+            # Write to temporary file first so other processes never read
+            # partially written cache
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as stream:
+                stream.write(content)
+
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            os.rename(tmp_path, cache_path)
+            tmp_path = None
+
+        except (IOError, OSError):
+            log.debug(
+                "Failed to write cache file \"{}\"".format(cache_path),
+                exc_info=True
+            )
+            return False
+
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return True
+
+    def load(self, source_paths, loader, key=None):
+        """Return cached data or data returned from loader.
+
+        Args:
+            source_paths (list): Paths to files from which data are parsed.
+            loader (callable): Parses data from source files when cache is
+                missing or outdated.
+            key (str, optional): Additional key of cache.
+        """
+        hit, data = self.get(source_paths, key)
+        if hit:
+            return data
+
+        data = loader()
+        self.set(source_paths, data, key)
+        return data
@@ -0,0 +1,188 @@
+"""Remap root paths in publish metadata json files.
+
+Metadata files of farm publish jobs contain absolute paths from platform
+where job was submitted. Paths starting with a project root are remapped to
+root of other platform (current platform by default).
+
+Json is processed in chunks and only strings are parsed so memory usage does
+not depend on size of metadata file.
+"""
+import io
+import os
+import re
+import json
+import shutil
+import tempfile
+
+from .log import PypeLogger
+
+log = PypeLogger().get_logger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Content of json string without quotes (may end in middle of string)
+_string_content_regex = re.compile(r"[^\"\\]*(?:\\.[^\"\\]*)*")
+# Characters which must be escaped in json string
+_escape_regex = re.compile(r"[\x00-\x1f\"\\]")
+
+
+def _remap_string_token(token, remap):
+    """Remapped json string token or None if value was not changed."""
+    if "\\" in token:
+        value = json.loads(token)
+    else:
+        value = token[1:-1]
+
+    new_value = remap(value)
+    if new_value is None or new_value == value.replace("\\", "/"):
+        return None
+    if not _escape_regex.search(new_value):
+        return "\"" + new_value + "\""
+    # Keep type of token ('json.dumps' may return 'str' in Python 2)
+    return type(token)(json.dumps(new_value, ensure_ascii=False))
+
+
+def remap_json_stream(
+    src_stream, dst_stream, remap, chunk_size=DEFAULT_CHUNK_SIZE
+):
+    """Copy json between streams with remapped strings.
+
+    Everything except strings is copied as is. Strings (including keys of
+    objects) are passed to `remap` function and replaced by returned value.
+
+    Args:
+        src_stream (io.TextIOBase): Stream with json content.
+        dst_stream (io.TextIOBase): Stream where output is written.
+        remap (callable): Receive string value and return new value or None
+            if value should not be changed. Values which differ only in
+            slashes are not changed.
+        chunk_size (int): Count of characters read at once.
+
+    Returns:
+        int: Count of remapped strings.
+    """
+    remapped_count = 0
+    string_parts = None
+    leftover = ""
+    while True:
+        chunk = src_stream.read(chunk_size)
+        if not chunk:
+            break
+
+        if leftover:
+            chunk = leftover + chunk
+            leftover = ""
+
+        pos = 0
+        chunk_len = len(chunk)
+        while pos < chunk_len:
+            if string_parts is None:
+                quote_idx = chunk.find("\"", pos)
+                if quote_idx < 0:
+                    dst_stream.write(chunk[pos:])
+                    break
+
+                dst_stream.write(chunk[pos:quote_idx])
+                string_parts = ["\""]
+                pos = quote_idx + 1
+                continue
+
+            end_idx = _string_content_regex.match(chunk, pos).end()
+            if end_idx < chunk_len and chunk[end_idx] == "\"":
+                string_parts.append(chunk[pos:end_idx + 1])
+                token = "".join(string_parts)
+                string_parts = None
+                new_token = _remap_string_token(token, remap)
+                if new_token is None:
+                    dst_stream.write(token)
+                else:
+                    dst_stream.write(new_token)
+                    remapped_count += 1
+                pos = end_idx + 1
+                continue
+
+            # String continues in next chunk. Backslash at the end of chunk
+            #   is kept for next chunk to keep escape sequence together.
+            string_parts.append(chunk[pos:end_idx])
+            leftover = chunk[end_idx:]
+            break
+
+    if string_parts is not None or leftover:
+        raise ValueError("Json content ends in unterminated string.")
+    return remapped_count
+
+
+def _replace_file(src_path, dst_path):
+    """Move file to destination path and replace existing file.
+
+    Replacement is atomic with `os.replace` (Python 3) and with `os.rename`
+    on other than Windows platforms.
+    """
+    replace = getattr(os, "replace", None)
+    if replace is not None:
+        replace(src_path, dst_path)
+        return
+
+    if os.name == "nt" and os.path.exists(dst_path):
+        os.remove(dst_path)
+    os.rename(src_path, dst_path)
+
+
+def remap_metadata_file(
+    path,
+    project_name=None,
+    src_platform=None,
+    dst_platform=None,
+    output_path=None,
+    chunk_size=DEFAULT_CHUNK_SIZE
+):
+    """Remap root paths in metadata json file using project's roots.
+
+    Args:
+        path (str): Path to json file.
+        project_name (str, optional): Project of which roots are used.
+            `AVALON_PROJECT` environment is used when not set.
+        src_platform (str, optional): Platform of paths in file. Roots of all
+            platforms are remapped when not set.
+        dst_platform (str, optional): Platform to which paths are remapped.
+            Current platform is used when not set.
+        output_path (str, optional): Path where output is stored. Source
+            file is replaced when not set and any path was remapped.
+        chunk_size (int): Count of characters read at once.
+
+    Returns:
+        int: Count of remapped strings.
+    """
+    from .anatomy import Anatomy
+
+    anatomy = Anatomy(project_name)
+    remap_table = anatomy.roots_obj.remap_table(src_platform, dst_platform)
+
+    replace_source = output_path is None
+    if replace_source:
+        output_path = path
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix=".json.tmp")
+    os.close(fd)
+    try:
+        with io.open(path, "r", encoding="utf-8", newline="") as src_stream:
+            with io.open(
+                tmp_path, "w", encoding="utf-8", newline=""
+            ) as dst_stream:
+                remapped_count = remap_json_stream(
+                    src_stream, dst_stream, remap_table.remap, chunk_size
+                )
+
+        # Source file is not rewritten when nothing changed
+        if remapped_count or not replace_source:
+            # Temporary file is readable only by owner
+            shutil.copymode(path, tmp_path)
+            _replace_file(tmp_path, output_path)
+
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    log.info("Remapped {} paths in \"{}\"".format(remapped_count, path))
+    return remapped_count
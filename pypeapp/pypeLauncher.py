@@ -468,6 +468,76 @@ class PypeLauncher(object):
 
         uninstall()
 
+    def remap_metadata(
+        self, path, project=None, src_platform=None, dst_platform=None,
+        output=None
+    ):
+        """Remap root paths in publish metadata json file.
+
+        :param path: path to metadata json file
+        :type path: str
+        :param project: name of project which roots are used
+        :type project: str
+        :param src_platform: platform of paths in file
+        :type src_platform: str
+        :param dst_platform: platform to which paths are remapped
+        :type dst_platform: str
+        :param output: output path, source file is rewritten if not set
+        :type output: str
+        """
+        from pypeapp.lib.Terminal import Terminal
+
+        self._initialize()
+
+        from pypeapp.lib.remap_metadata import remap_metadata_file
+
+        t = Terminal()
+        t.echo(">>> Remapping paths in [ {} ]".format(path))
+        count = remap_metadata_file(
+            path,
+            project_name=project or None,
+            src_platform=src_platform,
+            dst_platform=dst_platform,
+            output_path=output
+        )
+        t.echo(">>> Remapped {} paths.".format(count))
+
+    def compile_presets(self, project=None, all_projects=False):
+        """Compile presets into bundle files in local cache.
+
+        :param project: name of project which presets are compiled, only
+                        default presets are compiled if not set
+        :type project: str
+        :param all_projects: compile presets of all projects which have
+                             folder in project configs
+        :type all_projects: bool
+        """
+        from pypeapp.lib.Terminal import Terminal
+
+        self._initialize()
+
+        from pypeapp.lib import config
+
+        t = Terminal()
+        projects = [project or None]
+        project_configs = os.environ.get("PYPE_PROJECT_CONFIGS")
+        if all_projects and project_configs:
+            projects = [None] + sorted(
+                name
+                for name in os.listdir(project_configs)
+                if os.path.isdir(os.path.join(project_configs, name))
+            )
+
+        for project_name in projects:
+            t.echo(">>> Compiling presets of [ {} ]".format(
+                project_name or "default"
+            ))
+            bundle_path = config.compile_presets(project_name)
+            if bundle_path is None:
+                t.echo("!!! Presets were not found.")
+                return
+            t.echo(">>> Presets written to [ {} ]".format(bundle_path))
+
     def run_pype_tests(self, keyword=None, id=None):
         """Run pytest on `pype/pype/tests` directory."""
         from pypeapp.lib.Terminal import Terminal
@@ -0,0 +1,67 @@
+"""Collection of presets tree on filesystem with latency.
+
+Compares previous serial `collect_json_from_path` (`os.listdir` and
+`os.path.isdir` for each item) with current implementation using
+`os.scandir`, serial and with thread pool.
+"""
+import os
+import shutil
+import tempfile
+
+from pypeapp.lib import config
+from . import lib
+
+
+def previous_collect_json_from_path(input_path):
+    output = None
+    if os.path.isdir(input_path):
+        output = {}
+        for file in os.listdir(input_path):
+            full_path = os.path.sep.join([input_path, file])
+            if os.path.isdir(full_path):
+                loaded = previous_collect_json_from_path(full_path)
+                if loaded:
+                    output[file] = loaded
+            else:
+                basename, ext = os.path.splitext(os.path.basename(file))
+                if ext == '.json':
+                    output[basename] = config.load_json(full_path)
+    else:
+        basename, ext = os.path.splitext(os.path.basename(input_path))
+        if ext == '.json':
+            output = config.load_json(input_path)
+    return output
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        presets_path = os.path.join(tmp_dir, "presets")
+        count = lib.create_presets(presets_path)
+        expected = previous_collect_json_from_path(presets_path)
+
+        lib.print_row("{} json files".format(count), "ms")
+        for latency in (0, 0.002):
+            for label, func in (
+                ("previous", previous_collect_json_from_path),
+                ("scandir", config.collect_json_from_path),
+                ("scandir, 8 workers", lambda path: (
+                    config.collect_json_from_path(path, workers=8)
+                )),
+                ("scandir, 32 workers", lambda path: (
+                    config.collect_json_from_path(path, workers=32)
+                )),
+            ):
+                with lib.inject_latency(latency):
+                    assert func(presets_path) == expected
+                    duration = lib.timeit(lambda: func(presets_path), 3)
+                lib.print_row(
+                    "{}, {} ms latency".format(label, latency * 1000),
+                    "{:.3f}".format(duration * 1000)
+                )
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Lookup of existing workfile versions with and without directory cache.
+
+Work directory contains workfiles of several tasks and extensions.
+"""
+import os
+import time
+import shutil
+import tempfile
+
+from pypeapp.lib.anatomy import Roots
+from . import lib
+
+
+def create_workfiles(work_dir, count):
+    os.makedirs(work_dir)
+    for version in range(1, count + 1):
+        for task in ("modeling", "rigging"):
+            for ext in ("ma", "mb"):
+                name = "PRJ_BOB_{}_v{:0>3}.{}".format(task, version, ext)
+                open(os.path.join(work_dir, name), "w").close()
+
+    # Listing of recently modified directory is not cached
+    old_time = time.time() - 60
+    os.utime(work_dir, (old_time, old_time))
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        templates_obj = lib.prepare_templates()
+        root = tmp_dir.replace("\\", "/")
+        templates_obj._roots = Roots._parse_dict({
+            "work": {"windows": root, "linux": root, "darwin": root},
+            "publish": {"windows": root, "linux": root, "darwin": root}
+        })
+        data = lib.fill_data(10)
+        data.pop("ext")
+
+        lib.print_row("files in directory", "uncached ms", "cached ms")
+        for count in (100, 1000):
+            work_dir = os.path.join(
+                tmp_dir, "P001_ProjectX", "assets", "characters", "BOB",
+                "work", "modeling_{}".format(count)
+            )
+            create_workfiles(work_dir, count)
+            data["task"] = "modeling_{}".format(count)
+            templates_obj.find_versions("work", data, use_cache=True)
+
+            uncached = lib.timeit(
+                lambda: templates_obj.find_versions("work", data), number=10
+            )
+            cached = lib.timeit(
+                lambda: templates_obj.find_versions(
+                    "work", data, use_cache=True
+                ),
+                number=10
+            )
+            lib.print_row(
+                str(count * 4),
+                "{:.3f}".format(uncached * 1000),
+                "{:.3f}".format(cached * 1000)
+            )
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
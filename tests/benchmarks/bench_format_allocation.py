@@ -0,0 +1,60 @@
+"""Memory allocated by one `Templates.format` call.
+
+Compares current formatting with formatting which deep copied fill data on
+each call and for each template.
+"""
+import copy
+import tracemalloc
+
+from . import lib
+
+
+def format_with_deepcopy(templates_obj, in_data):
+    """Formatting as it was done before fill data were not copied."""
+    data = copy.deepcopy(in_data)
+    data["root"] = templates_obj.roots
+
+    def solve(templates):
+        output = {}
+        for key, value in templates.items():
+            if isinstance(value, dict):
+                output[key] = solve(value)
+            elif isinstance(value, str):
+                copy.deepcopy(data)
+                output[key] = templates_obj._format_legacy(value, data)
+            else:
+                output[key] = value
+        return output
+
+    return solve(templates_obj.templates)
+
+
+def measure(func):
+    func()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, lib.timeit(func)
+
+
+def main():
+    templates_obj = lib.prepare_templates()
+    lib.print_row("project doc size", "peak KiB", "ms/call")
+    for doc_size in (10, 100, 1000):
+        data = lib.fill_data(doc_size)
+        for label, func in (
+            ("previous", lambda: format_with_deepcopy(templates_obj, data)),
+            ("format", lambda: templates_obj.format(data)),
+            ("format lazy", lambda: templates_obj.format(data, lazy=True)),
+        ):
+            peak, duration = measure(func)
+            lib.print_row(
+                "{} ({})".format(label, doc_size),
+                "{:.1f}".format(peak / 1024.0),
+                "{:.3f}".format(duration * 1000)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Formatting of all templates in frame and version loops.
+
+Compares full `Templates.format` on each step with `with_updates` which
+formats only templates using the changed key.
+"""
+from pypeapp.lib.anatomy import TemplateResult
+from . import lib
+
+
+def count_results(templates):
+    count = 0
+    for value in templates.values():
+        if isinstance(value, dict):
+            count += count_results(value)
+        elif isinstance(value, TemplateResult):
+            count += 1
+    return count
+
+
+def count_shared(previous, current):
+    count = 0
+    for key, value in current.items():
+        if isinstance(value, dict):
+            count += count_shared(previous[key], value)
+        elif isinstance(value, TemplateResult) and value is previous[key]:
+            count += 1
+    return count
+
+
+def main():
+    templates_obj = lib.prepare_templates()
+    data = lib.fill_data(100)
+    steps = 100
+
+    lib.print_row("loop", "ms/step", "shared results")
+    for key, start in (("frame", 1001), ("version", 1)):
+        def full_format():
+            for value in range(start, start + steps):
+                step_data = dict(data)
+                step_data[key] = value
+                templates_obj.format_all(step_data)
+
+        def incremental():
+            filled = templates_obj.format_all(data)
+            for value in range(start, start + steps):
+                filled = filled.with_updates(**{key: value})
+
+        first = templates_obj.format_all(data)
+        second = first.with_updates(**{key: start + 1})
+        shared = "{}/{}".format(
+            count_shared(first, second), count_results(second)
+        )
+        lib.print_row(
+            "format ({})".format(key),
+            "{:.3f}".format(lib.timeit(full_format) * 1000 / steps),
+            ""
+        )
+        lib.print_row(
+            "with_updates ({})".format(key),
+            "{:.3f}".format(lib.timeit(incremental) * 1000 / steps),
+            shared
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Solving of inner keys in large anatomy with deep `{@key}` chains.
+
+Compares dependency graph solving with previous implementation which
+looped over all keys until nothing changed.
+"""
+import copy
+import numbers
+
+from pypeapp.lib.anatomy import Templates
+from . import lib
+
+
+def previous_replace_inner_keys(matches, value, key_values, key):
+    for match in matches:
+        anatomy_sub_keys = Templates.inner_key_name_pattern.findall(match)
+        if key in anatomy_sub_keys:
+            raise ValueError((
+                "Unsolvable recursion in inner keys, "
+                "key: \"{}\" is in his own value."
+            ).format(key))
+
+        for anatomy_sub_key in anatomy_sub_keys:
+            replace_value = key_values.get(anatomy_sub_key)
+            if replace_value is None:
+                raise KeyError("Invalid inner key `{}`.".format(
+                    anatomy_sub_key
+                ))
+
+            if not isinstance(replace_value, (numbers.Number, str)):
+                raise ValueError("Invalid inner key `{}` value.".format(
+                    anatomy_sub_key
+                ))
+
+            value = value.replace(match, str(replace_value))
+
+    return value
+
+
+def previous_prepare_inner_keys(key_values):
+    keys_to_solve = set(key_values.keys())
+    while True:
+        found = False
+        for key in tuple(keys_to_solve):
+            value = key_values[key]
+            if isinstance(value, str):
+                matches = Templates.inner_key_pattern.findall(value)
+                if not matches:
+                    keys_to_solve.remove(key)
+                    continue
+                found = True
+                key_values[key] = previous_replace_inner_keys(
+                    matches, value, key_values, key
+                )
+                continue
+
+            elif not isinstance(value, dict):
+                keys_to_solve.remove(key)
+                continue
+
+            subdict_found = False
+            for _key, _value in tuple(value.items()):
+                matches = Templates.inner_key_pattern.findall(_value)
+                if not matches:
+                    continue
+                subdict_found = True
+                found = True
+                key_values[key][_key] = previous_replace_inner_keys(
+                    matches, _value, key_values, "{}.{}".format(key, _key)
+                )
+            if not subdict_found:
+                keys_to_solve.remove(key)
+
+        if not found:
+            break
+    return key_values
+
+
+def previous_solve(templates):
+    default_key_values = {}
+    for key, value in tuple(templates.items()):
+        if not isinstance(value, dict):
+            default_key_values[key] = templates.pop(key)
+
+    output = {}
+    for sub_key, sub_value in templates.items():
+        key_values = dict(default_key_values)
+        key_values.update(sub_value)
+        output[sub_key] = previous_prepare_inner_keys(key_values)
+    output.update(previous_prepare_inner_keys(default_key_values))
+    return output
+
+
+def chained_templates(global_count, groups, chain_length=20):
+    """Templates where global keys create chains of inner keys."""
+    templates = {
+        "padding": 3,
+        "frame_padding": 4,
+        "version": "v{version:0>{@padding}}",
+        "frame": "{frame:0>{@frame_padding}}"
+    }
+    for idx in range(global_count):
+        if idx % chain_length == 0:
+            value = "{{key_{}}}_v{{version:0>{{@padding}}}}".format(idx)
+        else:
+            value = "{{@global_{}}}/{{key_{}}}".format(idx - 1, idx)
+        templates["global_{}".format(idx)] = value
+
+    for idx in range(groups):
+        group = dict(lib.studio_templates["publish"])
+        group["file"] = "{{@global_{}}}.{{ext}}".format(global_count - 1)
+        if idx % 10 == 0:
+            group["padding"] = 4
+        templates["group_{}".format(idx)] = group
+    return templates
+
+
+def main():
+    lib.print_row("templates", "previous ms", "graph ms")
+    for global_count, groups in ((200, 50), (1000, 100), (2000, 200)):
+        templates = chained_templates(global_count, groups)
+        count = global_count + groups * len(lib.studio_templates["publish"])
+        assert (
+            previous_solve(copy.deepcopy(templates))
+            == Templates.solve_template_inner_links(copy.deepcopy(templates))
+        )
+        previous = lib.timeit(
+            lambda: previous_solve(copy.deepcopy(templates)), repeat=1
+        )
+        current = lib.timeit(
+            lambda: Templates.solve_template_inner_links(
+                copy.deepcopy(templates)
+            ),
+            repeat=3
+        )
+        lib.print_row(
+            str(count),
+            "{:.1f}".format(previous * 1000),
+            "{:.1f}".format(current * 1000)
+        )
+
+
+if __name__ == "__main__":
+    main()
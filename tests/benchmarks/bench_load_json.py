@@ -0,0 +1,88 @@
+"""Load of large preset json files with current and previous `load_json`.
+
+Previous implementation stripped and concatenated lines and replaced
+`",]"` and `",}"` everywhere (also in strings).
+"""
+import os
+import re
+import json
+import shutil
+import tempfile
+
+from pypeapp.lib import config
+from . import lib
+
+
+def previous_load_json(fpath):
+    with open(fpath, "r") as opened_file:
+        lines = opened_file.read().splitlines()
+
+    standard_json = ""
+    for line in lines:
+        line = line.strip()
+        if len(line) == 0:
+            continue
+        standard_json += line
+
+    standard_json = standard_json.replace(",]", "]")
+    standard_json = standard_json.replace(",}", "}")
+    if standard_json == "":
+        return {}
+
+    try:
+        return json.loads(standard_json)
+    except config.JsonError:
+        return {}
+
+
+def preset_data(plugins):
+    return {
+        "Plugin{}".format(idx): {
+            "enabled": True,
+            "families": ["render", "review", "plate"],
+            "order": idx / 10.0,
+            "label": "Plugin number {}".format(idx),
+            "hosts": {
+                "maya": {"optional": True, "active": idx % 2 == 0},
+                "nuke": {"optional": False, "active": True},
+            }
+        }
+        for idx in range(plugins)
+    }
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        lib.print_row("file", "KiB", "previous ms", "current ms")
+        for plugins in (100, 5000):
+            text = json.dumps(preset_data(plugins), indent=4)
+            for label, content in (
+                ("valid", text),
+                ("trailing comma", text.replace("\n}", ",\n}")),
+                (
+                    "trailing commas everywhere",
+                    re.sub(r"([^{\[,\s])(\n\s*[}\]])", r"\1,\2", text)
+                ),
+            ):
+                path = os.path.join(tmp_dir, "presets.json")
+                with open(path, "w") as stream:
+                    stream.write(content)
+
+                assert previous_load_json(path) == config.load_json(path)
+                lib.print_row(
+                    "{} plugins, {}".format(plugins, label),
+                    "{:.0f}".format(len(content) / 1024.0),
+                    "{:.3f}".format(
+                        lib.timeit(lambda: previous_load_json(path)) * 1000
+                    ),
+                    "{:.3f}".format(
+                        lib.timeit(lambda: config.load_json(path)) * 1000
+                    )
+                )
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
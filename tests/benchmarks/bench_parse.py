@@ -0,0 +1,50 @@
+"""Classification of crawled paths with `Templates.parse_many`.
+
+Compares parsing with combined regex of all templates with matching each
+template regex one by one.
+"""
+import random
+
+from . import lib
+
+
+def crawled_paths(templates_obj, count):
+    """Paths filled by random templates mixed with unrelated paths."""
+    data = lib.fill_data(0)
+    filled = templates_obj.format(data)
+    paths = []
+    for key, value in filled.items():
+        if isinstance(value, dict) and "path" in value:
+            paths.append(str(value["path"]))
+    paths.append("/mnt/share/projects/publish/P001_ProjectX/unknown.txt")
+
+    rand = random.Random(0)
+    return [rand.choice(paths) for _ in range(count)]
+
+
+def parse_sequentially(parser, paths):
+    for path in paths:
+        for candidate in parser.candidates:
+            if candidate[2].match(path):
+                break
+
+
+def main():
+    templates_obj = lib.prepare_templates()
+    parser = templates_obj.parser()
+    lib.print_row("paths", "sequential s", "parse_many s")
+    for count in (10000, 100000):
+        paths = crawled_paths(templates_obj, count)
+        sequential = lib.timeit(
+            lambda: parse_sequentially(parser, paths), repeat=3
+        )
+        combined = lib.timeit(
+            lambda: list(templates_obj.parse_many(paths)), repeat=3
+        )
+        lib.print_row(
+            str(count), "{:.3f}".format(sequential), "{:.3f}".format(combined)
+        )
+
+
+if __name__ == "__main__":
+    main()
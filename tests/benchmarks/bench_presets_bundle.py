@@ -0,0 +1,48 @@
+"""Load of presets from source files and from compiled presets bundle.
+
+Bundle is read with one local file read after check that source files did
+not change (stat of presets directories and json files).
+"""
+import os
+import shutil
+import tempfile
+
+from pypeapp.lib import config
+from . import lib
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    orig_environ = dict(os.environ)
+    try:
+        config_path = os.path.join(tmp_dir, "config")
+        projects_path = os.path.join(tmp_dir, "projects")
+        count = lib.create_presets(os.path.join(config_path, "presets"))
+        lib.create_presets(
+            os.path.join(projects_path, "MyProject", "presets"),
+            folders=2, files=2
+        )
+        os.environ["PYPE_CONFIG"] = config_path
+        os.environ["PYPE_PROJECT_CONFIGS"] = projects_path
+        os.environ["PYPE_CACHE_DIR"] = os.path.join(tmp_dir, "cache")
+        os.environ.pop("PYPE_DISABLE_FILE_CACHE", None)
+
+        lib.print_row("{} json files".format(count), "ms")
+        lib.print_row("source files", "{:.3f}".format(
+            lib.timeit(lambda: config.get_presets("MyProject")) * 1000
+        ))
+        lib.print_row("compile", "{:.3f}".format(
+            lib.timeit(lambda: config.compile_presets("MyProject")) * 1000
+        ))
+        lib.print_row("bundle", "{:.3f}".format(
+            lib.timeit(lambda: config.get_presets("MyProject")) * 1000
+        ))
+
+    finally:
+        os.environ.clear()
+        os.environ.update(orig_environ)
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Repeated `config.get_presets` calls with and without presets cache.
+
+Project overrides change few files of default presets. Cached presets are
+validated on each call (poll interval is 0) or returned without check
+within poll interval.
+"""
+import os
+import shutil
+import tempfile
+
+from pypeapp.lib import config
+from . import lib
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    orig_environ = dict(os.environ)
+    try:
+        config_path = os.path.join(tmp_dir, "config")
+        projects_path = os.path.join(tmp_dir, "projects")
+        count = lib.create_presets(os.path.join(config_path, "presets"))
+        lib.create_presets(
+            os.path.join(projects_path, "MyProject", "presets"),
+            folders=2, files=2
+        )
+        os.environ["PYPE_CONFIG"] = config_path
+        os.environ["PYPE_PROJECT_CONFIGS"] = projects_path
+
+        lib.print_row("{} json files".format(count), "ms")
+        lib.print_row("uncached", "{:.3f}".format(
+            lib.timeit(lambda: config.get_presets("MyProject")) * 1000
+        ))
+
+        config.PresetsCache.clear()
+        config.get_presets("MyProject", use_cache=True)
+        config.PresetsCache.poll_interval = 0
+        lib.print_row("cached with files check", "{:.3f}".format(
+            lib.timeit(
+                lambda: config.get_presets("MyProject", use_cache=True),
+                number=10
+            ) * 1000
+        ))
+
+        config.PresetsCache.poll_interval = 60
+        lib.print_row("cached within poll interval", "{:.3f}".format(
+            lib.timeit(
+                lambda: config.get_presets("MyProject", use_cache=True),
+                number=1000
+            ) * 1000
+        ))
+
+    finally:
+        os.environ.clear()
+        os.environ.update(orig_environ)
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Access of one presets subtree with all presets loaded and lazy presets.
+
+Callers usually read one top level key (e.g. `presets["plugins"]`) or one
+json file of it.
+"""
+import os
+import shutil
+import tempfile
+
+from pypeapp.lib import config
+from . import lib
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    orig_environ = dict(os.environ)
+    try:
+        config_path = os.path.join(tmp_dir, "config")
+        projects_path = os.path.join(tmp_dir, "projects")
+        count = lib.create_presets(os.path.join(config_path, "presets"))
+        lib.create_presets(
+            os.path.join(projects_path, "MyProject", "presets"),
+            folders=2, files=2
+        )
+        os.environ["PYPE_CONFIG"] = config_path
+        os.environ["PYPE_PROJECT_CONFIGS"] = projects_path
+        os.environ["PYPE_CACHE_DIR"] = os.path.join(tmp_dir, "cache")
+
+        def subtree(lazy):
+            presets = config.get_presets("MyProject", lazy=lazy)
+            return list(presets["folder_1"].items())
+
+        def one_file(lazy):
+            presets = config.get_presets("MyProject", lazy=lazy)
+            return presets["folder_1"]["file_1"]
+
+        lib.print_row("{} json files".format(count), "all ms", "lazy ms")
+        for label, func in (
+            ("one subtree", subtree),
+            ("one json file", one_file),
+        ):
+            lib.print_row(
+                label,
+                "{:.3f}".format(lib.timeit(lambda: func(False)) * 1000),
+                "{:.3f}".format(lib.timeit(lambda: func(True)) * 1000)
+            )
+
+    finally:
+        os.environ.clear()
+        os.environ.update(orig_environ)
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
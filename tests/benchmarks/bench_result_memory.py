@@ -0,0 +1,97 @@
+"""Memory used by 100k template results of frame sequence.
+
+Compares current `TemplateResult` with result which stored all data on each
+instance as it was done before.
+"""
+import tracemalloc
+
+from pypeapp.lib.anatomy import TemplateFillCache
+from . import lib
+
+
+class PreviousTemplateResult(str):
+    """Copy of previous result storing all attributes in instance dict."""
+
+    def __new__(
+        cls, filled_template, template, solved, rootless_path,
+        used_values, missing_keys, invalid_types
+    ):
+        new_obj = super(PreviousTemplateResult, cls).__new__(
+            cls, filled_template
+        )
+        new_obj.used_values = used_values
+        new_obj.solved = solved
+        new_obj.template = template
+        new_obj.rootless = rootless_path
+        new_obj.missing_keys = list(set(missing_keys))
+        _invalid_types = {}
+        for invalid_type in invalid_types:
+            for key, val in invalid_type.items():
+                if key in _invalid_types:
+                    continue
+                _invalid_types[key] = val
+        new_obj.invalid_types = _invalid_types
+        return new_obj
+
+
+def previous_results(results):
+    return [
+        PreviousTemplateResult(
+            str(result), result.template, result.solved, result.rootless,
+            result.used_values, result.missing_keys, [result.invalid_types]
+        )
+        for result in results
+    ]
+
+
+def measure(func):
+    """Size of memory allocated by function and still used by its output."""
+    tracemalloc.start()
+    output = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return output, size
+
+
+def main(count=100000):
+    templates_obj = lib.prepare_templates()
+    data = lib.fill_data(10)
+    data["root"] = templates_obj.roots
+    compiled = templates_obj.compile_template(
+        templates_obj.templates["publish"]["path"]
+    )
+
+    def format_frames():
+        # Same as `Templates.format_many`
+        fill_cache = TemplateFillCache([templates_obj.roots])
+        output = []
+        for frame in range(count):
+            frame_data = dict(data)
+            frame_data["frame"] = frame
+            output.append(compiled.format(frame_data, fill_cache))
+        return output
+
+    def access_attributes():
+        for result in results:
+            result.used_values
+            result.missing_keys
+            result.invalid_types
+
+    lib.print_row("{} results".format(count), "MiB", "bytes/result")
+    _, previous_size = measure(lambda: previous_results(format_frames()))
+    results, size = measure(format_frames)
+    _, access_size = measure(access_attributes)
+    for label, size in (
+        ("previous", previous_size),
+        ("current", size),
+        ("current after attribute access", size + access_size),
+    ):
+        lib.print_row(
+            label,
+            "{:.1f}".format(size / 1024.0 / 1024.0),
+            "{:.0f}".format(size / float(count))
+        )
+
+
+if __name__ == "__main__":
+    main()
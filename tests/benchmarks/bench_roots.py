@@ -0,0 +1,75 @@
+"""Throughput of bulk root operations compared to per path methods.
+
+Paths submitted on windows are remapped to linux and roots are replaced
+with formatting keys.
+"""
+import logging
+import random
+
+from pypeapp.lib.anatomy import Roots
+from . import lib
+
+
+def prepare_roots(count=20):
+    roots_obj = Roots(project_name="benchmark")
+    raw_roots = dict(lib.roots_data)
+    for idx in range(count):
+        raw_roots["root_{}".format(idx)] = {
+            "windows": "R:/root_{}".format(idx),
+            "linux": "/mnt/root_{}".format(idx),
+            "darwin": "/Volumes/root_{}".format(idx)
+        }
+    roots_obj._roots = Roots._parse_dict(raw_roots)
+    roots_obj.loaded_project = "benchmark"
+    return roots_obj
+
+
+def windows_paths(count):
+    rand = random.Random(0)
+    roots = ["P:/projects/work", "P:/projects/publish"] + [
+        "R:/root_{}".format(idx) for idx in range(20)
+    ]
+    return [
+        "{}/P001_ProjectX/assets/BOB/publish/file_{}.{:04d}.exr".format(
+            rand.choice(roots), idx, idx % 100
+        )
+        for idx in range(count)
+    ]
+
+
+def main():
+    # Per path methods log every call
+    logging.disable(logging.WARNING)
+    roots_obj = prepare_roots()
+    lib.print_row("operation (paths)", "per path s", "bulk s")
+    for count in (10000, 100000):
+        paths = windows_paths(count)
+        per_path = lib.timeit(lambda: [
+            roots_obj.path_remapper(path, "linux", "windows")
+            for path in paths
+        ], repeat=3)
+        bulk = lib.timeit(
+            lambda: list(roots_obj.remap_many(paths, "windows", "linux")),
+            repeat=3
+        )
+        lib.print_row(
+            "remap ({})".format(count),
+            "{:.3f}".format(per_path),
+            "{:.3f}".format(bulk)
+        )
+
+        per_path = lib.timeit(lambda: [
+            roots_obj.find_root_template_from_path(path) for path in paths
+        ], repeat=3)
+        bulk = lib.timeit(
+            lambda: roots_obj.find_root_templates(paths), repeat=3
+        )
+        lib.print_row(
+            "root templates ({})".format(count),
+            "{:.3f}".format(per_path),
+            "{:.3f}".format(bulk)
+        )
+
+
+if __name__ == "__main__":
+    main()
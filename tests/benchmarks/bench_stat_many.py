@@ -0,0 +1,67 @@
+"""Existence checks of publish paths on filesystem with latency.
+
+Compares sequential `os.path.exists` calls with `stat_many` which lists
+each directory once and checks directories in threads.
+"""
+import os
+import shutil
+import tempfile
+
+from pypeapp.lib.anatomy import stat_many
+from . import lib
+
+
+def create_paths(root, dir_count=20, files_per_dir=15):
+    """Paths of publish files where every fifth file exists."""
+    paths = []
+    for dir_idx in range(dir_count):
+        dir_path = os.path.join(root, "subset_{}".format(dir_idx), "v001")
+        os.makedirs(dir_path)
+        for file_idx in range(files_per_dir):
+            path = os.path.join(dir_path, "file.{:0>4}.exr".format(file_idx))
+            if file_idx % 5 == 0:
+                open(path, "w").close()
+            paths.append(path)
+    return paths
+
+
+def main(latency=0.002):
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        paths = create_paths(tmp_dir)
+        expected = dict((path, os.path.exists(path)) for path in paths)
+
+        lib.print_row(
+            "{} paths, {} ms latency".format(len(paths), latency * 1000),
+            "ms"
+        )
+        for label, func in (
+            (
+                "os.path.exists",
+                lambda: dict((path, os.path.exists(path)) for path in paths)
+            ),
+            (
+                "stat_many (1 worker)",
+                lambda: stat_many(paths, workers=1)
+            ),
+            (
+                "stat_many (8 workers)",
+                lambda: stat_many(paths, workers=8)
+            ),
+        ):
+            with lib.inject_latency(latency):
+                result = func()
+                duration = lib.timeit(func, repeat=3)
+
+            result = dict(
+                (path, value is not None and value is not False)
+                for path, value in result.items()
+            )
+            assert result == expected
+            lib.print_row(label, "{:.1f}".format(duration * 1000))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Access of aggregated properties of filled templates as validators do.
+
+Compares cached aggregates of `TemplatesDict` with aggregates computed
+on each access as it was done before (templates with non-template values
+are skipped so previous implementation does not crash).
+"""
+from pypeapp.lib import config
+from pypeapp.lib.anatomy import (
+    TemplatesDict,
+    TemplateResult,
+    TemplateMissingKey
+)
+from . import lib
+
+
+class PreviousTemplatesDict(TemplatesDict):
+    """Aggregates are computed on each access."""
+
+    def hierarchy(self):
+        if self.parent is None:
+            return []
+
+        hier_keys = []
+        par_hier = self.parent.hierarchy()
+        if par_hier:
+            hier_keys.extend(par_hier)
+        hier_keys.append(self.key)
+        return hier_keys
+
+    def _values(self):
+        return [
+            value
+            for value in self.values()
+            if isinstance(value, (TemplateResult, TemplatesDict))
+        ]
+
+    @property
+    def missing_keys(self):
+        missing_keys = []
+        for value in self._values():
+            missing_keys.extend(value.missing_keys)
+        return list(set(missing_keys))
+
+    @property
+    def invalid_types(self):
+        invalid_types = {}
+        for value in self._values():
+            _invalid_types = {}
+            for key, val in value.invalid_types.items():
+                if key in invalid_types:
+                    continue
+                _invalid_types[key] = val
+            invalid_types = config.update_dict(invalid_types, _invalid_types)
+        return invalid_types
+
+    @property
+    def used_values(self):
+        used_values = {}
+        for value in self._values():
+            used_values = config.update_dict(used_values, value.used_values)
+        return used_values
+
+
+def validate(filled, group_names):
+    """Checks similar to publish validators."""
+    errors = 0
+    for group_name in group_names:
+        group = filled[group_name]
+        if group.missing_keys or group.invalid_types:
+            errors += 1
+        group.used_values.get("version")
+        for key in ("folder", "file", "path", "unknown"):
+            try:
+                group[key]
+            except TemplateMissingKey:
+                errors += 1
+    if filled.missing_keys or filled.invalid_types:
+        errors += 1
+    filled.used_values.get("asset")
+    return errors
+
+
+def main(repeat=20):
+    templates_obj = lib.prepare_templates()
+    data = lib.fill_data(10)
+    filled = templates_obj.format_all(data)
+    group_names = [
+        key for key, value in filled.items() if isinstance(value, dict)
+    ]
+
+    lib.print_row("{} validations".format(repeat), "ms")
+    for label, cls in (
+        ("previous", PreviousTemplatesDict),
+        ("current", TemplatesDict),
+    ):
+        def run():
+            filled_obj = cls(filled, strict=False)
+            for _ in range(repeat):
+                validate(filled_obj, group_names)
+
+        lib.print_row(label, "{:.3f}".format(lib.timeit(run) * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""Helpers shared by benchmarks.
+
+Benchmarks are not collected by pytest. Run them as modules from root of
+repository e.g. ``python -m tests.benchmarks.bench_format_allocation``.
+"""
+import os
+import json
+import time
+import builtins
+import contextlib
+from pypeapp.lib.anatomy import Templates, Roots
+
+
+roots_data = {
+    "work": {
+        "windows": "P:/projects/work",
+        "linux": "/mnt/share/projects/work",
+        "darwin": "/Volumes/projects/work"
+    },
+    "publish": {
+        "windows": "P:/projects/publish",
+        "linux": "/mnt/share/projects/publish",
+        "darwin": "/Volumes/projects/publish"
+    }
+}
+
+studio_templates = {
+    "version_padding": 3,
+    "frame_padding": 4,
+    "version": "v{version:0>{@version_padding}}",
+    "frame": "{frame:0>{@frame_padding}}",
+    "work": {
+        "folder": "{root[work]}/{project[name]}/{hierarchy}/{asset}/work/{task}",
+        "file": "{project[code]}_{asset}_{task}_{@version}<_{comment}>.{ext}",
+        "path": "{@folder}/{@file}"
+    },
+    "publish": {
+        "folder": (
+            "{root[publish]}/{project[name]}/{hierarchy}/{asset}/publish"
+            "/{family}/{subset}/{@version}"
+        ),
+        "file": (
+            "{project[code]}_{asset}_{subset}_{@version}<.{@frame}>"
+            ".{representation}"
+        ),
+        "path": "{@folder}/{@file}"
+    }
+}
+
+
+def studio_anatomy_templates(groups=50):
+    """Raw templates similar to large studio anatomy.
+
+    Args:
+        groups (int): Count of additional groups with 3 templates each.
+    """
+    templates = dict(studio_templates)
+    for idx in range(groups):
+        templates["group_{}".format(idx)] = {
+            "folder": (
+                "{root[publish]}/{project[name]}/{hierarchy}/{asset}"
+                "/group_" + str(idx) + "/{subset}/{@version}"
+            ),
+            "file": (
+                "{project[code]}_{asset}_{subset}_{@version}<_{comment}>"
+                "<.{@frame}>.{representation}"
+            ),
+            "path": "{@folder}/{@file}"
+        }
+    return templates
+
+
+def fill_data(project_doc_size=500):
+    """Fill data with project document of bigger size as in production."""
+    project_doc = {
+        "name": "P001_ProjectX",
+        "code": "PRJ",
+        "data": {
+            "key_{}".format(idx): {
+                "value": idx,
+                "items": ["item_{}".format(item) for item in range(10)]
+            }
+            for idx in range(project_doc_size)
+        }
+    }
+    return {
+        "project": project_doc,
+        "hierarchy": "assets/characters",
+        "asset": "BOB",
+        "task": "modeling",
+        "family": "render",
+        "subset": "renderMain",
+        "version": 1,
+        "frame": 1001,
+        "ext": "ma",
+        "representation": "exr"
+    }
+
+
+def prepare_templates(raw_templates=None):
+    """Templates object with templates and roots without config files."""
+    if raw_templates is None:
+        raw_templates = studio_anatomy_templates()
+
+    templates_obj = Templates(
+        project_name="benchmark", roots=Roots._parse_dict(roots_data)
+    )
+    templates_obj._templates = Templates.solve_template_inner_links(
+        dict(raw_templates)
+    )
+    templates_obj.loaded_project = "benchmark"
+    return templates_obj
+
+
+def timeit(func, repeat=5, number=1):
+    """Return best time of one call in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        for _ in range(number):
+            func()
+        duration = (time.time() - start) / number
+        if best is None or duration < best:
+            best = duration
+    return best
+
+
+def print_row(label, *values):
+    print("{:<40}".format(label) + "".join(
+        "{:>16}".format(value) for value in values
+    ))
+
+
+def create_presets(presets_path, folders=20, files=15, plugins=10):
+    """Presets tree with json files similar to studio presets.
+
+    Args:
+        presets_path (str): Path to presets directory. Must not exist.
+        folders (int): Count of subfolders.
+        files (int): Count of json files in each subfolder.
+        plugins (int): Count of plugin settings in each json file.
+
+    Returns:
+        int: Count of created json files.
+    """
+    count = 0
+    for folder_idx in range(folders):
+        folder = os.path.join(presets_path, "folder_{}".format(folder_idx))
+        os.makedirs(folder)
+        for file_idx in range(files):
+            data = {
+                "Plugin{}".format(plugin_idx): {
+                    "enabled": True,
+                    "optional": plugin_idx % 2 == 0,
+                    "families": ["render", "review", "plate"],
+                    "order": plugin_idx / 10.0,
+                    "label": "Plugin number {}".format(plugin_idx)
+                }
+                for plugin_idx in range(plugins)
+            }
+            path = os.path.join(folder, "file_{}.json".format(file_idx))
+            with open(path, "w") as stream:
+                json.dump(data, stream, indent=4)
+            count += 1
+    return count
+
+
+class SlowDirEntry(object):
+    """Directory entry which `stat` call waits as on network filesystem."""
+
+    def __init__(self, entry, latency):
+        self._entry = entry
+        self._latency = latency
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def stat(self, *args, **kwargs):
+        time.sleep(self._latency)
+        return self._entry.stat(*args, **kwargs)
+
+
+class SlowScandirIterator(object):
+    """Iterator of `os.scandir` returning `SlowDirEntry` objects."""
+
+    def __init__(self, iterator, latency):
+        self._iterator = iterator
+        self._latency = latency
+
+    def __iter__(self):
+        for entry in self._iterator:
+            yield SlowDirEntry(entry, self._latency)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._iterator.close()
+
+
+@contextlib.contextmanager
+def inject_latency(latency):
+    """Add latency to filesystem calls of `os` module and to `open`.
+
+    Simulates round-trips to network filesystem. Waiting releases GIL so
+    calls from multiple threads overlap as they would on network share.
+
+    Args:
+        latency (float): Seconds added to each call.
+    """
+    orig_stat = os.stat
+    orig_listdir = os.listdir
+    orig_scandir = os.scandir
+    orig_open = builtins.open
+
+    def stat(*args, **kwargs):
+        time.sleep(latency)
+        return orig_stat(*args, **kwargs)
+
+    def listdir(*args, **kwargs):
+        time.sleep(latency)
+        return orig_listdir(*args, **kwargs)
+
+    def scandir(*args, **kwargs):
+        time.sleep(latency)
+        return SlowScandirIterator(orig_scandir(*args, **kwargs), latency)
+
+    def open_file(*args, **kwargs):
+        time.sleep(latency)
+        return orig_open(*args, **kwargs)
+
+    os.stat = stat
+    os.listdir = listdir
+    os.scandir = scandir
+    builtins.open = open_file
+    try:
+        yield
+    finally:
+        os.stat = orig_stat
+        os.listdir = orig_listdir
+        os.scandir = orig_scandir
+        builtins.open = orig_open
@@ -0,0 +1,887 @@
+import os
+import copy
+import json
+import time
+import pytest
+from pypeapp.lib import anatomy as anatomy_module
+from pypeapp.lib.config import DICT_COPY_USES_GETITEM
+from pypeapp.lib.anatomy import (
+    Anatomy,
+    CompiledTemplate,
+    LazyTemplatesDict,
+    Roots,
+    TemplateMissingKey,
+    TemplateResult,
+    Templates,
+    TemplatesDict,
+    TemplateUnsolved
+)
+
+
+anatomy_templates = {
+    "version_padding": 3,
+    "frame_padding": 4,
+    "version": "v{version:0>{@version_padding}}",
+    "frame": "{frame:0>{@frame_padding}}",
+    "work": {
+        "folder": "{root[work]}/{project[name]}/{hierarchy}/{asset}/work/{task}",
+        "file": "{project[code]}_{asset}_{task}_{@version}<_{comment}>.{ext}",
+        "path": "{@folder}/{@file}"
+    },
+    "publish": {
+        "folder": (
+            "{root[publish]}/{project[name]}/{hierarchy}/{asset}/publish"
+            "/{family}/{subset}/{@version}"
+        ),
+        "file": (
+            "{project[code]}_{asset}_{subset}_{@version}<.{@frame}>"
+            ".{representation}"
+        ),
+        "path": "{@folder}/{@file}"
+    }
+}
+
+anatomy_roots = {
+    "work": {
+        "windows": "P:/projects/work",
+        "linux": "/mnt/share/projects/work",
+        "darwin": "/Volumes/projects/work"
+    },
+    "publish": {
+        "windows": "P:/projects/publish",
+        "linux": "/mnt/share/projects/publish",
+        "darwin": "/Volumes/projects/publish"
+    }
+}
+
+fill_data = {
+    "project": {
+        "name": "P001_ProjectX",
+        "code": "PRJ"
+    },
+    "hierarchy": "assets/characters",
+    "asset": "BOB",
+    "task": "modeling",
+    "family": "render",
+    "subset": "renderMain",
+    "version": 1,
+    "ext": "ma",
+    "representation": "exr"
+}
+
+
+@pytest.fixture
+def anatomy(tmp_path, monkeypatch):
+    """Anatomy with default templates and roots from temporary config."""
+    anatomy_dir = tmp_path / "pype-config" / "anatomy"
+    os.makedirs(anatomy_dir.as_posix())
+    # JSON is valid YAML
+    with open((anatomy_dir / "default.yaml").as_posix(), "w") as stream:
+        json.dump(anatomy_templates, stream)
+
+    with open((anatomy_dir / "roots.json").as_posix(), "w") as stream:
+        json.dump(anatomy_roots, stream)
+
+    monkeypatch.setitem(
+        os.environ, "PYPE_CONFIG", (tmp_path / "pype-config").as_posix()
+    )
+    monkeypatch.setitem(
+        os.environ, "PYPE_CACHE_DIR", (tmp_path / "cache").as_posix()
+    )
+    monkeypatch.delitem(os.environ, "AVALON_PROJECT", raising=False)
+    return Anatomy()
+
+
+def test_format_many(anatomy):
+    data_items = []
+    for frame in range(1001, 1011):
+        data = dict(fill_data)
+        data["frame"] = frame
+        data_items.append(data)
+
+    results = anatomy.format_many(iter(data_items))
+    assert not isinstance(results, (list, tuple))
+
+    for data, result in zip(data_items, results):
+        expected = anatomy.format(data)
+        assert isinstance(result, TemplatesDict)
+        assert result["publish"]["path"] == expected["publish"]["path"]
+        assert result["work"]["path"] == expected["work"]["path"]
+        assert (
+            result["publish"]["path"].used_values
+            == expected["publish"]["path"].used_values
+        )
+
+    assert "frame" not in data_items[0]["project"]
+
+
+def test_format_many_keys(anatomy):
+    data = dict(fill_data)
+    result = next(anatomy.format_many([data], keys=["work"]))
+
+    assert list(result.keys()) == ["work"]
+    assert result["work"]["file"] == "PRJ_BOB_modeling_v001.ma"
+    assert "root" not in data
+
+
+# Python 2 formats lazy templates on creation
+lazy_only = pytest.mark.skipif(
+    not DICT_COPY_USES_GETITEM,
+    reason="dict(obj) does not use __getitem__ of dictionary subclasses"
+)
+
+
+@lazy_only
+def test_format_lazy(anatomy):
+    data = dict(fill_data)
+    data["frame"] = 1001
+    expected = anatomy.format(data)
+    filled = anatomy.format(data, lazy=True)
+
+    assert isinstance(filled, LazyTemplatesDict)
+    # Children dictionaries are created on first access
+    assert not isinstance(dict.__getitem__(filled, "publish"), TemplatesDict)
+    publish = filled["publish"]
+    assert isinstance(publish, LazyTemplatesDict)
+    assert publish.hierarchy() == ["publish"]
+    assert isinstance(dict.__getitem__(publish, "path"), CompiledTemplate)
+
+    assert filled["publish"]["path"] == expected["publish"]["path"]
+    assert isinstance(dict.__getitem__(publish, "path"), TemplateResult)
+    assert isinstance(dict.__getitem__(publish, "folder"), CompiledTemplate)
+    assert filled["publish"] is publish
+    assert filled["publish"]["path"] is filled["publish"]["path"]
+
+    assert filled == expected
+    assert filled["work"].get("file") == expected["work"]["file"]
+
+    # Copies contain formatted templates
+    for copied in (
+        dict(anatomy.format(data, lazy=True)["publish"]),
+        anatomy.format(data, lazy=True)["publish"].copy(),
+    ):
+        assert type(copied) is dict
+        assert copied == dict(expected["publish"])
+        assert isinstance(copied["path"], TemplateResult)
+        assert not any(
+            isinstance(value, CompiledTemplate) for value in copied.values()
+        )
+
+
+def test_format_lazy_copies(anatomy):
+    data = dict(fill_data)
+    data["frame"] = 1001
+    expected = anatomy.format(data)
+
+    def is_formatted(value):
+        if isinstance(value, dict):
+            return all(is_formatted(item) for item in value.values())
+        return not isinstance(value, CompiledTemplate)
+
+    def keyword_arguments(**kwargs):
+        return kwargs
+
+    for copy_func in (
+        dict,
+        lambda lazy: keyword_arguments(**lazy),
+        lambda lazy: lazy.copy(),
+        lambda lazy: dict(lazy.items()),
+        lambda lazy: dict(zip(lazy.keys(), lazy.values())),
+        lambda lazy: dict(lazy.popitem() for _ in range(len(lazy))),
+        lambda lazy: dict(
+            (key, lazy.setdefault(key)) for key in list(lazy.keys())
+        ),
+    ):
+        copied = copy_func(anatomy.format(data, lazy=True)["work"])
+        assert is_formatted(copied)
+        assert copied == dict(expected["work"])
+
+
+def test_format_lazy_compiled_once(anatomy, monkeypatch):
+    templates_obj = anatomy.templates_obj
+    compiled = []
+    orig_compile_template = templates_obj.compile_template
+
+    def compile_template(template):
+        compiled.append(template)
+        return orig_compile_template(template)
+
+    monkeypatch.setattr(templates_obj, "compile_template", compile_template)
+
+    first = anatomy.format(fill_data, lazy=True)
+    compiled_count = len(compiled)
+    assert compiled_count > 0
+
+    second = anatomy.format(fill_data, lazy=True)
+    platforms = anatomy.format(fill_data, lazy=True, platforms=["linux"])
+    assert len(compiled) == compiled_count
+    assert first == second
+    assert platforms["linux"]["work"]["file"] == first["work"]["file"]
+
+    # Compiled templates are not shared with formatted templates
+    first["work"]["file"] = "changed"
+    assert anatomy.format(fill_data, lazy=True) == second
+
+    anatomy.reset()
+    anatomy.format(fill_data, lazy=True)
+    assert len(compiled) == 2 * compiled_count
+
+
+def test_format_lazy_strict(anatomy):
+    data = dict(fill_data)
+    data.pop("asset")
+    filled = anatomy.format(data, lazy=True)
+    filled_all = anatomy.format_all(data, lazy=True)
+
+    with pytest.raises(TemplateUnsolved):
+        filled["work"]["file"]
+
+    with pytest.raises(TemplateMissingKey):
+        filled["work"]["unknown"]
+
+    assert "asset" in filled_all["work"]["file"].missing_keys
+
+
+def test_format_sequence(anatomy):
+    frames = list(range(995, 1005))
+    expected = []
+    for frame in frames:
+        data = dict(fill_data)
+        data["frame"] = frame
+        expected.append(str(anatomy.format(data)["publish"]["path"]))
+
+    paths = anatomy.format_sequence(fill_data, "publish.path", frames)
+    assert paths == expected
+    assert paths[0].endswith("_v001.0995.exr")
+
+    generator = anatomy.format_sequence(
+        fill_data, ["publish", "path"], iter(frames), output="generator"
+    )
+    assert list(generator) == expected
+
+    numpy = pytest.importorskip("numpy")
+    array = anatomy.format_sequence(
+        fill_data, "publish.path", numpy.arange(995, 1005), output="numpy"
+    )
+    assert array.tolist() == expected
+
+
+def test_format_sequence_errors(anatomy):
+    data = dict(fill_data)
+    data.pop("subset")
+    with pytest.raises(TemplateUnsolved):
+        anatomy.format_sequence(data, "publish.path", [1001])
+
+    with pytest.raises(ValueError):
+        anatomy.format_sequence(fill_data, "work.path", [1001])
+
+    with pytest.raises(TemplateMissingKey):
+        anatomy.format_sequence(fill_data, "publish.unknown", [1001])
+
+    assert anatomy.format_sequence(fill_data, "publish.path", []) == []
+
+    # All frames are checked before filling
+    frames = [1001, 1002, None]
+    with pytest.raises(TemplateUnsolved):
+        anatomy.format_sequence(fill_data, "publish.path", frames)
+
+    generator = anatomy.format_sequence(
+        fill_data, "publish.path", frames, output="generator"
+    )
+    assert next(generator).endswith("_v001.1001.exr")
+    assert next(generator).endswith("_v001.1002.exr")
+    with pytest.raises(TemplateUnsolved):
+        next(generator)
+
+
+def test_parse(anatomy):
+    data = dict(fill_data)
+    data["frame"] = 1001
+    data["comment"] = "wip"
+    filled = anatomy.format(data)
+
+    template_key, parsed = anatomy.parse(filled["publish"]["path"])
+    assert template_key == "publish.path"
+    assert parsed["root"] == {"publish": "/mnt/share/projects/publish"}
+    assert parsed["project"] == fill_data["project"]
+    assert parsed["hierarchy"] == "assets/characters"
+    assert parsed["version"] == 1
+    assert parsed["frame"] == 1001
+    assert parsed["representation"] == "exr"
+
+    template_key, parsed = anatomy.parse(filled["work"]["path"])
+    assert template_key == "work.path"
+    assert parsed["comment"] == "wip"
+
+    parsed["root"] = anatomy.roots
+    assert anatomy.format(parsed)["work"]["path"] == filled["work"]["path"]
+
+
+def test_parse_optional_and_template_key(anatomy):
+    filled = anatomy.format(fill_data)
+    windows_path = (
+        "P:\\projects\\work\\P001_ProjectX\\assets\\BOB\\work\\modeling"
+    )
+
+    template_key, parsed = anatomy.parse(filled["work"]["file"])
+    assert template_key == "work.file"
+    assert "comment" not in parsed
+
+    template_key, parsed = anatomy.parse(windows_path, "work.folder")
+    assert template_key == "work.folder"
+    assert parsed["root"] == {"work": "P:/projects/work"}
+    assert parsed["hierarchy"] == "assets"
+
+    assert anatomy.parse(filled["work"]["path"], "publish.path") == (
+        None, None
+    )
+    assert anatomy.parse("/tmp/unknown.txt") == (None, None)
+
+
+def test_parse_many(anatomy):
+    filled = anatomy.format(fill_data)
+    paths = [filled["work"]["path"], "/tmp/unknown.txt"]
+
+    results = anatomy.parse_many(iter(paths))
+    assert not isinstance(results, (list, tuple))
+    results = list(results)
+    assert results[0] == anatomy.parse(paths[0])
+    assert results[1] == (None, None)
+
+
+def test_solve_inner_links():
+    templates = {
+        "padding": 3,
+        "version": "v{version:0>{@padding}}",
+        "file": "{asset}_{@version}",
+        "work": {
+            "path": "{root}/{@file}",
+            "sub": {"file": "{@file}.{ext}"}
+        },
+        "publish": {
+            "padding": 4,
+            "path": "{root}/{@file}"
+        }
+    }
+    solved = Templates.solve_template_inner_links(templates)
+
+    assert solved["file"] == "{asset}_v{version:0>3}"
+    assert solved["padding"] == 3
+    assert solved["work"]["path"] == "{root}/{asset}_v{version:0>3}"
+    assert solved["work"]["sub"]["file"] == "{asset}_v{version:0>3}.{ext}"
+    assert solved["publish"]["version"] == "v{version:0>4}"
+    assert solved["publish"]["path"] == "{root}/{asset}_v{version:0>4}"
+
+
+def test_solve_inner_links_errors():
+    templates = {
+        "a": "{@b}",
+        "b": "{@c}_{@d}",
+        "c": "c",
+        "d": "{@a}"
+    }
+    with pytest.raises(ValueError) as exc_info:
+        Templates.solve_template_inner_links(templates)
+    message = str(exc_info.value)
+    assert any(
+        cycle in message
+        for cycle in (
+            '"a" -> "b" -> "d" -> "a"',
+            '"b" -> "d" -> "a" -> "b"',
+            '"d" -> "a" -> "b" -> "d"'
+        )
+    )
+
+    with pytest.raises(KeyError):
+        Templates.solve_template_inner_links({"a": "{@missing}"})
+
+    with pytest.raises(ValueError):
+        Templates.solve_template_inner_links({"a": "{@b}", "b": ["list"]})
+
+    with pytest.raises(ValueError):
+        Templates.solve_template_inner_links({"group": {"a": "{@a}"}})
+
+
+def test_find_root_templates(anatomy):
+    paths = [
+        "/mnt/share/projects/work/P001_ProjectX/BOB/file.ma",
+        "P:\\projects\\publish\\P001_ProjectX\\BOB\\file.exr",
+        "/Volumes/projects/work",
+        "/other/path/file.ma"
+    ]
+    expected = [
+        (True, "{root[work]}/P001_ProjectX/BOB/file.ma"),
+        (True, "{root[publish]}/P001_ProjectX/BOB/file.exr"),
+        (True, "{root[work]}"),
+        (False, "/other/path/file.ma")
+    ]
+    assert anatomy.find_root_templates(paths) == expected
+    assert [
+        anatomy.find_root_template_from_path(path) for path in paths
+    ] == expected
+
+
+def test_find_root_templates_longest_prefix(anatomy):
+    roots = Roots._parse_dict({
+        "projects": {"windows": "P:/projects", "linux": "/mnt/projects"},
+        "work": {"windows": "P:/projects/work", "linux": "/mnt/projects/work"}
+    })
+    paths = ["/mnt/projects/work/file.ma", "P:/projects/asset/file.ma"]
+
+    assert anatomy.roots_obj.find_root_templates(paths, roots) == [
+        (True, "{root[work]}/file.ma"),
+        (True, "{root[projects]}/asset/file.ma")
+    ]
+    assert anatomy.roots_obj.find_root_template_from_path(
+        paths[0], roots
+    ) == (True, "{root[work]}/file.ma")
+
+
+def test_remap_many(anatomy):
+    paths = [
+        "P:\\projects\\work\\P001_ProjectX\\BOB\\file.ma",
+        "P:/projects/publish/P001_ProjectX/BOB/file.exr",
+        "/mnt/share/projects/work/P001_ProjectX/BOB/file.ma",
+        "{root[publish]}/P001_ProjectX/BOB/file.exr",
+        "/other/path/file.ma"
+    ]
+    results = anatomy.remap_many(iter(paths), "windows", "linux")
+    assert not isinstance(results, (list, tuple))
+    results = list(results)
+    assert results == [
+        "/mnt/share/projects/work/P001_ProjectX/BOB/file.ma",
+        "/mnt/share/projects/publish/P001_ProjectX/BOB/file.exr",
+        "/mnt/share/projects/work/P001_ProjectX/BOB/file.ma",
+        "/mnt/share/projects/publish/P001_ProjectX/BOB/file.exr",
+        None
+    ]
+    for path, result in zip(paths[:3], results):
+        assert anatomy.path_remapper(path, "linux", "windows") == result
+
+    assert list(anatomy.remap_many(paths[:1], dst_platform="darwin")) == [
+        "/Volumes/projects/work/P001_ProjectX/BOB/file.ma"
+    ]
+    table = anatomy.roots_obj.remap_table("windows", "linux")
+    assert anatomy.roots_obj.remap_table("windows", "linux") is table
+
+    # Unicode paths are not converted with `str` (Python 2)
+    assert table.remap(u"P:\\projects\\work\\k\u016f\u0148.ma") == (
+        u"/mnt/share/projects/work/k\u016f\u0148.ma"
+    )
+
+
+def test_format_platforms(anatomy):
+    data = dict(fill_data)
+    data["frame"] = 1001
+    platforms = ("windows", "linux", "darwin")
+    filled = anatomy.format(data, platforms=platforms)
+    expected = anatomy.format(data)
+
+    assert sorted(filled.keys()) == sorted(platforms)
+    for platform_name in platforms:
+        result = filled[platform_name]["publish"]["path"]
+        assert isinstance(filled[platform_name], TemplatesDict)
+        assert result == anatomy.fill_root_with_path(
+            expected["publish"]["path"].rootless,
+            anatomy_roots["publish"][platform_name]
+        )
+        assert result.rootless == expected["publish"]["path"].rootless
+        assert result.used_values["root"] == {
+            "publish": anatomy_roots["publish"][platform_name]
+        }
+        assert result.used_values["asset"] == "BOB"
+        assert filled[platform_name]["work"]["path"].missing_keys == (
+            expected["work"]["path"].missing_keys
+        )
+        assert filled[platform_name]["work"]["file"] is (
+            filled["windows"]["work"]["file"]
+        )
+
+    assert filled["windows"]["publish"]["path"].startswith(
+        "P:/projects/publish/P001_ProjectX/"
+    )
+    assert expected["publish"]["path"].used_values["root"] == {
+        "publish": anatomy_roots["publish"]["linux"]
+    }
+
+    # Descriptor is shared with result of current platform
+    assert filled["windows"]["publish"]["path"]._descriptor is (
+        expected["publish"]["path"]._descriptor
+    )
+
+    # Results of each platform can be updated
+    updated = filled["windows"].with_updates(asset="ALICE")
+    assert updated["publish"]["path"] == (
+        filled["windows"]["publish"]["path"].replace("BOB", "ALICE")
+    )
+    assert updated["publish"]["path"].rootless == (
+        expected.with_updates(asset="ALICE")["publish"]["path"].rootless
+    )
+    assert updated["work"]["file"] == "PRJ_ALICE_modeling_v001.ma"
+
+    lazy = anatomy.format(data, lazy=True, platforms=platforms)
+    for platform_name in platforms:
+        assert isinstance(lazy[platform_name], LazyTemplatesDict)
+        assert lazy[platform_name]["publish"]["path"] == (
+            filled[platform_name]["publish"]["path"]
+        )
+        assert dict(lazy[platform_name]["work"]) == (
+            dict(filled[platform_name]["work"])
+        )
+
+
+def test_format_platforms_missing_root(anatomy):
+    data = dict(fill_data)
+    data.pop("asset")
+    filled = anatomy.format_all(data, platforms=["linux", "unknown"])
+
+    assert not filled["linux"]["publish"]["path"].solved
+    assert filled["unknown"]["publish"]["folder"].startswith(
+        "{root[publish]}/P001_ProjectX/"
+    )
+    folder = filled["unknown"]["publish"]["folder"]
+    assert "root[publish]" in folder.missing_keys
+    assert not folder.solved
+    assert filled["unknown"]["version"].solved
+
+    lazy = anatomy.format_all(data, lazy=True, platforms=["unknown"])
+    assert lazy["unknown"]["publish"]["folder"] == folder
+    assert lazy["unknown"]["publish"]["folder"].missing_keys == (
+        folder.missing_keys
+    )
+
+
+def test_result_cache(anatomy):
+    templates_obj = anatomy.templates_obj
+    templates_obj.set_result_cache_size(16)
+    result_cache = templates_obj.result_cache
+
+    first = anatomy.format(fill_data)
+    hits = result_cache.hits
+    misses = result_cache.misses
+    assert misses > 0
+
+    second = anatomy.format(fill_data)
+    assert result_cache.misses == misses
+    assert result_cache.hits == hits * 2 + misses
+    assert second["publish"]["path"] == first["publish"]["path"]
+    assert second["publish"]["path"]._descriptor is (
+        first["publish"]["path"]._descriptor
+    )
+    assert second["publish"]["path"].used_values == (
+        first["publish"]["path"].used_values
+    )
+
+    # Changed result does not affect following results from cache
+    expected_used_values = copy.deepcopy(second["work"]["path"].used_values)
+    expected_missing_keys = list(second["work"]["path"].missing_keys)
+    for result in (first["work"]["path"], second["work"]["path"]):
+        result.used_values["asset"] = "ALICE"
+        result.used_values["project"]["code"] = "XXX"
+        result.missing_keys.append("asset")
+        result.invalid_types["asset"] = dict
+    third = anatomy.format(fill_data)
+    assert result_cache.misses == misses
+    assert third["work"]["path"].used_values == expected_used_values
+    assert third["work"]["path"].missing_keys == expected_missing_keys
+    assert third["work"]["path"].invalid_types == {}
+
+    data = dict(fill_data)
+    data["version"] = 2
+    hits = result_cache.hits
+    changed = anatomy.format(data)
+    assert changed["publish"]["path"] != first["publish"]["path"]
+    assert changed["publish"]["path"].endswith("PRJ_BOB_renderMain_v002.exr")
+    # Templates without version are still taken from cache
+    assert result_cache.hits > hits
+    assert changed["work"]["folder"] == first["work"]["folder"]
+
+    anatomy.reset()
+    assert len(result_cache) == 0
+
+
+def test_result_cache_keys():
+    templates_obj = Templates(project_name="test_project", result_cache_size=2)
+    result_cache = templates_obj.result_cache
+    template = "{asset}_v{version:0>3}<_{comment}>"
+
+    assert templates_obj._format(template, {"asset": "a", "version": 1}) == (
+        "a_v001"
+    )
+    result = templates_obj._format(template, {"asset": "a", "version": 1.0})
+    assert result == "a_v1.0"
+    assert result_cache.hits == 0
+
+    # Missing optional key and list value (not cached) are not mixed
+    result = templates_obj._format(
+        template, {"asset": "a", "version": 1, "comment": "c"}
+    )
+    assert result == "a_v001_c"
+    assert len(result_cache) == 2
+    templates_obj._format(template, {"asset": ["a"], "version": 1})
+    assert result_cache.misses == 3
+
+    # The least recently used result was removed
+    templates_obj._format(template, {"asset": "a", "version": 1})
+    assert result_cache.hits == 0
+    templates_obj._format(template, {"asset": "a", "version": 1})
+    assert result_cache.hits == 1
+
+    templates_obj.set_result_cache_size(None)
+    assert templates_obj.result_cache is None
+
+
+def test_with_updates(anatomy):
+    filled = anatomy.format_all(fill_data)
+    updated = filled.with_updates(version=2)
+
+    data = dict(fill_data)
+    data["version"] = 2
+    expected = anatomy.format_all(data)
+
+    assert isinstance(updated, TemplatesDict)
+    assert updated == expected
+    assert updated.strict is False
+    assert updated["publish"]["path"].used_values["version"] == "002"
+    assert updated["work"]["folder"] is filled["work"]["folder"]
+    assert updated["publish"]["path"] is not filled["publish"]["path"]
+    assert updated["publish"].parent is updated
+
+    # Changes are accumulated
+    updated = updated.with_updates(comment="final", asset="ALICE")
+    data.update({"comment": "final", "asset": "ALICE"})
+    assert updated == anatomy.format_all(data)
+    assert updated["frame"] is filled["frame"]
+
+    compiled = anatomy.templates_obj.compile_template(
+        anatomy.templates["work"]["file"]
+    )
+    assert compiled.referenced_keys == frozenset(
+        ("project", "asset", "task", "version", "comment", "ext")
+    )
+
+    with pytest.raises(ValueError):
+        TemplatesDict({"a": filled["version"]}).with_updates(version=3)
+
+
+@lazy_only
+def test_with_updates_lazy(anatomy):
+    filled = anatomy.format(fill_data, lazy=True)
+    work_file = filled["work"]["file"]
+    publish_folder = filled["publish"]["folder"]
+
+    updated = filled.with_updates(task="rigging")
+    assert isinstance(updated, LazyTemplatesDict)
+    assert updated["publish"]["folder"] is publish_folder
+    assert isinstance(
+        dict.__getitem__(updated["work"], "file"), CompiledTemplate
+    )
+    assert updated["work"]["file"] == work_file.replace("modeling", "rigging")
+    assert filled["work"]["file"] is work_file
+
+
+def test_with_updates_children(anatomy):
+    data = dict(fill_data)
+    data["version"] = 5
+    data["task"] = "comp"
+    expected = anatomy.format(data)
+
+    # Chained updates of child dictionary
+    filled = anatomy.format(fill_data)
+    work = filled["work"].with_updates(version=5).with_updates(task="comp")
+    assert work["file"] == expected["work"]["file"]
+    assert work["file"].endswith("_comp_v005.ma")
+    assert work.hierarchy() == ["work"]
+
+    # Updates of lazy child dictionary
+    filled = anatomy.format(fill_data, lazy=True)
+    work = filled["work"].with_updates(version=5)
+    assert work["file"].endswith("_modeling_v005.ma")
+    work = work.with_updates(task="comp")
+    assert work["file"] == expected["work"]["file"]
+    assert filled["work"]["file"].endswith("_modeling_v001.ma")
+
+    # Results of `format_many`
+    results = list(anatomy.templates_obj.format_many([fill_data]))
+    updated = results[0].with_updates(version=5, task="comp")
+    assert updated == expected
+    assert results[0]["publish"].with_updates(version=5)["path"] == (
+        expected["publish"]["path"]
+    )
+
+
+def test_templates_dict_aggregates(anatomy):
+    data = dict(fill_data)
+    data.pop("asset")
+    data["project"] = "P001"
+    filled = anatomy.format_all(data)
+
+    assert sorted(filled["work"].missing_keys) == [
+        "asset", "comment", "frame"
+    ]
+    # Changes of returned aggregates don't affect following access
+    filled["work"].missing_keys.append("x")
+    filled.invalid_types["x"] = dict
+    filled.used_values["asset"] = "y"
+    filled.used_values["root"]["work"] = "y"
+    assert sorted(filled["work"].missing_keys) == [
+        "asset", "comment", "frame"
+    ]
+    assert "x" not in filled.invalid_types
+    assert "asset" not in filled.used_values
+    assert filled.used_values["root"]["work"] == (
+        anatomy_roots["work"]["linux"]
+    )
+    assert list(filled.invalid_types.keys()) == ["project"]
+    assert filled.used_values["subset"] == "renderMain"
+    assert filled.used_values["root"] == {
+        "work": anatomy_roots["work"]["linux"],
+        "publish": anatomy_roots["publish"]["linux"]
+    }
+    # Children used values are not modified by merging
+    assert filled["work"]["folder"].used_values["root"] == {
+        "work": anatomy_roots["work"]["linux"]
+    }
+
+    # Cache is cleared when item is changed
+    missing_keys = filled.missing_keys
+    filled["work"]["file"] = anatomy.templates_obj._format(
+        "{missing_key}", data
+    )
+    assert "missing_key" not in missing_keys
+    assert "missing_key" in filled.missing_keys
+    assert "missing_key" in filled["work"].missing_keys
+
+    del filled["work"]["file"]
+    assert "missing_key" not in filled.missing_keys
+    filled["work"].setdefault("file", filled["work"]["folder"])
+    filled["work"].update(file=anatomy.templates_obj._format(
+        "{other_key}", data
+    ))
+    assert "other_key" in filled.missing_keys
+    filled["work"].pop("file")
+    assert "other_key" not in filled.missing_keys
+
+    filled = anatomy.format(fill_data)
+    with pytest.raises(TemplateMissingKey) as exc_info:
+        filled["publish"]["unknown"]
+    assert "anatomy[\"publish\"][\"unknown\"]" in str(exc_info.value)
+    assert filled["publish"].hierarchy() == ["publish"]
+
+
+def _versions_templates(tmp_path):
+    root = tmp_path.as_posix()
+    templates_obj = Templates(
+        project_name="test_project",
+        roots=Roots._parse_dict({
+            "work": {"windows": root, "linux": root, "darwin": root},
+            "publish": {"windows": root, "linux": root, "darwin": root}
+        })
+    )
+    templates_obj._templates = Templates.solve_template_inner_links(
+        dict(anatomy_templates)
+    )
+    templates_obj.loaded_project = "test_project"
+    return templates_obj
+
+
+def test_find_versions(tmp_path):
+    templates_obj = _versions_templates(tmp_path)
+    work_dir = tmp_path / "P001_ProjectX" / "assets" / "characters" / "BOB"
+    work_dir = work_dir / "work" / "modeling"
+    os.makedirs(work_dir.as_posix())
+    for name in (
+        "PRJ_BOB_modeling_v001.ma",
+        "PRJ_BOB_modeling_v003_final.ma",
+        "PRJ_BOB_modeling_v012.mb",
+        "PRJ_BOB_rigging_v020.ma",
+        "PRJ_ALICE_modeling_v030.ma",
+        "PRJ_BOB_modeling_vXYZ.ma",
+        "notes.txt"
+    ):
+        open((work_dir / name).as_posix(), "w").close()
+
+    data = dict(fill_data)
+    data.pop("ext")
+    versions, next_version = templates_obj.find_versions("work", data)
+    assert [version for version, _ in versions] == [1, 3, 12]
+    assert versions[-1][1] == "/".join(
+        (work_dir.as_posix(), "PRJ_BOB_modeling_v012.mb")
+    )
+    assert next_version == 13
+
+    # Extension in data must match
+    versions, next_version = templates_obj.find_versions(
+        "work.path", fill_data
+    )
+    assert [version for version, _ in versions] == [1, 3]
+    assert next_version == 4
+
+    data["task"] = "lighting"
+    assert templates_obj.find_versions("work", data) == ([], 1)
+
+    data.pop("task")
+    with pytest.raises(TemplateUnsolved):
+        templates_obj.find_versions("work", data)
+
+    with pytest.raises(ValueError):
+        templates_obj.find_versions("frame", fill_data)
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_find_versions_root(monkeypatch, use_cache):
+    templates_obj = Templates(
+        project_name="test_project",
+        roots=Roots._parse_dict({
+            "work": {"windows": "/", "linux": "/", "darwin": "/"}
+        })
+    )
+    templates_obj._templates = {"versions": "{root[work]}/v{version:0>3}"}
+    templates_obj.loaded_project = "test_project"
+
+    listed = []
+
+    def list_directory(path):
+        listed.append(path)
+        return ("v001", "v002", "tmp")
+
+    monkeypatch.setattr(anatomy_module, "list_directory", list_directory)
+    versions, next_version = templates_obj.find_versions(
+        "versions", {}, use_cache=use_cache
+    )
+    # Root is listed instead of empty path and paths have one separator
+    assert listed == ["/"]
+    assert versions == [(1, "/v001"), (2, "/v002")]
+    assert next_version == 3
+
+
+def test_find_versions_folders_and_cache(tmp_path):
+    templates_obj = _versions_templates(tmp_path)
+    subset_dir = tmp_path / "P001_ProjectX" / "assets" / "characters"
+    subset_dir = subset_dir / "BOB" / "publish" / "render" / "renderMain"
+    for name in ("v001", "v002", "v010"):
+        os.makedirs((subset_dir / name).as_posix())
+
+    # Modification time older than racy interval so listing is cached
+    old_time = time.time() - 60
+    os.utime(subset_dir.as_posix(), (old_time, old_time))
+
+    cache = templates_obj.directory_cache
+    for _ in range(3):
+        versions, next_version = templates_obj.find_versions(
+            "publish", fill_data, use_cache=True
+        )
+        assert [version for version, _ in versions] == [1, 2, 10]
+        assert next_version == 11
+    assert cache.misses == 1
+    assert cache.hits == 2
+
+    os.makedirs((subset_dir / "v011").as_posix())
+    versions, next_version = templates_obj.find_versions(
+        "publish.folder", fill_data, use_cache=True
+    )
+    assert next_version == 12
+    assert cache.misses == 2
+
+    templates_obj.reset()
+    assert len(cache) == 0
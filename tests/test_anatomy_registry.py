@@ -0,0 +1,169 @@
+import os
+import json
+import threading
+import pytest
+from pypeapp.lib.anatomy import Anatomy, AnatomyRegistry, AnatomySnapshot
+from pypeapp.lib.config import ImmutableDict
+
+
+templates = {
+    "version": "v{version:0>3}",
+    "work": {"file": "{asset}_{@version}"}
+}
+roots = {"windows": "C:/projects", "linux": "/projects", "darwin": "/projects"}
+
+
+def _write_json(path, data):
+    with open(path, "w") as stream:
+        json.dump(data, stream)
+
+
+@pytest.fixture
+def project_dir(tmp_path, monkeypatch):
+    """Default anatomy and overrides of project "test_project"."""
+    default_dir = tmp_path / "pype-config" / "anatomy"
+    project_dir = tmp_path / "project-configs" / "test_project" / "anatomy"
+    for path in (default_dir, project_dir):
+        os.makedirs(path.as_posix())
+        _write_json((path / "default.yaml").as_posix(), templates)
+        _write_json((path / "roots.json").as_posix(), roots)
+
+    monkeypatch.setitem(
+        os.environ, "PYPE_CONFIG", (tmp_path / "pype-config").as_posix()
+    )
+    monkeypatch.setitem(
+        os.environ,
+        "PYPE_PROJECT_CONFIGS",
+        (tmp_path / "project-configs").as_posix()
+    )
+    monkeypatch.setitem(os.environ, "PYPE_DISABLE_FILE_CACHE", "1")
+    monkeypatch.setattr(AnatomyRegistry, "poll_interval", 0)
+    AnatomyRegistry.clear()
+    yield project_dir
+    AnatomyRegistry.clear()
+
+
+def test_registry_shares_anatomy(project_dir):
+    anatomy = AnatomyRegistry.get("test_project")
+
+    assert AnatomyRegistry.get("test_project") is anatomy
+    assert AnatomyRegistry.get("other_project") is not anatomy
+    assert isinstance(anatomy.templates, ImmutableDict)
+    assert anatomy.format({"asset": "BOB", "version": 1})["work"]["file"] == (
+        "BOB_v001"
+    )
+
+    with pytest.raises(TypeError):
+        anatomy.templates["work"]["file"] = "{asset}"
+
+    with pytest.raises(TypeError):
+        anatomy.reset()
+
+
+def test_registry_invalidation(project_dir, monkeypatch):
+    anatomy = AnatomyRegistry.get("test_project")
+
+    changed = {"work": {"file": "{asset}_{task}_v{version:0>4}"}}
+    _write_json((project_dir / "default.yaml").as_posix(), changed)
+
+    # Files are not checked before poll interval passed
+    monkeypatch.setattr(AnatomyRegistry, "poll_interval", 3600)
+    assert AnatomyRegistry.get("test_project") is anatomy
+
+    monkeypatch.setattr(AnatomyRegistry, "poll_interval", 0)
+    new_anatomy = AnatomyRegistry.get("test_project")
+    assert new_anatomy is not anatomy
+    assert new_anatomy.templates["work"]["file"] == changed["work"]["file"]
+
+    AnatomyRegistry.invalidate("test_project")
+    assert AnatomyRegistry.get("test_project") is not new_anatomy
+
+
+def test_registry_threads(project_dir):
+    results = []
+
+    def get_anatomy():
+        for _ in range(20):
+            results.append(AnatomyRegistry.get("test_project"))
+
+    threads = [threading.Thread(target=get_anatomy) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 160
+    assert len(set(id(anatomy) for anatomy in results)) == 1
+
+
+def test_snapshot(project_dir, monkeypatch):
+    monkeypatch.setitem(os.environ, "AVALON_PROJECT", "test_project")
+    anatomy = Anatomy("other_project", keep_updated=True)
+    snapshot = anatomy.snapshot()
+
+    assert isinstance(snapshot, AnatomySnapshot)
+    assert snapshot.project_name == "test_project"
+    assert not snapshot.keep_updated
+    assert snapshot.snapshot() is snapshot
+    assert isinstance(snapshot.templates, ImmutableDict)
+
+    # Environment is not used after snapshot was created
+    monkeypatch.setitem(os.environ, "AVALON_PROJECT", "other_project")
+    assert snapshot.templates_obj.project_name == "test_project"
+    assert snapshot.roots_obj.project_name == "test_project"
+
+    with pytest.raises(TypeError):
+        snapshot.project_name = "other_project"
+
+    with pytest.raises(TypeError):
+        snapshot.reset()
+
+
+def test_snapshot_objects(project_dir):
+    multiroot = {
+        "work": {"windows": "C:/work", "linux": "/work", "darwin": "/work"},
+        "publish": {
+            "windows": "C:/publish", "linux": "/publish", "darwin": "/publish"
+        }
+    }
+    _write_json((project_dir / "roots.json").as_posix(), multiroot)
+    snapshot = Anatomy("test_project", result_cache_size=10).snapshot()
+
+    assert isinstance(snapshot.roots, ImmutableDict)
+    with pytest.raises(TypeError):
+        snapshot.roots["work"] = "C:/other"
+
+    for obj in (snapshot.templates_obj, snapshot.roots_obj):
+        with pytest.raises(TypeError):
+            obj.reset()
+
+    with pytest.raises(TypeError):
+        snapshot.templates_obj.set_result_cache_size(None)
+    assert snapshot.templates_obj.result_cache.size == 10
+
+    assert snapshot.roots_obj.roots is snapshot.roots
+    assert snapshot.templates_obj.templates is snapshot.templates
+
+
+def test_snapshot_threads(project_dir):
+    snapshot = Anatomy("test_project").snapshot()
+    results = []
+
+    def format_templates(idx):
+        for version in range(50):
+            filled = snapshot.format({"asset": idx, "version": version})
+            results.append(
+                filled["work"]["file"] == "{}_v{:0>3}".format(idx, version)
+            )
+
+    threads = [
+        threading.Thread(target=format_templates, args=(idx, ))
+        for idx in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 400
+    assert all(results)
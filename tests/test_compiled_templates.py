@@ -0,0 +1,155 @@
+import sys
+import copy
+import pickle
+import pytest
+from pypeapp.lib.anatomy import (
+    Templates, Roots, CompiledTemplate, TemplateResult
+)
+
+
+roots_data = {
+    "work": {
+        "windows": "P:/projects/work",
+        "linux": "/mnt/share/projects/work",
+        "darwin": "/Volumes/projects/work"
+    },
+    "publish": {
+        "windows": "P:/projects/publish",
+        "linux": "/mnt/share/projects/publish",
+        "darwin": "/Volumes/projects/publish"
+    }
+}
+
+fill_data = {
+    "version": 1,
+    "hierarchy": "asset/characters",
+    "ext": "ABC",
+    "project": {
+        "code": "PRJ",
+        "name": "P001_ProjectX"
+    },
+    "asset": "BOB",
+    "task": "MODELING",
+    "comment": "iAmComment",
+    "frame": 1001,
+    "representation": "exr",
+    "invalid": ["list"]
+}
+
+templates = [
+    "{asset}_{task}_v{version:0>3}<_{comment}>.{ext}",
+    "{asset}_{task}_v{version:0>3}<_{nocomment}>.{ext}",
+    "{project[code]}_{asset[name]}_v{version:0>3}.{ext}",
+    (
+        "{project[code]}</{asset}></{hierarchy}><_v{version:0>3}>"
+        "<_{nocomment}>.{ext}"
+    ),
+    "{root[work]}/{project[name]}/{hierarchy}/{asset}/work/{task}",
+    (
+        "{root[publish]}/{project[name]}/{hierarchy}/{asset}/publish"
+        "/v{version:0>3}/{project[code]}_{asset}<.{frame:0>4}>"
+        ".{representation}"
+    ),
+    "{root[missing]}/{project[name]}/{missing_key}_{invalid}",
+    "{project}_{asset[name]}",
+    "{frame:04d}_{asset}",
+    "{{escaped}}/{asset}",
+    "{asset!r}/{task}",
+    "{missing_key1}_{asset}<_{comment}>.{ext}{missing_key2}"
+]
+
+
+def _result_data(result):
+    return (
+        str(result),
+        result.template,
+        result.solved,
+        result.rootless,
+        result.used_values,
+        sorted(result.missing_keys),
+        result.invalid_types
+    )
+
+
+@pytest.fixture
+def templates_obj():
+    return Templates(project_name="test_project")
+
+
+@pytest.mark.parametrize("template", templates)
+def test_compiled_matches_legacy(templates_obj, template):
+    data = dict(fill_data)
+    data["root"] = Roots._parse_dict(roots_data)
+
+    expected = templates_obj._format_legacy(template, data)
+    result = templates_obj._format(template, data)
+
+    assert _result_data(result) == _result_data(expected)
+
+
+def test_compiled_template_is_cached(templates_obj):
+    template = templates[0]
+    compiled = templates_obj.compile_template(template)
+
+    assert isinstance(compiled, CompiledTemplate)
+    assert templates_obj.compile_template(template) is compiled
+
+    templates_obj.reset()
+    assert templates_obj.compile_template(template) is not compiled
+
+
+def test_compiled_template_variants(templates_obj):
+    compiled = templates_obj.compile_template(templates[0])
+
+    with_comment = compiled.format(fill_data)
+    data = dict(fill_data)
+    data.pop("comment")
+    without_comment = compiled.format(data)
+
+    assert with_comment == "BOB_MODELING_v001_iAmComment.ABC"
+    assert without_comment == "BOB_MODELING_v001.ABC"
+    assert without_comment.missing_keys == ["comment"]
+    assert len(compiled._variants) == 2
+
+
+def test_results_share_descriptor(templates_obj):
+    template = templates[5]
+    compiled = templates_obj.compile_template(template)
+    data = dict(fill_data)
+    data["root"] = Roots._parse_dict(roots_data)
+
+    first = compiled.format(data)
+    data["frame"] = 1002
+    second = compiled.format(data)
+
+    assert first._descriptor is second._descriptor
+    assert first.template == template
+    assert second.rootless == (
+        "{root[publish]}/P001_ProjectX/asset/characters/BOB/publish"
+        "/v001/PRJ_BOB.1002.exr"
+    )
+    assert second.used_values["frame"] == "1002"
+    assert second.used_values["root"] == {
+        "publish": str(data["root"]["publish"])
+    }
+    assert second.missing_keys == []
+    assert second.invalid_types == {}
+    if sys.version_info[0] >= 3:
+        assert not hasattr(second, "__dict__")
+
+
+def test_result_is_str(templates_obj):
+    result = templates_obj._format(templates[0], fill_data)
+
+    assert isinstance(result, str)
+    assert result + "/file" == "BOB_MODELING_v001_iAmComment.ABC/file"
+    assert result.upper() == "BOB_MODELING_V001_IAMCOMMENT.ABC"
+    assert {result: 1}["BOB_MODELING_v001_iAmComment.ABC"] == 1
+
+    for item in (
+        copy.copy(result),
+        copy.deepcopy(result),
+        pickle.loads(pickle.dumps(result))
+    ):
+        assert isinstance(item, TemplateResult)
+        assert _result_data(item) == _result_data(result)
@@ -1,3 +1,6 @@
+import os
+import json
+import shutil
 import pytest
 from pypeapp.lib import config
 
@@ -48,3 +51,503 @@ result = {
 def test_update_dict():
 
     assert result == config.update_dict(source_data, new_data)
+
+
+def _write_json(path, data):
+    if not os.path.exists(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, "w") as stream:
+        json.dump(data, stream)
+
+
+@pytest.fixture
+def presets(tmp_path, monkeypatch):
+    config_path = tmp_path / "config"
+    project_configs_path = tmp_path / "projects"
+    monkeypatch.setitem(os.environ, "PYPE_CONFIG", config_path.as_posix())
+    monkeypatch.setitem(
+        os.environ, "PYPE_PROJECT_CONFIGS", project_configs_path.as_posix()
+    )
+    monkeypatch.delitem(os.environ, "AVALON_PROJECT", raising=False)
+    monkeypatch.setitem(
+        os.environ, "PYPE_CACHE_DIR", (tmp_path / "cache").as_posix()
+    )
+    monkeypatch.delitem(os.environ, "PYPE_DISABLE_FILE_CACHE", raising=False)
+
+    default_path = config_path / "presets"
+    project_path = project_configs_path / "MyProject" / "presets"
+    _write_json((default_path / "colorspace.json").as_posix(), {
+        "default": {"view": "sRGB", "luts": ["a", "b"]}
+    })
+    _write_json((default_path / "ftrack" / "server.json").as_posix(), {
+        "url": "https://studio.ftrackapp.com"
+    })
+    _write_json(
+        (default_path / "plugins" / "maya" / "publish.json").as_posix(),
+        {"ValidateMesh": {"enabled": True, "families": ["model"]}}
+    )
+    os.makedirs((default_path / "empty" / "folder").as_posix())
+    _write_json(
+        (project_path / "plugins" / "maya" / "publish.json").as_posix(),
+        {"ValidateMesh": {"enabled": False}}
+    )
+
+    monkeypatch.setattr(config.PresetsCache, "_entries", {})
+    monkeypatch.setattr(config.PresetsCache, "_files", {})
+    return default_path, project_path
+
+
+@pytest.fixture
+def loaded(monkeypatch):
+    """Names of json files loaded with `config.load_json`."""
+    loaded = []
+    orig_load_json = config.load_json
+
+    def load_json(path, first_run=False):
+        loaded.append(os.path.basename(path))
+        return orig_load_json(path, first_run)
+
+    monkeypatch.setattr(config, "load_json", load_json)
+    return loaded
+
+
+def test_presets_paths(presets, monkeypatch):
+    default_path, project_path = presets
+    assert config.presets_paths() == (
+        os.path.normpath(default_path.as_posix()), None
+    )
+    monkeypatch.setitem(os.environ, "AVALON_PROJECT", "MyProject")
+    assert config.presets_paths() == (
+        os.path.normpath(default_path.as_posix()),
+        os.path.normpath(project_path.as_posix())
+    )
+
+
+def test_presets_cache(presets, loaded, monkeypatch):
+    default_path, project_path = presets
+    expected = config.get_presets("MyProject")
+    assert expected["plugins"]["maya"]["publish"]["ValidateMesh"] == {
+        "enabled": False, "families": ["model"]
+    }
+    assert "empty" not in expected
+    del loaded[:]
+
+    cached = config.get_presets("MyProject", use_cache=True)
+    assert isinstance(cached, config.ImmutableDict)
+    assert json.dumps(cached, sort_keys=True) == json.dumps(
+        expected, sort_keys=True
+    )
+    assert cached["colorspace"]["default"]["luts"] == ("a", "b")
+    with pytest.raises(TypeError):
+        cached["ftrack"]["server"]["url"] = "changed"
+    assert sorted(loaded) == [
+        "colorspace.json", "publish.json", "publish.json", "server.json"
+    ]
+
+    # Default presets are shared with other projects
+    del loaded[:]
+    default_presets = config.get_presets(use_cache=True)
+    assert loaded == []
+    assert default_presets["ftrack"]["server"]["url"] == (
+        "https://studio.ftrackapp.com"
+    )
+    assert default_presets["plugins"]["maya"]["publish"]["ValidateMesh"][
+        "enabled"
+    ] is True
+
+    # Within poll interval files are not checked
+    _write_json((default_path / "ftrack" / "server.json").as_posix(), {
+        "url": "https://other.ftrackapp.com"
+    })
+    assert config.get_presets("MyProject", use_cache=True) is cached
+
+    # Only changed and new files are parsed again
+    monkeypatch.setattr(config.PresetsCache, "poll_interval", 0)
+    _write_json(
+        (project_path / "ftrack" / "actions.json").as_posix(), {"a": 1}
+    )
+    changed = config.get_presets("MyProject", use_cache=True)
+    assert changed is not cached
+    assert sorted(loaded) == ["actions.json", "server.json"]
+    assert changed["ftrack"] == {
+        "server": {"url": "https://other.ftrackapp.com"},
+        "actions": {"a": 1}
+    }
+    assert changed["plugins"] == cached["plugins"]
+
+    # Files are not parsed when nothing changed
+    del loaded[:]
+    assert config.get_presets("MyProject", use_cache=True) is changed
+    assert loaded == []
+
+    os.remove((project_path / "ftrack" / "actions.json").as_posix())
+    removed = config.get_presets("MyProject", use_cache=True)
+    assert "actions" not in removed["ftrack"]
+    assert loaded == []
+
+    config.PresetsCache.clear()
+    assert config.get_presets("MyProject", use_cache=True) == removed
+    assert len(loaded) == 4
+
+
+def test_presets_cache_missing(presets, monkeypatch):
+    monkeypatch.setitem(os.environ, "PYPE_CONFIG", "/not/existing/config")
+    assert config.get_presets(use_cache=True) is None
+
+
+def test_get_init_presets(presets, loaded, monkeypatch):
+    default_path, project_path = presets
+    _write_json((default_path / "dataflow.json").as_posix(), {
+        "default": {"nuke": {"colorspace": "linear"}},
+        "aces": {"nuke": {"colorspace": "ACES"}}
+    })
+    _write_json((project_path / "init.json").as_posix(), {
+        "colorspace": "default", "dataflow": "aces"
+    })
+
+    presets = config.get_init_presets("MyProject")
+    assert presets["colorspace"] == {"view": "sRGB", "luts": ["a", "b"]}
+    assert presets["dataflow"] == {"nuke": {"colorspace": "ACES"}}
+    assert len(loaded) == 6
+
+    # Presets are mutable copy of cached presets
+    presets["colorspace"]["luts"].append("c")
+    presets["ftrack"]["server"]["url"] = "changed"
+    del loaded[:]
+    presets = config.get_init_presets("MyProject")
+    assert presets["colorspace"] == {"view": "sRGB", "luts": ["a", "b"]}
+    assert presets["ftrack"]["server"]["url"] == (
+        "https://studio.ftrackapp.com"
+    )
+    assert loaded == []
+
+    cached = config.get_presets("MyProject", use_cache=True)
+    assert cached["colorspace"] == {
+        "default": {"view": "sRGB", "luts": ("a", "b")}
+    }
+
+    # Default presets are used without init of project
+    presets = config.get_init_presets()
+    assert presets["dataflow"] == {"nuke": {"colorspace": "linear"}}
+
+    monkeypatch.setitem(os.environ, "PYPE_CONFIG", "/not/existing/config")
+    assert config.get_init_presets() is None
+
+
+def test_presets_bundle(presets, loaded, monkeypatch):
+    default_path, project_path = presets
+    expected = config.get_presets("MyProject")
+    assert config.load_presets_bundle("MyProject") is None
+
+    bundle_path = config.compile_presets("MyProject")
+    assert bundle_path == config.presets_bundle_path("MyProject")
+    assert os.path.basename(bundle_path).startswith("MyProject_")
+    assert bundle_path != config.compile_presets()
+
+    assert config.get_presets("MyProject") == expected
+    assert config.get_presets() == config.collect_json_from_path(
+        default_path.as_posix()
+    )
+    del loaded[:]
+    assert config.get_presets("MyProject") == expected
+    assert loaded == []
+
+    # Issues of json files are logged only when files are parsed
+    config.get_presets("MyProject", first_run=True)
+    assert len(loaded) == 4
+    del loaded[:]
+
+    # Touched file without changed content
+    server_path = (default_path / "ftrack" / "server.json").as_posix()
+    os.utime(server_path, (0, 0))
+    assert config.get_presets("MyProject") == expected
+    assert config.load_presets_bundle("MyProject", verify_files=True)
+    assert loaded == []
+
+    monkeypatch.setitem(os.environ, "PYPE_DISABLE_FILE_CACHE", "1")
+    assert config.get_presets("MyProject") == expected
+    assert len(loaded) == 4
+    monkeypatch.delitem(os.environ, "PYPE_DISABLE_FILE_CACHE")
+
+    # File changed in place
+    _write_json(server_path, {"url": "https://other.ftrackapp.com"})
+    assert config.load_presets_bundle("MyProject") is None
+    assert config.load_presets_bundle("MyProject", verify_files=True) is None
+
+    config.compile_presets("MyProject")
+    assert config.load_presets_bundle("MyProject")["ftrack"]["server"] == {
+        "url": "https://other.ftrackapp.com"
+    }
+
+    # New file
+    _write_json((project_path / "new.json").as_posix(), {})
+    assert config.load_presets_bundle("MyProject") is None
+    config.compile_presets("MyProject")
+
+    # Replaced file
+    tmp_path = (default_path / "ftrack" / "server.tmp").as_posix()
+    _write_json(tmp_path, {"url": "https://replaced.ftrackapp.com"})
+    os.remove(server_path)
+    os.rename(tmp_path, server_path)
+    assert config.load_presets_bundle("MyProject") is None
+    config.compile_presets("MyProject")
+
+    # Removed directory
+    shutil.rmtree((project_path / "plugins" / "maya").as_posix())
+    assert config.load_presets_bundle("MyProject") is None
+
+
+def test_presets_bundle_fs_calls(presets, monkeypatch):
+    config.compile_presets("MyProject")
+    bundle_dirs = set()
+    bundle_files = set()
+    for path in presets:
+        bundle_dirs.update(config._list_directories(path.as_posix()))
+        bundle_files.update(
+            file_path
+            for _, file_path in config._list_json_files(path.as_posix())
+        )
+
+    calls = []
+
+    def counted(name):
+        func = getattr(os, name)
+
+        def wrapper(path, *args, **kwargs):
+            calls.append((name, path))
+            return func(path, *args, **kwargs)
+        return wrapper
+
+    for name in ("stat", "listdir", "scandir"):
+        monkeypatch.setattr(os, name, counted(name))
+
+    opened = []
+    orig_file_hash = config._file_hash
+
+    def file_hash(path):
+        opened.append(path)
+        return orig_file_hash(path)
+
+    monkeypatch.setattr(config, "_file_hash", file_hash)
+
+    assert config.load_presets_bundle("MyProject") is not None
+    # Presets directories and json files are only stat-ed
+    assert len(calls) == len(bundle_dirs) + len(bundle_files)
+    assert all(name == "stat" for name, _ in calls)
+    assert set(path for _, path in calls) == bundle_dirs | bundle_files
+    assert opened == []
+
+
+def test_lazy_presets(presets, loaded):
+    default_path, project_path = presets
+    _write_json(
+        (project_path / "colorspace" / "default.json").as_posix(),
+        {"view": "ACES"}
+    )
+    expected = config.get_presets("MyProject")
+    assert expected["colorspace"]["default"] == {
+        "view": "ACES", "luts": ["a", "b"]
+    }
+    del loaded[:]
+
+    lazy = config.get_presets("MyProject", lazy=True)
+    assert isinstance(lazy, dict)
+    assert sorted(lazy.keys()) == ["colorspace", "empty", "ftrack", "plugins"]
+    assert "ftrack" in lazy
+    assert "unknown" not in lazy
+    assert lazy.get("unknown") is None
+    if config.DICT_COPY_USES_GETITEM:
+        assert loaded == []
+
+    assert lazy["plugins"]["maya"]["publish"] == (
+        expected["plugins"]["maya"]["publish"]
+    )
+    assert sorted(loaded) == ["publish.json", "publish.json"]
+    assert lazy.get("ftrack") == expected["ftrack"]
+    assert len(loaded) == 3
+    with pytest.raises(KeyError):
+        lazy["unknown"]
+
+    # Directories without json files are empty
+    assert lazy["empty"] == {"folder": {}}
+
+    lazy = config.get_presets("MyProject", lazy=True)
+    copied = dict(lazy)
+    assert not any(
+        isinstance(value, config._PresetsSource) for value in copied.values()
+    )
+    copied.pop("empty")
+    assert copied == expected
+
+    lazy = config.get_presets("MyProject", lazy=True)
+    lazy.pop("empty")
+    assert json.dumps(lazy, sort_keys=True) == json.dumps(
+        expected, sort_keys=True
+    )
+    assert lazy == expected
+
+
+def test_lazy_presets_copies(presets):
+    expected = config.get_presets("MyProject")
+    expected["empty"] = {"folder": {}}
+
+    def is_loaded(value):
+        if isinstance(value, config._PresetsSource):
+            return False
+        if isinstance(value, dict):
+            return all(is_loaded(item) for item in value.values())
+        return True
+
+    def keyword_arguments(**kwargs):
+        return kwargs
+
+    for copy_func in (
+        dict,
+        lambda lazy: keyword_arguments(**lazy),
+        lambda lazy: lazy.copy(),
+        lambda lazy: dict(lazy.items()),
+        lambda lazy: dict(zip(lazy.keys(), lazy.values())),
+        lambda lazy: dict(lazy.popitem() for _ in range(len(lazy))),
+        lambda lazy: dict(
+            (key, lazy.setdefault(key)) for key in list(lazy.keys())
+        ),
+    ):
+        lazy = config.get_presets("MyProject", lazy=True)
+        copied = copy_func(lazy)
+        assert is_loaded(copied)
+        assert copied == expected
+
+
+@pytest.mark.parametrize("text,expected,extra_comma", [
+    ('{"a": [1, 2,], "b": {"c": 1,},}', {"a": [1, 2], "b": {"c": 1}}, True),
+    ('[\n  1,\n  2,\n\t]', [1, 2], True),
+    ('{"a": ",]", "b": ",}"}', {"a": ",]", "b": ",}"}, False),
+    ('{"a": ",]", "b": ",}",}', {"a": ",]", "b": ",}"}, True),
+    ('{"a": ", ]", "b": [",", ","  , ]}', {"a": ", ]", "b": [",", ","]}, True),
+    ('{"a": "x\\",]", "b": "\\\\",}', {"a": "x\",]", "b": "\\"}, True),
+    ('{"a": "\\"", "b": "\\\\\\"",}', {"a": "\"", "b": "\\\""}, True),
+    ('{"a": "\\u00e9,}", "b": [[],[],],}', {"a": u"\u00e9,}", "b": [[], []]}, True),
+    ('{"": "", "\\"\\"": "\\"\\"",}', {"": "", "\"\"": "\"\""}, True),
+    ('{"path": "C:\\\\folder\\\\",\n}', {"path": "C:\\folder\\"}, True),
+    ('["{", "[", ",", "]"]', ["{", "[", ",", "]"], False),
+    ('"only string,]"', "only string,]", False),
+])
+def test_parse_json(text, expected, extra_comma):
+    assert config.parse_json(text) == (expected, extra_comma)
+
+
+@pytest.mark.parametrize("text,lineno,colno", [
+    ('{"a": 1,\n  "b": ]', 2, 8),
+    ('{"a": [1,],\n"b": x}', 2, 6),
+    ('{\n    "a": 1,\n    "b": 2 3,\n}', 3, 12),
+    ('{"a": [1,],, "b": 2}', 1, 12),
+    ('{"a": "x,]', 1, 7),
+])
+def test_parse_json_error(text, lineno, colno):
+    with pytest.raises(config.JsonError) as exc_info:
+        config.parse_json(text)
+    assert (exc_info.value.lineno, exc_info.value.colno) == (lineno, colno)
+
+
+def test_parse_json_passes(monkeypatch):
+    calls = []
+    orig_loads = json.loads
+    orig_replace = config._replace_trailing_commas
+
+    def loads(text, *args, **kwargs):
+        calls.append("loads")
+        return orig_loads(text, *args, **kwargs)
+
+    def replace_trailing_commas(text):
+        calls.append("replace")
+        return orig_replace(text)
+
+    monkeypatch.setattr(json, "loads", loads)
+    monkeypatch.setattr(
+        config, "_replace_trailing_commas", replace_trailing_commas
+    )
+
+    # Strings with comma before bracket are not modified nor parsed twice
+    text = '{"a": ",]", "b": [",}", ", ]"]}'
+    assert config.parse_json(text) == (
+        {"a": ",]", "b": [",}", ", ]"]}, False
+    )
+    assert calls == ["loads"]
+
+    del calls[:]
+    assert config.parse_json('{"a": ",]", "b": [1,\n]}') == (
+        {"a": ",]", "b": [1]}, True
+    )
+    assert calls == ["loads", "replace", "loads"]
+
+    # Errors not caused by trailing comma are raised from first parsing
+    del calls[:]
+    with pytest.raises(config.JsonError):
+        config.parse_json('{"a": ",]" "b": [1,]}')
+    assert calls == ["loads"]
+
+
+def test_load_json(tmp_path):
+    path = (tmp_path / "preset.json").as_posix()
+    for content, expected in (
+        ("", {}),
+        (" \n\t\n", {}),
+        ('{"a": [1,],\n"b": x}', {}),
+        ('{\n    "a": [\n        1,\n    ],\n}\n', {"a": [1]}),
+    ):
+        with open(path, "w") as stream:
+            stream.write(content)
+        assert config.load_json(path) == expected
+        assert config.load_json(path, first_run=True) == expected
+
+
+@pytest.mark.parametrize("workers", [None, 1, 4])
+def test_collect_json_from_path(presets, monkeypatch, workers):
+    default_path, _ = presets
+    # Use thread pool even for small tree
+    monkeypatch.setattr(config, "PARALLEL_LOAD_MIN_ITEMS", 1)
+    _write_json((default_path / "ftrack" / "nested" / "a.json").as_posix(), {
+        "value": [1, 2]
+    })
+    with open((default_path / "ftrack" / "readme.txt").as_posix(), "w"):
+        pass
+
+    output = config.collect_json_from_path(
+        default_path.as_posix(), workers=workers
+    )
+    assert output == {
+        "colorspace": {"default": {"view": "sRGB", "luts": ["a", "b"]}},
+        "ftrack": {
+            "server": {"url": "https://studio.ftrackapp.com"},
+            "nested": {"a": {"value": [1, 2]}}
+        },
+        "plugins": {"maya": {"publish": {
+            "ValidateMesh": {"enabled": True, "families": ["model"]}
+        }}}
+    }
+    assert config.collect_json_from_path(
+        (default_path / "ftrack" / "server.json").as_posix(), workers=workers
+    ) == {"url": "https://studio.ftrackapp.com"}
+    assert config.collect_json_from_path(
+        (default_path / "ftrack" / "readme.txt").as_posix(), workers=workers
+    ) is None
+
+
+def test_presets_thread_pool(presets, monkeypatch):
+    monkeypatch.setitem(os.environ, "PYPE_DISABLE_FILE_CACHE", "1")
+    monkeypatch.setattr(config, "_thread_pools", {})
+    expected = config.get_presets("MyProject")
+    # Small trees and default calls are loaded serially
+    assert config.get_presets("MyProject", workers=4) == expected
+    assert config._thread_pools == {}
+
+    monkeypatch.setattr(config, "PARALLEL_LOAD_MIN_ITEMS", 1)
+    assert config.get_presets("MyProject") == expected
+    assert config._thread_pools == {}
+
+    # One pool is shared by both presets trees and following calls
+    assert config.get_presets("MyProject", workers=4) == expected
+    pools = list(config._thread_pools.values())
+    assert len(pools) == 1
+    assert config.get_presets("MyProject", workers=4) == expected
+    assert list(config._thread_pools.values()) == pools
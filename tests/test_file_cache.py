@@ -0,0 +1,91 @@
+import os
+import json
+import pytest
+from pypeapp.lib.anatomy import Anatomy, anatomy_file_cache
+from pypeapp.lib.file_cache import FileCache, user_cache_dir
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = (tmp_path / "cache").as_posix()
+    monkeypatch.setitem(os.environ, "PYPE_CACHE_DIR", path)
+    monkeypatch.delitem(os.environ, "PYPE_DISABLE_FILE_CACHE", raising=False)
+    return path
+
+
+def _write_json(path, data):
+    with open(path, "w") as stream:
+        json.dump(data, stream)
+
+
+def test_file_cache(tmp_path, cache_dir):
+    source = (tmp_path / "source.json").as_posix()
+    _write_json(source, {"key": "value"})
+
+    cache = FileCache("test")
+    assert cache.cache_dir == os.path.join(user_cache_dir(), "test")
+    assert cache.get([source]) == (False, None)
+
+    calls = []
+
+    def loader():
+        calls.append(source)
+        with open(source, "r") as stream:
+            return json.load(stream)
+
+    assert cache.load([source], loader) == {"key": "value"}
+    assert cache.load([source], loader) == {"key": "value"}
+    assert len(calls) == 1
+    assert cache.get([source], key="other") == (False, None)
+
+    # Size of file changed
+    _write_json(source, {"key": "new value"})
+    assert cache.load([source], loader) == {"key": "new value"}
+    assert len(calls) == 2
+    assert cache.hits == 1
+    assert cache.misses == 4
+
+
+def test_file_cache_invalid_data(tmp_path, cache_dir, monkeypatch):
+    source = (tmp_path / "source.json").as_posix()
+    _write_json(source, {})
+    cache = FileCache("test")
+
+    assert not cache.set([source], {"key": object()})
+    assert not cache.set([source + ".missing"], {})
+
+    assert cache.set([source], {})
+    with open(cache.cache_path([source]), "wb") as stream:
+        stream.write(b"corrupted")
+    assert cache.get([source]) == (False, None)
+
+    monkeypatch.setitem(os.environ, "PYPE_DISABLE_FILE_CACHE", "1")
+    assert not cache.set([source], {})
+
+
+def test_anatomy_uses_file_cache(tmp_path, cache_dir, monkeypatch):
+    anatomy_dir = tmp_path / "pype-config" / "anatomy"
+    os.makedirs(anatomy_dir.as_posix())
+    templates_path = (anatomy_dir / "default.yaml").as_posix()
+    _write_json(templates_path, {
+        "version": "v{version:0>3}",
+        "work": {"file": "{asset}_{@version}"}
+    })
+    _write_json(
+        (anatomy_dir / "roots.json").as_posix(),
+        {"windows": "C:/projects", "linux": "/projects", "darwin": "/projects"}
+    )
+    monkeypatch.setitem(
+        os.environ, "PYPE_CONFIG", (tmp_path / "pype-config").as_posix()
+    )
+    monkeypatch.delitem(os.environ, "AVALON_PROJECT", raising=False)
+
+    hits = anatomy_file_cache.hits
+    expected = Anatomy().templates
+    assert anatomy_file_cache.hits == hits
+    assert Anatomy().templates == expected
+    assert Anatomy().roots.cleaned_data == Anatomy().roots.cleaned_data
+    assert anatomy_file_cache.hits > hits
+
+    _write_json(templates_path, {"work": {"file": "{asset}_{task}"}})
+    assert Anatomy().templates["work"]["file"] == "{asset}_{task}"
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import json
+import pytest
+from pypeapp.lib.remap_metadata import remap_json_stream, remap_metadata_file
+
+
+metadata = {
+    "project": "P001_ProjectX",
+    "P:\\projects\\work\\key": "key is path",
+    "stagingDir": "P:\\projects\\work\\P001_ProjectX\\render",
+    "files": [
+        "P:/projects/work/P001_ProjectX/render/file.{:04d}.exr".format(frame)
+        for frame in range(1001, 1011)
+    ],
+    "nested": {
+        "quote": "P:/projects/work/\"quoted\" \\ name.exr",
+        "unicode": u"P:/projects/work/žluťoučký kůň.exr",
+        "linux": "/mnt/share/projects/work/file.exr",
+        "other": "C:/other/file.exr",
+        "empty": "",
+        "numbers": [1, 2.5, None, True]
+    }
+}
+
+
+def remap(value):
+    value = value.replace("\\", "/")
+    prefix = "P:/projects/work"
+    if value.startswith(prefix):
+        return "/mnt/share/projects/work" + value[len(prefix):]
+    return None
+
+
+def expected_data(data):
+    if isinstance(data, dict):
+        return {
+            expected_data(key): expected_data(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [expected_data(value) for value in data]
+    if isinstance(data, type(u"")):
+        return remap(data) or data
+    return data
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1024 * 1024])
+@pytest.mark.parametrize("indent", [None, 4])
+def test_remap_json_stream(chunk_size, indent):
+    content = json.dumps(metadata, indent=indent, ensure_ascii=False)
+    dst_stream = io.StringIO()
+    count = remap_json_stream(
+        io.StringIO(content), dst_stream, remap, chunk_size
+    )
+
+    assert json.loads(dst_stream.getvalue()) == expected_data(metadata)
+    assert count == 14
+
+
+def test_remap_json_stream_keeps_other_content():
+    content = u'{"a" : [1,  "C:\\\\x", "b\\u00e1"],\n "c": null}'
+    dst_stream = io.StringIO()
+    assert remap_json_stream(io.StringIO(content), dst_stream, remap, 3) == 0
+    assert dst_stream.getvalue() == content
+
+    with pytest.raises(ValueError):
+        remap_json_stream(
+            io.StringIO(u'{"a": "P:/projects'), io.StringIO(), remap
+        )
+
+
+def test_remap_metadata_file(anatomy_env, tmp_path):
+    path = (tmp_path / "metadata.json").as_posix()
+    output_path = (tmp_path / "output.json").as_posix()
+    with io.open(path, "w", encoding="utf-8") as stream:
+        stream.write(json.dumps(metadata, ensure_ascii=False))
+
+    count = remap_metadata_file(
+        path, src_platform="windows", dst_platform="linux",
+        output_path=output_path, chunk_size=16
+    )
+    assert count == 14
+    with io.open(output_path, "r", encoding="utf-8") as stream:
+        assert json.load(stream) == expected_data(metadata)
+
+    os.chmod(path, 0o644)
+    assert remap_metadata_file(path, dst_platform="linux") == 14
+    stat = os.stat(path)
+    assert stat.st_mode & 0o777 == 0o644
+
+    # File without paths to remap is not rewritten
+    assert remap_metadata_file(path, dst_platform="linux") == 0
+    assert os.stat(path).st_ino == stat.st_ino
+    assert os.stat(path).st_mtime == stat.st_mtime
+    assert not [
+        filename
+        for filename in os.listdir(tmp_path.as_posix())
+        if filename.endswith(".tmp")
+    ]
+
+
+@pytest.fixture
+def anatomy_env(tmp_path, monkeypatch):
+    anatomy_dir = tmp_path / "pype-config" / "anatomy"
+    os.makedirs(anatomy_dir.as_posix())
+    with open((anatomy_dir / "default.yaml").as_posix(), "w") as stream:
+        json.dump({"work": {"folder": "{root}/{project[name]}"}}, stream)
+
+    with open((anatomy_dir / "roots.json").as_posix(), "w") as stream:
+        json.dump({
+            "windows": "P:/projects/work",
+            "linux": "/mnt/share/projects/work",
+            "darwin": "/Volumes/projects/work"
+        }, stream)
+
+    monkeypatch.setitem(
+        os.environ, "PYPE_CONFIG", (tmp_path / "pype-config").as_posix()
+    )
+    monkeypatch.setitem(os.environ, "PYPE_DISABLE_FILE_CACHE", "1")
+    monkeypatch.delitem(os.environ, "AVALON_PROJECT", raising=False)
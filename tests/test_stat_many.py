@@ -0,0 +1,79 @@
+import os
+import pytest
+from pypeapp.lib.anatomy import Anatomy, stat_many
+
+
+@pytest.fixture
+def files(tmp_path):
+    folder = tmp_path / "folder"
+    os.makedirs((folder / "sub").as_posix())
+    paths = []
+    for path in (folder / "a.txt", folder / "b.txt", tmp_path / "c.txt"):
+        with open(path.as_posix(), "w") as stream:
+            stream.write(path.name)
+        paths.append(path.as_posix())
+    return tmp_path, paths
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_stat_many(files, workers):
+    tmp_path, existing = files
+    missing = [
+        (tmp_path / "folder" / "missing.txt").as_posix(),
+        (tmp_path / "missing" / "a.txt").as_posix(),
+        (tmp_path / "missing" / "b.txt").as_posix(),
+    ]
+    folder = (tmp_path / "folder" / "sub").as_posix() + "/"
+
+    result = stat_many(existing + missing + [folder], workers=workers)
+
+    assert sorted(result.keys()) == sorted(existing + missing + [folder])
+    for path in existing:
+        assert result[path].st_size == os.stat(path).st_size
+        assert result[path].st_mtime == os.stat(path).st_mtime
+    for path in missing:
+        assert result[path] is None
+    assert result[folder] is not None
+
+
+def test_stat_many_listing(files, monkeypatch):
+    tmp_path, existing = files
+    stat_calls = []
+    orig_stat = os.stat
+
+    def stat(path, *args, **kwargs):
+        stat_calls.append(path)
+        return orig_stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "stat", stat)
+    paths = existing[:2] + [
+        (tmp_path / "folder" / "missing_{}.txt".format(idx)).as_posix()
+        for idx in range(10)
+    ]
+    result = Anatomy.stat_many(paths, workers=1)
+
+    assert sum(value is not None for value in result.values()) == 2
+    # Missing paths are found from directory listing
+    assert not [path for path in stat_calls if "missing" in str(path)]
+
+
+def test_stat_many_root(files):
+    tmp_path, existing = files
+    root = os.path.abspath(os.sep)
+    # Directory directly under root which contain temporary directory
+    top_dir = os.path.join(root, tmp_path.parts[1])
+    paths = [
+        root,
+        top_dir,
+        os.path.join(root, "missing_pype_test_dir"),
+        os.curdir,
+        os.pardir,
+        existing[0]
+    ]
+
+    result = stat_many(paths, workers=1)
+
+    assert result[os.path.join(root, "missing_pype_test_dir")] is None
+    for path in (root, top_dir, os.curdir, os.pardir, existing[0]):
+        assert result[path] is not None
+        assert result[path].st_ino == os.stat(path).st_ino